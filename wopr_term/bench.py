@@ -0,0 +1,347 @@
+# bench.py
+"""
+Headless benchmarks for the render and state hot paths.
+
+    python -m wopr_term.bench --out bench.json
+    python -m wopr_term.bench --out new.json --baseline bench.json
+
+Runs under SDL's dummy video driver. Each case reports frame-time
+percentiles (ms) and Python-heap bytes allocated per frame; results are
+written as JSON so runs can be compared against a stored baseline.
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pygame
+
+from .config import W, H, FONT_NAME, FONT_SIZE, CRT_TIERS
+from . import effects
+from .startup import load_font
+
+SCROLLBACK_SIZES = (0, 100, 10000)
+
+
+def percentile(samples, p):
+    s = sorted(samples)
+    if not s:
+        return 0.0
+    k = max(0, min(len(s) - 1, int(round(p / 100.0 * len(s) + 0.5)) - 1))
+    return s[k]
+
+
+def measure(frame, frames=200, warmup=10, alloc_frames=50):
+    """Time `frame(i)` and report p50/p95/p99 in ms plus allocations per frame."""
+    for i in range(warmup):
+        frame(i)
+    times = []
+    for i in range(frames):
+        t = time.perf_counter()
+        frame(i)
+        times.append((time.perf_counter() - t) * 1000.0)
+
+    # separate pass: tracemalloc slows the frame down too much to time it
+    tracemalloc.start()
+    allocated = 0
+    for i in range(alloc_frames):
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        frame(frames + i)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - base
+    tracemalloc.stop()
+
+    return {
+        "frames": frames,
+        "p50_ms": round(percentile(times, 50), 4),
+        "p95_ms": round(percentile(times, 95), 4),
+        "p99_ms": round(percentile(times, 99), 4),
+        "mean_ms": round(sum(times) / len(times), 4),
+        "alloc_bytes_per_frame": allocated // max(1, alloc_frames),
+    }
+
+
+def make_font(scale=1):
+    return load_font(FONT_NAME, max(6, round(FONT_SIZE / scale)))
+
+
+def make_engine(quality="HIGH", scale=1, filter="NEAREST"):
+    from .engine import Engine
+
+    screen = pygame.display.get_surface() or pygame.display.set_mode((W, H))
+    engine = Engine(screen, make_font(scale), render_scale=scale, render_filter=filter)
+    engine.postfx.set_quality(quality)
+    engine.term.output.set_baud(0)  # time the renderer, not the teletype
+    return engine
+
+
+# --- cases ---------------------------------------------------------------
+
+
+def bench_vignette(results):
+    for name, builder in (
+        ("numpy", effects._vignette_numpy),
+        ("python", effects._vignette_python),
+    ):
+        if name == "numpy" and effects.np is None:
+            continue
+        results[f"vignette.{name}"] = measure(
+            lambda i: builder((W, H), effects.VIGNETTE_FALLOFF, effects.VIGNETTE_FLOOR),
+            frames=5,
+            warmup=1,
+            alloc_frames=1,
+        )
+
+    def cached(i):
+        effects._vignettes.clear()
+        effects.make_vignette((W, H))
+
+    effects.make_vignette((W, H))  # make sure the disk copy exists
+    results["vignette.disk_cache"] = measure(cached, frames=20, warmup=2)
+
+
+def bench_terminal(results):
+    screen = pygame.display.get_surface()
+    for quality in CRT_TIERS:
+        engine = make_engine(quality)
+        term, fx = engine.term, engine.postfx
+        for size in SCROLLBACK_SIZES:
+            term.clear()
+            for n in range(size):
+                term.println(
+                    f"LINE {n:05d} THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG"
+                )
+            term.draw(screen, fx)
+            key = f"terminal.draw.{quality.lower()}.sb{size}"
+
+            def idle(i):
+                term.blink += 0.01
+                term.draw(screen, fx)
+
+            def typing(i):
+                term.buffer = "PLAY CHESS"[: i % 11]
+                term.draw(screen, fx)
+
+            def scrolling(i):
+                term.println(f"OUTPUT {i}")
+                term.draw(screen, fx)
+
+            def full(i):
+                term.invalidate()
+                term.draw(screen, fx)
+
+            for mode, frame in (
+                ("idle", idle),
+                ("typing", typing),
+                ("scrolling", scrolling),
+                ("full", full),
+            ):
+                results[f"{key}.{mode}"] = measure(frame)
+
+
+def bench_render_scale(results):
+    # a full CRT frame of text, drawn small and upscaled, then presented
+    for scale, filter in (
+        (1, "NEAREST"),
+        (2, "NEAREST"),
+        (2, "SMOOTH"),
+        (3, "NEAREST"),
+    ):
+        engine = make_engine("HIGH", scale, filter)
+        term = engine.term
+        for n in range(100):
+            term.println(f"LINE {n:05d} THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG")
+
+        def full(i):
+            term.invalidate()
+            engine.present(term.draw(engine.screen, engine.postfx))
+
+        def typing(i):
+            term.buffer = "PLAY CHESS"[: i % 11]
+            engine.present(term.draw(engine.screen, engine.postfx))
+
+        key = f"render_scale.{scale}.{filter.lower()}"
+        results[f"{key}.full"] = measure(full)
+        results[f"{key}.typing"] = measure(typing)
+
+
+def bench_tictactoe(results):
+    from .states.tictactoe import TicTacToeState
+
+    engine = make_engine()
+    engine.set_state(TicTacToeState)
+    screen = pygame.display.get_surface()
+    results["tictactoe.draw"] = measure(lambda i: engine.state.draw(screen))
+
+
+def bench_poker(results):
+    # hands per second: 100_000 / p50_ms * 1000 (python -m wopr_term.games.poker bench)
+    from .games import poker
+
+    np = poker.np
+    if np is None:
+        return  # batch evaluation needs numpy
+    gen = np.random.default_rng(0)
+    hands = np.argsort(gen.random((100_000, 52)), axis=1)[:, :7].astype(np.uint8)
+    poker.evaluate_batch(hands[:1])  # tables are built outside the timing
+    results["poker.eval7_100k"] = measure(
+        lambda i: poker.evaluate_batch(hands), frames=30, warmup=2, alloc_frames=5
+    )
+    hero = [poker.card("AS"), poker.card("KD")]
+    results["poker.equity_20k"] = measure(
+        lambda i: poker.equity(hero, [], 1, 20_000, i),
+        frames=30,
+        warmup=2,
+        alloc_frames=5,
+    )
+
+
+def typed(line):
+    evs = [pygame.event.Event(pygame.TEXTINPUT, text=c) for c in line]
+    evs.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN, mod=0))
+    return evs
+
+
+def key(k):
+    return [pygame.event.Event(pygame.KEYDOWN, key=k, mod=0)]
+
+
+def state_scripts():
+    from .states.login import LoginState
+    from .states.prompt import PromptState
+    from .states.chess import ChessState
+    from .states.gtw import GTWState
+    from .states.tictactoe import TicTacToeState
+
+    return {
+        "login": (LoginState, [typed("falken"), typed("x"), typed("?")]),
+        "prompt": (
+            PromptState,
+            [typed("HELP"), typed("STATUS"), typed("GAMES"), typed("XYZZY")],
+        ),
+        "chess": (ChessState, [typed("BOARD"), typed("MOVE E2E4"), typed("UNDO")]),
+        "gtw": (GTWState, [typed("USA"), typed("ACK")]),
+        "tictactoe": (
+            TicTacToeState,
+            [
+                key(pygame.K_LEFT),
+                key(pygame.K_UP),
+                key(pygame.K_RIGHT),
+                key(pygame.K_DOWN),
+            ],
+        ),
+    }
+
+
+def bench_states(results):
+    engine = make_engine()
+    for name, (state_cls, script) in state_scripts().items():
+
+        def frame(i):
+            if engine.state is None or type(engine.state) is not state_cls:
+                engine.set_state(state_cls)
+            engine.state.handle_events(script[i % len(script)])
+            engine.state.update(1 / 60)
+
+        engine.set_state(state_cls)
+        results[f"state.{name}.events_update"] = measure(frame, frames=300)
+
+
+def bench_startup(results):
+    t = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "import wopr_term.main"],
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=dict(os.environ),
+    )
+    results["startup.import_ms"] = round((time.perf_counter() - t) * 1000.0, 2)
+
+    effects._vignettes.clear()
+    t = time.perf_counter()
+    make_engine()
+    results["startup.engine_init_ms"] = round((time.perf_counter() - t) * 1000.0, 2)
+
+
+CASES = {
+    "vignette": bench_vignette,
+    "terminal": bench_terminal,
+    "render_scale": bench_render_scale,
+    "tictactoe": bench_tictactoe,
+    "poker": bench_poker,
+    "states": bench_states,
+    "startup": bench_startup,
+}
+
+
+def compare(results, baseline, tolerance):
+    """Print p95 changes against the baseline; return the regressed case names."""
+    regressed = []
+    for name, cur in sorted(results.items()):
+        old = baseline.get(name)
+        if old is None:
+            continue
+        a = old["p95_ms"] if isinstance(old, dict) else old
+        b = cur["p95_ms"] if isinstance(cur, dict) else cur
+        change = (b - a) / a if a else 0.0
+        flag = ""
+        if change > tolerance:
+            flag = "  REGRESSION"
+            regressed.append(name)
+        print(f"{name:48s} {a:10.3f} -> {b:10.3f}  {change:+7.1%}{flag}")
+    return regressed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--out", default="bench.json", help="where to write results")
+    ap.add_argument("--baseline", help="previous results file to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown")
+    ap.add_argument("--only", nargs="*", choices=sorted(CASES), help="subset of cases")
+    args = ap.parse_args(argv)
+
+    pygame.init()
+    pygame.display.set_mode((W, H))
+
+    results = {}
+    for name in args.only or CASES:
+        t = time.perf_counter()
+        CASES[name](results)
+        print(f"{name}: {time.perf_counter() - t:.1f}s", file=sys.stderr)
+
+    doc = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": effects.np.__version__ if effects.np is not None else None,
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(doc, f, indent=2, sort_keys=True)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.tolerance):
+            status = 1
+    pygame.quit()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
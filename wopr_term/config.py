@@ -1,17 +1,82 @@
-
 # config.py
-W, H = 960, 720
+import os
+
+W, H = 960, 720  # starting window size; the window can be resized
+RESIZABLE = True
+FULLSCREEN = False  # start fullscreen (F11 toggles it)
+SIZE_CACHE_SIZE = 4  # window sizes whose layouts, buffers and masks are kept
+# draw at 1/N of the window resolution and upscale (1 = full resolution);
+# trades crispness for per-pixel cost on slow displays
+RENDER_SCALE = 1
+RENDER_FILTER = "NEAREST"  # upscale filter: NEAREST (blocky) or SMOOTH (bilinear)
 
 GREEN = (0, 255, 120)
 BLACK = (0, 0, 0)
 
+FPS = 60  # frame rate while something animates; idle frames wait for events
+
 FONT_NAME = "Menlo"
 FONT_SIZE = 24
 
 TOP_MARGIN = 60
 BOTTOM_MARGIN = 60
 LEFT_MARGIN = 80
+RIGHT_MARGIN = 80  # output wraps before this
+
+# CRT post-processing tier: (glow, scanlines, vignette)
+CRT_TIERS = {
+    "OFF": (False, False, False),
+    "LOW": (False, True, False),
+    "MEDIUM": (False, True, True),
+    "HIGH": (True, True, True),
+}
+CRT_QUALITY = "HIGH"
+CRT_FADE_S = 0.4  # deferred CRT mask fades in over this long once built
+
+LINE_CACHE_SIZE = 256  # rendered line surfaces kept by the terminal
+USE_GLYPH_ATLAS = False  # build lines from cached glyphs (monospace fonts only)
+
+SCROLLBACK_LINES = 5000  # ring capacity for Terminal.lines
+SCROLLBACK_CHARS = 1_000_000  # memory cap: oldest lines drop past this many chars
+
+TELETYPE_BAUD = 2400  # output speed (8N1, so 240 chars/s); 0 prints instantly
+TELETYPE_BUDGET_MS = 2  # most time per frame spent moving output to the screen
+TELETYPE_BACKLOG = 4000  # queued chars before producers are held back
+
+VIGNETTE_FALLOFF = 1.6  # radial exponent
+VIGNETTE_FLOOR = 90  # brightness left at the corners (0-255)
+
+SELFPLAY_BUDGET_MS = 4  # per-frame slice for tic-tac-toe self-play
+SELFPLAY_REPORT_S = 0.5  # how often self-play results are printed
+
+BOARD_MOVE_BUDGET_S = 1.0  # WOPR think time per move on larger boards
+BOARD_SLICE_MS = 8  # search time per frame, so input never freezes
+MAZE_CELL_PX = 12  # starting zoom for FALKEN'S MAZE (+/- change it)
+MAZE_SLICE_MS = 8  # generation/solve time per frame
+GTW_SCENARIOS = 200_000  # strategic-model runs before WOPR concludes
+GTW_BATCH = 2000  # scenarios per worker task
+GTW_REPORT_S = 0.5  # how often model progress is printed
+CHESS_MOVETIME_S = 2.0  # WOPR think time per chess move (LEVEL changes it)
+POKER_STACK = 1000  # chips each at the start of a match
+POKER_BLINDS = (10, 20)  # small, big; bets are one big blind, two from the turn
+POKER_ROLLOUTS = 1_000_000  # Monte Carlo boards behind each equity estimate
+POKER_BATCH = 50_000  # boards per worker task
+POKER_THINK_S = 1.0  # WOPR acts on the boards finished by then
+POKER_FALLBACK_ROLLOUTS = 2000  # in-process boards without NumPy or worker processes
+
+SERVER_HOST = "127.0.0.1"  # python -m wopr_term.server (--host 0.0.0.0 to expose it)
+SERVER_PORT = 2323
+SERVER_COLUMNS = 80  # remote output wraps at this width
+SERVER_TICK_HZ = 30  # busy sessions are stepped this often; idle ones twice a second
+SERVER_WRITE_LIMIT = 64 * 1024  # unsent bytes before a client's output is held back
+
+PROFILE_TRACE_PATH = "wopr_trace.json"  # PROFILE TRACE output (Chrome trace format)
+
+CACHE_DIR = os.environ.get(
+    "WOPR_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "wopr_term")
+)
 
-USE_GLOW = True
-USE_SCANLINES = True
-USE_VIGNETTE = True
+# opening book built with `python -m wopr_term.games.chess_book build`
+CHESS_BOOK_PATH = os.environ.get(
+    "WOPR_CHESS_BOOK", os.path.join(CACHE_DIR, "chess_book.bin")
+)
@@ -83,6 +83,12 @@ class MiniEngine:
     def quit(self):
         self.running = False
 
+    def resize(self, size):
+        pass  # pygame 2 resizes the RESIZABLE window surface itself
+
+    def toggle_fullscreen(self):
+        pygame.display.toggle_fullscreen()
+
     def loop(self):
         while self.running:
             events = pygame.event.get()
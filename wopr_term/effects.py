@@ -1,21 +1,121 @@
-
 # effects.py
 import math
+import os
 import pygame
-from .config import W, H
+from .config import VIGNETTE_FALLOFF, VIGNETTE_FLOOR, CACHE_DIR
+from .sizecache import SizeCache
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python fallback below
+    np = None
+
+_vignettes = SizeCache()  # in-process copies, keyed like the disk cache
+
+
+def make_vignette(size, falloff=VIGNETTE_FALLOFF, floor=VIGNETTE_FLOOR, cache=True):
+    """Radial multiply mask: 255 in the centre, `floor` in the corners."""
+    key = (tuple(size), falloff, floor)
+    return _vignettes.get(key, lambda: _build_vignette(key, cache))
+
+
+def _build_vignette(key, cache):
+    size, falloff, floor = key
+    path = _vignette_path(*key) if cache else None
+    surf = _load_vignette(path, size)
+    if surf is None:
+        if np is not None:
+            surf = _vignette_numpy(size, falloff, floor)
+        else:
+            surf = _vignette_python(size, falloff, floor)
+        if path:
+            _save_vignette(surf, path)
+    return surf
+
 
-def make_vignette(size):
+def _vignette_numpy(size, falloff, floor):
     w, h = size
+    cx, cy = w // 2, h // 2
+    max_r = math.hypot(cx, cy)
+    # surfarray is indexed [x, y]
+    dx = np.arange(w, dtype=np.float64)[:, None] - cx
+    dy = np.arange(h, dtype=np.float64)[None, :] - cy
+    r = np.hypot(dx, dy)
+    k = (255 - (255 - floor) * (r / max_r) ** falloff).astype(np.uint8)
+
     surf = pygame.Surface(size, pygame.SRCALPHA)
+    rgb = pygame.surfarray.pixels3d(surf)
+    rgb[...] = k[:, :, None]
+    del rgb  # unlock the surface
+    alpha = pygame.surfarray.pixels_alpha(surf)
+    alpha[...] = 255
+    del alpha
+    return surf
+
+
+def _vignette_python(size, falloff, floor):
+    # The mask only depends on |dx| and |dy|, so each distinct row is built
+    # once and every pixel value is a table lookup.
+    w, h = size
     cx, cy = w // 2, h // 2
     max_r = math.hypot(cx, cy)
+    span = 255 - floor
+    dxs = [abs(x - cx) for x in range(w)]
+    rows = {}
+    buf = bytearray()
     for y in range(h):
-        for x in range(w):
-            r = math.hypot(x - cx, y - cy)
-            k = int(255 - (165 * (r / max_r) ** 1.6))  # 255 → ~90 at edges
-            surf.set_at((x, y), (k, k, k, 255))
-    return surf
+        dy = abs(y - cy)
+        row = rows.get(dy)
+        if row is None:
+            ks = {}
+            for dx in set(dxs):
+                k = int(255 - span * (math.hypot(dx, dy) / max_r) ** falloff)
+                ks[dx] = bytes((k, k, k, 255))
+            row = rows[dy] = b"".join(ks[dx] for dx in dxs)
+        buf += row
+    return pygame.image.fromstring(bytes(buf), size, "RGBA")
+
+
+def _vignette_path(size, falloff, floor):
+    w, h = size
+    return os.path.join(CACHE_DIR, f"vignette_{w}x{h}_f{falloff:g}_e{floor}.png")
+
 
-def draw_scanlines(target):
-    for y in range(0, H, 2):
-        pygame.draw.line(target, (0, 20, 0), (0, y), (W, y), 1)
+def _load_vignette(path, size):
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        img = pygame.image.load(path)
+    except (pygame.error, OSError):
+        return None
+    if img.get_size() != tuple(size):
+        return None
+    # convert_alpha needs a display; keep the raw image in headless runs
+    return img.convert_alpha() if pygame.display.get_surface() else img
+
+
+def _save_vignette(surf, path):
+    # the cache is an optimisation only, so a read-only home is not an error
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.png"
+        pygame.image.save(surf, tmp)
+        os.replace(tmp, path)
+    except (pygame.error, OSError):
+        pass
+
+
+def make_scanlines(size, level=(0, 20, 0)):
+    """Every other row painted `level`, as a (multiply, add) pair of layers.
+
+    Multiplying by the first blanks the rows and adding the second paints
+    them in, the same as drawing over them (built once, not per frame).
+    """
+    w, h = size
+    mult = pygame.Surface(size, pygame.SRCALPHA)
+    mult.fill((255, 255, 255, 255))
+    add = pygame.Surface(size)  # black elsewhere: adds nothing
+    for y in range(0, h, 2):
+        mult.fill((0, 0, 0, 255), (0, y, w, 1))
+        add.fill(level, (0, y, w, 1))
+    return mult, add
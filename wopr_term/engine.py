@@ -2,38 +2,244 @@
 # engine.py
 import pygame
 from .terminal import Terminal
-from .effects import make_vignette
-from .config import W, H, FONT_NAME, FONT_SIZE, USE_VIGNETTE
+from .postfx import PostFX
+from .profiler import PROFILER
+from .input import InputDispatcher
+from .framebuffer import Framebuffer
+from .config import W, H, FONT_NAME, FONT_SIZE, FPS, RESIZABLE, FULLSCREEN
 
 class State:
+    remote = True  # False: needs the local window (graphics, local workers)
+
     def __init__(self, engine):
         self.engine = engine
         self.term = engine.term
 
+    @classmethod
+    def parse_args(cls, args):
+        """State args from the words after PLAY <NAME>; ValueError(usage) if bad."""
+        if args:
+            raise ValueError("NO OPTIONS FOR THIS GAME.")
+        return ()
+
     def enter(self):
         pass
 
     def handle_events(self, events):
+        # the one input loop; states override the on_* hooks below
+        for e in events:
+            if self.engine.state is not self:
+                break  # a handler switched states; the rest was meant for us
+            if e.type == pygame.QUIT:
+                self.engine.quit()
+            elif e.type == pygame.TEXTINPUT:
+                self.on_text(e.text)
+            elif e.type == pygame.KEYDOWN:
+                if e.key == pygame.K_F11:
+                    self.engine.toggle_fullscreen()
+                else:
+                    self.on_key(e)
+            elif e.type == pygame.VIDEORESIZE:
+                self.engine.resize((e.w, e.h))
+
+    def on_text(self, text):
+        self.term.handle_textinput(text)
+
+    def on_key(self, e):
+        if e.key == pygame.K_ESCAPE:
+            self.on_escape()
+            return
+        entry = self.term.handle_keydown(e.key)
+        if entry is not None:
+            self.on_command(entry)
+
+    def on_escape(self):
+        self.engine.home()
+
+    def on_command(self, line):
+        """A line the player entered (Enter pressed), unstripped."""
+        pass
+
+    def on_resize(self, size):
         pass
 
     def update(self, dt):
         pass
 
+    def is_animating(self):
+        # True while the state needs frames at full rate (timers, animations)
+        return False
+
     def draw(self, screen):
-        self.term.draw(screen, self.engine.vignette)
+        # dirty rects for Engine.present; None means "present the whole screen"
+        return self.term.draw(screen, self.engine.postfx)
 
-class Engine:
-    def __init__(self, screen, font):
-        self.screen = screen
-        self.font = font
-        self.term = Terminal(font)
-        self.vignette = make_vignette((W, H)) if USE_VIGNETTE else None
+class FrameScheduler:
+    """Decides when the next frame runs.
+
+    While the state animates it ticks at FPS; otherwise it sleeps on the
+    event queue until input arrives or the cursor is due to blink.
+    """
+
+    def __init__(self, engine, fps=FPS):
+        self.engine = engine
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+
+    def next_frame(self):
+        engine = self.engine
+        if (
+            engine.state.is_animating()
+            or engine.postfx.warming
+            or engine.term.output.busy
+        ):
+            dt = self.clock.tick(self.fps)
+            with PROFILER.phase("events"):
+                events = engine.input.process(pygame.event.get())
+        else:
+            timeout = max(1, int(engine.term.next_blink_in() * 1000) + 1)
+            first = pygame.event.wait(timeout)
+            with PROFILER.phase("events"):
+                events = [] if first.type == pygame.NOEVENT else [first]
+                events += pygame.event.get()
+                events = engine.input.process(events)
+            dt = self.clock.tick()
+        if engine.input.exposed:
+            engine.input.exposed = False
+            engine.expose()
+        return dt / 1000.0, events
+
+
+class StateMachine:
+    """A terminal and the current state: everything a State needs, no display.
+
+    Engine adds the pygame window; the remote server runs one of these per
+    connected client.
+    """
+
+    local = True  # False for a telnet session (wopr_term.server)
+
+    def __init__(self, term):
+        self.term = term
         self.running = True
         self.state = None
+        self.tape = None  # session recorder or replay (see session.py)
 
     def set_state(self, state_cls, *args, **kwargs):
         self.state = state_cls(self, *args, **kwargs)
+        self.term.invalidate()
         self.state.enter()
 
+    def home(self):
+        # back to the WOPR prompt (imported here: the prompt module imports engine)
+        from .states.prompt import PromptState
+        self.set_state(PromptState)
+
     def quit(self):
         self.running = False
+
+    def host_only(self):
+        """May something that uses the host (its window, cores or files) run?"""
+        return self.local
+
+    def background(self, key, value):
+        """A result of background work (pool, search process) a state will act on.
+
+        Falsy means nothing arrived this frame. A session log records it
+        against the frame; a replay returns the recorded value instead, so
+        results that came in on wall-clock time reproduce exactly.
+        """
+        if self.tape is None:
+            return value
+        return self.tape(key, value)
+
+    # no window to change here; Engine has one
+    def resize(self, size):
+        pass
+
+    def toggle_fullscreen(self):
+        pass
+
+
+def open_window(size=(W, H), fullscreen=FULLSCREEN):
+    if fullscreen:
+        return pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    flags = pygame.RESIZABLE if RESIZABLE else 0
+    screen = pygame.display.set_mode(size, flags)
+    if screen.get_size() != tuple(size):
+        # SDL can keep the fullscreen surface when leaving fullscreen for the
+        # size the window had before; asking again applies it
+        screen = pygame.display.set_mode(size, flags)
+    return screen
+
+
+class Engine(StateMachine):
+    def __init__(self, screen, font, defer_effects=False, render_scale=1,
+                 render_filter="NEAREST"):
+        # render_scale N: states draw into self.screen, a frame 1/N the size
+        # of the window, and present() upscales it; pass a font 1/N the size
+        self.framebuffer = Framebuffer(render_scale, render_filter)
+        self.window = screen
+        self.screen = self.framebuffer.frame_for(screen)
+        super().__init__(Terminal(font, self.screen.get_size(), render_scale))
+        self.font = font
+        self.fullscreen = bool(screen.get_flags() & pygame.FULLSCREEN)
+        self._windowed = (W, H) if self.fullscreen else screen.get_size()
+        # defer_effects: show frames straight away, CRT mask fades in when built
+        self.postfx = PostFX(self.screen.get_size(), defer=defer_effects)
+        self.input = InputDispatcher()
+        self.input.install()
+        self.scheduler = FrameScheduler(self)
+        self._flip = False  # next present sends the whole frame
+
+    def resize(self, size):
+        """The window changed size (VIDEORESIZE): lay everything out again.
+
+        Layouts, buffers and masks are cached per size, so going back to a
+        size seen recently only swaps them in.
+        """
+        if not self.fullscreen and self.window.get_size() != tuple(size):
+            # pygame 2 already resized a RESIZABLE window; replays still need this
+            open_window(size)
+        self._relayout()
+
+    def toggle_fullscreen(self):
+        if not self.fullscreen:
+            self._windowed = self.window.get_size()
+        self.fullscreen = not self.fullscreen
+        open_window(self._windowed, self.fullscreen)
+        self._relayout()
+
+    def _relayout(self):
+        self.window = pygame.display.get_surface()
+        self.screen = self.framebuffer.frame_for(self.window)
+        size = self.screen.get_size()
+        self.term.resize(size)
+        self.postfx.resize(size)
+        if self.state is not None:
+            self.state.on_resize(size)
+
+    def expose(self):
+        """The window was uncovered or restored: redraw and present all of it."""
+        self.term.invalidate()
+        self._flip = True
+
+    def present(self, rects):
+        # the only place a frame reaches the display
+        self.input.stamp()
+        if self._flip:
+            self._flip = False
+            rects = None
+        if PROFILER.overlay:
+            overlay = PROFILER.draw_overlay(self.screen, self.font)
+            if rects is not None:
+                rects = rects + [overlay]
+        if self.screen is not self.window:
+            with PROFILER.phase("upscale"):
+                rects = self.framebuffer.upscale(self.screen, self.window, rects)
+        with PROFILER.phase("present"):
+            if rects is None:
+                pygame.display.flip()
+            elif rects:
+                pygame.display.update(rects)
+        self.input.presented(rects is None or bool(rects))
@@ -0,0 +1,77 @@
+# framebuffer.py
+"""
+Render scale: draw the frame small, upscale it once.
+
+With RENDER_SCALE = N the states, the terminal and the CRT stage all draw
+into a framebuffer 1/N the size of the window (with a font 1/N the size),
+so every per-pixel cost (text, glow, mask) shrinks about N*N times. The
+engine then upscales it into the window while presenting:
+
+    NEAREST  pygame.transform.scale: every pixel becomes an N x N block.
+             Only the dirty rects are scaled, each straight into its
+             place in the window.
+    SMOOTH   pygame.transform.smoothscale (bilinear): softer, closer to
+             a real tube. smoothscale samples a sub-region at different
+             positions than the whole frame, so scaled rects would show
+             seams; any change rescales the whole frame instead (about
+             3 ms for 960x720 here).
+
+With N = 1 the framebuffer is the window itself and nothing is scaled.
+"""
+
+import pygame
+
+from .config import RENDER_SCALE, RENDER_FILTER
+from .sizecache import SizeCache
+
+FILTERS = ("NEAREST", "SMOOTH")
+
+
+class Framebuffer:
+    def __init__(self, scale=RENDER_SCALE, filter=RENDER_FILTER):
+        filter = filter.upper()
+        if filter not in FILTERS:
+            raise ValueError(f"unknown render filter {filter!r}")
+        if int(scale) != scale or scale < 1:
+            raise ValueError(f"render scale must be a whole number >= 1, not {scale}")
+        self.scale = int(scale)
+        self.filter = filter
+        self._frames = SizeCache()
+
+    def frame_for(self, window):
+        """The surface to draw into for `window` (the window itself at scale 1)."""
+        if self.scale == 1:
+            return window
+        w, h = window.get_size()
+        size = (max(1, w // self.scale), max(1, h // self.scale))
+        return self._frames.get(size, lambda: pygame.Surface(size).convert(window))
+
+    def upscale(self, frame, window, rects):
+        """Copy the dirty `rects` of `frame` into `window`; returns the window rects.
+
+        rects is None for "the whole frame", as in Engine.present.
+        """
+        if frame is window:
+            return rects
+        n = self.scale
+        full = rects is None
+        if self.filter == "SMOOTH":
+            if full or rects:
+                w, h = frame.get_size()
+                dest = pygame.Rect(0, 0, w * n, h * n)
+                pygame.transform.smoothscale(frame, dest.size, window.subsurface(dest))
+                rects = None if full else [dest]
+            return rects
+        if full:
+            rects = [frame.get_rect()]
+        out = []
+        for r in rects:
+            r = r.clip(frame.get_rect())
+            if r:
+                # scaled straight into the window, no intermediate surface
+                dest = pygame.Rect(r.x * n, r.y * n, r.w * n, r.h * n)
+                pygame.transform.scale(
+                    frame.subsurface(r), dest.size, window.subsurface(dest)
+                )
+                out.append(dest)
+        return None if full else out
@@ -0,0 +1,299 @@
+# games/board.py
+"""
+N x N boards with k-in-a-row wins (tic-tac-toe up to gomoku-sized variants).
+
+Every length-k window on the board is precomputed, and each cell knows
+the windows through it. play()/undo() update per-window stone counts for
+just those windows, which gives both incremental win detection and an
+incremental evaluation score. Search is iterative-deepening alpha-beta
+run as a generator, so the caller can give it a few milliseconds per
+frame and keep the render loop responsive.
+"""
+
+import random
+import time
+from array import array
+
+EMPTY, X, O = 0, 1, 2
+MARKS = {EMPTY: " ", X: "X", O: "O"}
+WIN_SCORE = 1_000_000
+
+_geometry = {}  # (n, k) -> (windows, cell_windows, zobrist)
+
+
+def _build_geometry(n, k):
+    windows = []
+    for r in range(n):
+        for c in range(n):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                er, ec = r + dr * (k - 1), c + dc * (k - 1)
+                if 0 <= er < n and 0 <= ec < n:
+                    windows.append(
+                        tuple((r + dr * i) * n + c + dc * i for i in range(k))
+                    )
+    cell_windows = [[] for _ in range(n * n)]
+    for w, cells in enumerate(windows):
+        for idx in cells:
+            cell_windows[idx].append(w)
+    rng = random.Random(n * 1000 + k)
+    zobrist = [(0, rng.getrandbits(64), rng.getrandbits(64)) for _ in range(n * n)]
+    return windows, [tuple(ws) for ws in cell_windows], zobrist
+
+
+class Board:
+    def __init__(self, n=3, k=None):
+        self.n = n
+        self.k = k or n
+        if self.k > n:
+            raise ValueError(f"k={self.k} does not fit on a {n}x{n} board")
+        key = (n, self.k)
+        if key not in _geometry:
+            _geometry[key] = _build_geometry(n, self.k)
+        self.windows, self.cell_windows, self._zobrist = _geometry[key]
+        # weight of a window holding c stones of one side and none of the other
+        self.weights = [0] + [4**c for c in range(1, self.k)] + [WIN_SCORE]
+        self.reset()
+
+    def reset(self):
+        size = self.n * self.n
+        self.cells = bytearray(size)
+        nw = len(self.windows)
+        # per-window stone counts, indexed by side (X, O)
+        self.counts = (None, array("b", bytes(nw)), array("b", bytes(nw)))
+        self.moves = []
+        self.winner = EMPTY
+        self.score = 0  # from X's point of view
+        self.hash = 0
+
+    def copy(self):
+        b = Board.__new__(Board)
+        b.__dict__.update(self.__dict__)
+        b.cells = bytearray(self.cells)
+        b.counts = (None, array("b", self.counts[X]), array("b", self.counts[O]))
+        b.moves = list(self.moves)
+        return b
+
+    # --- queries ---
+    @property
+    def turn(self):
+        return X if len(self.moves) % 2 == 0 else O
+
+    def full(self):
+        return len(self.moves) == len(self.cells)
+
+    def over(self):
+        return self.winner != EMPTY or self.full()
+
+    def at(self, r, c):
+        return self.cells[r * self.n + c]
+
+    def masks(self):
+        x = o = 0
+        for i, v in enumerate(self.cells):
+            if v == X:
+                x |= 1 << i
+            elif v == O:
+                o |= 1 << i
+        return x, o
+
+    def load_masks(self, x, o):
+        """Replace the position with bitmasks (stones are added X, O, X, ...)."""
+        self.reset()
+        xs = [i for i in range(len(self.cells)) if x >> i & 1]
+        os_ = [i for i in range(len(self.cells)) if o >> i & 1]
+        for i in range(max(len(xs), len(os_))):
+            if i < len(xs):
+                self._put(xs[i], X)
+            if i < len(os_):
+                self._put(os_[i], O)
+
+    def candidates(self, radius=2):
+        """Empty cells worth searching: all on small boards, else near stones."""
+        n, cells = self.n, self.cells
+        if n <= 4:
+            return [i for i in range(n * n) if not cells[i]]
+        if not self.moves:
+            return [(n // 2) * n + n // 2]
+        seen = set()
+        out = []
+        for m in self.moves:
+            r0, c0 = divmod(m, n)
+            for r in range(max(0, r0 - radius), min(n, r0 + radius + 1)):
+                base = r * n
+                for c in range(max(0, c0 - radius), min(n, c0 + radius + 1)):
+                    i = base + c
+                    if not cells[i] and i not in seen:
+                        seen.add(i)
+                        out.append(i)
+        return out
+
+    # --- moves ---
+    def play(self, idx):
+        if self.cells[idx] or self.winner:
+            raise ValueError(f"illegal move {idx}")
+        self._put(idx, self.turn)
+
+    def _put(self, idx, side):
+        other = O if side == X else X
+        mine, theirs = self.counts[side], self.counts[other]
+        weights, sign = self.weights, 1 if side == X else -1
+        delta = 0
+        for w in self.cell_windows[idx]:
+            t = theirs[w]
+            m = mine[w]
+            if t == 0:
+                # our window grows
+                delta += weights[m + 1] - weights[m]
+            elif m == 0:
+                # their window is now dead
+                delta += weights[t]
+            mine[w] = m + 1
+            if m + 1 == self.k:
+                self.winner = side
+        self.score += sign * delta
+        self.cells[idx] = side
+        self.hash ^= self._zobrist[idx][side]
+        self.moves.append(idx)
+
+    def undo(self):
+        idx = self.moves.pop()
+        side = self.cells[idx]
+        other = O if side == X else X
+        mine, theirs = self.counts[side], self.counts[other]
+        weights, sign = self.weights, 1 if side == X else -1
+        delta = 0
+        for w in self.cell_windows[idx]:
+            m = mine[w] - 1
+            mine[w] = m
+            t = theirs[w]
+            if t == 0:
+                delta += weights[m + 1] - weights[m]
+            elif m == 0:
+                delta += weights[t]
+        self.score -= sign * delta
+        self.cells[idx] = EMPTY
+        self.hash ^= self._zobrist[idx][side]
+        self.winner = EMPTY
+
+    def evaluate(self):
+        """Static score for the side to move."""
+        return self.score if self.turn == X else -self.score
+
+
+class Search:
+    """Iterative-deepening alpha-beta for the side to move, run in slices.
+
+    Call step(slice_seconds) once per frame; it returns None until the
+    per-move budget (or max_depth) is exhausted, then the chosen move.
+    """
+
+    def __init__(self, board, budget=1.0, max_depth=None):
+        self.board = board
+        self.budget = budget
+        self.max_depth = max_depth or len(board.cells) - len(board.moves)
+        self.best = None
+        self.depth = 0
+        self.nodes = 0
+        self.tt = {}
+        self._deadline = None
+        self._gen = None
+        self._done = False
+
+    def step(self, slice_s):
+        if self._done:
+            return self.best
+        now = time.perf_counter()
+        if self._gen is None:
+            self._deadline = now + self.budget
+            self._gen = self._iterate()
+        stop = min(now + slice_s, self._deadline)
+        try:
+            while time.perf_counter() < stop:
+                next(self._gen)
+        except StopIteration:
+            self._done = True
+        if time.perf_counter() >= self._deadline:
+            self._done = True
+        if self._done and self.best is None:
+            self.best = self.board.candidates()[0]
+        return self.best if self._done else None
+
+    def run(self):
+        """Blocking search (tests, tools): returns the chosen move."""
+        while True:
+            move = self.step(self.budget)
+            if move is not None:
+                return move
+
+    def _iterate(self):
+        board = self.board
+        for depth in range(1, self.max_depth + 1):
+            moves = self._ordered(board.candidates())
+            best, best_val = None, -WIN_SCORE * 2
+            alpha, beta = -WIN_SCORE * 2, WIN_SCORE * 2
+            for m in moves:
+                board.play(m)
+                if board.winner:
+                    val = WIN_SCORE + 1000
+                else:
+                    val = -(yield from self._negamax(depth - 1, -beta, -alpha, 1))
+                board.undo()
+                if val > best_val:
+                    best, best_val = m, val
+                alpha = max(alpha, val)
+            # only complete iterations are trusted
+            self.best, self.depth = best, depth
+            if best_val >= WIN_SCORE:
+                return
+
+    def _ordered(self, moves):
+        if self.best in moves:
+            moves.remove(self.best)
+            moves.insert(0, self.best)
+        return moves
+
+    def _negamax(self, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 63 == 0:
+            yield  # hand control back to the caller's time check
+        board = self.board
+        if board.full():
+            return 0
+        if depth == 0:
+            return board.evaluate()
+
+        key = board.hash
+        entry = self.tt.get(key)
+        tt_move = None
+        if entry is not None:
+            e_depth, e_val, e_flag, tt_move = entry
+            if e_depth >= depth:
+                if e_flag == 0:
+                    return e_val
+                if e_flag < 0 and e_val <= alpha:
+                    return e_val
+                if e_flag > 0 and e_val >= beta:
+                    return e_val
+
+        moves = board.candidates()
+        if tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        alpha0 = alpha
+        best_val, best_move = -WIN_SCORE * 2, None
+        for m in moves:
+            board.play(m)
+            if board.winner:
+                val = WIN_SCORE + 1000 - ply  # prefer faster wins
+            else:
+                val = -(yield from self._negamax(depth - 1, -beta, -alpha, ply + 1))
+            board.undo()
+            if val > best_val:
+                best_val, best_move = val, m
+            if val > alpha:
+                alpha = val
+            if alpha >= beta:
+                break
+        flag = -1 if best_val <= alpha0 else (1 if best_val >= beta else 0)
+        self.tt[key] = (depth, best_val, flag, best_move)
+        return best_val
@@ -0,0 +1,572 @@
+# games/chess.py
+"""
+Bitboard chess core: position, legal move generation, make/unmake,
+Zobrist hashing, FEN, UCI and SAN notation, and a perft benchmark.
+
+Squares are 0..63 with a1 = 0, h8 = 63. A move is a packed int:
+from | to << 6 | promotion piece << 12 | flags << 15.
+
+    python -m wopr_term.games.chess perft 4
+    python -m wopr_term.games.chess perft 3 --fen "<fen>" --divide
+"""
+
+import random
+import time
+
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+PIECE_CHARS = "PNBRQK"
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# move flags
+DOUBLE_PUSH, EN_PASSANT, CASTLE = 1, 2, 4
+
+# castling rights bits
+WK, WQ, BK, BQ = 1, 2, 4, 8
+
+
+def square(name):
+    return (int(name[1]) - 1) * 8 + "abcdefgh".index(name[0])
+
+
+def square_name(sq):
+    return "abcdefgh"[sq & 7] + str((sq >> 3) + 1)
+
+
+def make_move(frm, to, promo=0, flags=0):
+    return frm | to << 6 | promo << 12 | flags << 15
+
+
+def move_from(m):
+    return m & 63
+
+
+def move_to(m):
+    return m >> 6 & 63
+
+
+def move_promo(m):
+    return m >> 12 & 7
+
+
+def move_flags(m):
+    return m >> 15
+
+
+def bits(bb):
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+# --- attack tables -------------------------------------------------------
+
+
+def _leaper(deltas):
+    table = []
+    for sq in range(64):
+        r, f = sq >> 3, sq & 7
+        bb = 0
+        for dr, df in deltas:
+            rr, ff = r + dr, f + df
+            if 0 <= rr < 8 and 0 <= ff < 8:
+                bb |= 1 << (rr * 8 + ff)
+        table.append(bb)
+    return table
+
+
+KNIGHT_ATT = _leaper(
+    [(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)]
+)
+KING_ATT = _leaper(
+    [(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)]
+)
+PAWN_ATT = (_leaper([(1, -1), (1, 1)]), _leaper([(-1, -1), (-1, 1)]))
+
+# ray directions; the first four run towards higher square numbers
+N, E, NE, NW, S, W, SE, SW = range(8)
+_DIRS = [(1, 0), (0, 1), (1, 1), (1, -1), (-1, 0), (0, -1), (-1, 1), (-1, -1)]
+RAYS = [[0] * 64 for _ in range(8)]
+for _d, (_dr, _df) in enumerate(_DIRS):
+    for _sq in range(64):
+        _r, _f, _bb = (_sq >> 3) + _dr, (_sq & 7) + _df, 0
+        while 0 <= _r < 8 and 0 <= _f < 8:
+            _bb |= 1 << (_r * 8 + _f)
+            _r, _f = _r + _dr, _f + _df
+        RAYS[_d][_sq] = _bb
+ROOK_DIRS = (N, E, S, W)
+BISHOP_DIRS = (NE, NW, SE, SW)
+
+
+def slide(sq, occ, dirs):
+    att = 0
+    for d in dirs:
+        ray = RAYS[d][sq]
+        blockers = ray & occ
+        if blockers:
+            if d < 4:
+                b = (blockers & -blockers).bit_length() - 1
+            else:
+                b = blockers.bit_length() - 1
+            ray ^= RAYS[d][b]
+        att |= ray
+    return att
+
+
+# castling rights that survive a move touching each square
+CASTLE_KEEP = [15] * 64
+CASTLE_KEEP[square("e1")] = 15 & ~(WK | WQ)
+CASTLE_KEEP[square("h1")] = 15 & ~WK
+CASTLE_KEEP[square("a1")] = 15 & ~WQ
+CASTLE_KEEP[square("e8")] = 15 & ~(BK | BQ)
+CASTLE_KEEP[square("h8")] = 15 & ~BK
+CASTLE_KEEP[square("a8")] = 15 & ~BQ
+
+# rook hop for each castling king destination
+CASTLE_ROOK = {
+    square("g1"): (square("h1"), square("f1")),
+    square("c1"): (square("a1"), square("d1")),
+    square("g8"): (square("h8"), square("f8")),
+    square("c8"): (square("a8"), square("d8")),
+}
+
+# --- Zobrist keys (fixed seed: hashes are stable across runs and files) ---
+_rng = random.Random(0x574F5052)  # "WOPR"
+Z_PIECE = [[_rng.getrandbits(64) for _ in range(64)] for _ in range(12)]
+Z_CASTLE = [_rng.getrandbits(64) for _ in range(16)]
+Z_EP = [_rng.getrandbits(64) for _ in range(8)]
+Z_SIDE = _rng.getrandbits(64)
+
+
+class Position:
+    """Mutable position; make()/unmake() update it in place (no copying)."""
+
+    def __init__(self, fen=START_FEN):
+        self.set_fen(fen)
+
+    # --- setup ---
+    def set_fen(self, fen):
+        parts = fen.split()
+        self.bb = [0] * 12  # color * 6 + piece type
+        self.occ = [0, 0]
+        self.board = [-1] * 64
+        self.hash = 0
+        self.stack = []
+        rank, file = 7, 0
+        for ch in parts[0]:
+            if ch == "/":
+                rank, file = rank - 1, 0
+            elif ch.isdigit():
+                file += int(ch)
+            else:
+                color = WHITE if ch.isupper() else BLACK
+                self._put(color * 6 + PIECE_CHARS.index(ch.upper()), rank * 8 + file)
+                file += 1
+        self.side = WHITE if parts[1] == "w" else BLACK
+        self.castling = 0
+        for ch, bit in (("K", WK), ("Q", WQ), ("k", BK), ("q", BQ)):
+            if ch in parts[2]:
+                self.castling |= bit
+        self.ep = square(parts[3]) if parts[3] != "-" else -1
+        self.halfmove = int(parts[4]) if len(parts) > 4 else 0
+        self.fullmove = int(parts[5]) if len(parts) > 5 else 1
+        self.hash ^= Z_CASTLE[self.castling] ^ self._ep_key()
+        if self.side == BLACK:
+            self.hash ^= Z_SIDE
+
+    def fen(self):
+        rows = []
+        for rank in range(7, -1, -1):
+            row, empty = "", 0
+            for file in range(8):
+                p = self.board[rank * 8 + file]
+                if p < 0:
+                    empty += 1
+                    continue
+                if empty:
+                    row, empty = row + str(empty), 0
+                ch = PIECE_CHARS[p % 6]
+                row += ch if p < 6 else ch.lower()
+            rows.append(row + (str(empty) if empty else ""))
+        castling = "".join(
+            ch for ch, bit in (("K", WK), ("Q", WQ), ("k", BK), ("q", BQ))
+            if self.castling & bit
+        )
+        return " ".join(
+            [
+                "/".join(rows),
+                "w" if self.side == WHITE else "b",
+                castling or "-",
+                square_name(self.ep) if self.ep >= 0 else "-",
+                str(self.halfmove),
+                str(self.fullmove),
+            ]
+        )
+
+    def copy(self):
+        # for handing a position to another thread or process
+        return Position(self.fen())
+
+    # --- board primitives ---
+    def _put(self, piece, sq):
+        bit = 1 << sq
+        self.bb[piece] |= bit
+        self.occ[piece // 6] |= bit
+        self.board[sq] = piece
+        self.hash ^= Z_PIECE[piece][sq]
+
+    def _remove(self, sq):
+        piece = self.board[sq]
+        bit = 1 << sq
+        self.bb[piece] ^= bit
+        self.occ[piece // 6] ^= bit
+        self.board[sq] = -1
+        self.hash ^= Z_PIECE[piece][sq]
+        return piece
+
+    def _ep_key(self):
+        # hash the en passant file only when a capture there is possible, so
+        # the same position always gets the same key however it was reached
+        ep, side = self.ep, self.side
+        if ep >= 0 and PAWN_ATT[side ^ 1][ep] & self.bb[side * 6 + PAWN]:
+            return Z_EP[ep & 7]
+        return 0
+
+    # --- attacks ---
+    def attacked(self, sq, by):
+        bb = self.bb
+        base = by * 6
+        if PAWN_ATT[by ^ 1][sq] & bb[base + PAWN]:
+            return True
+        if KNIGHT_ATT[sq] & bb[base + KNIGHT]:
+            return True
+        if KING_ATT[sq] & bb[base + KING]:
+            return True
+        occ = self.occ[0] | self.occ[1]
+        bq = bb[base + BISHOP] | bb[base + QUEEN]
+        if bq and slide(sq, occ, BISHOP_DIRS) & bq:
+            return True
+        rq = bb[base + ROOK] | bb[base + QUEEN]
+        if rq and slide(sq, occ, ROOK_DIRS) & rq:
+            return True
+        return False
+
+    def king_square(self, color):
+        return self.bb[color * 6 + KING].bit_length() - 1
+
+    def in_check(self, color=None):
+        color = self.side if color is None else color
+        return self.attacked(self.king_square(color), color ^ 1)
+
+    # --- move generation ---
+    def pseudo_moves(self):
+        us, them = self.side, self.side ^ 1
+        bb, board = self.bb, self.board
+        own, opp = self.occ[us], self.occ[them]
+        occ = own | opp
+        base = us * 6
+        moves = []
+        add = moves.append
+
+        step = 8 if us == WHITE else -8
+        start_rank, promo_rank = (1, 7) if us == WHITE else (6, 0)
+        for s in bits(bb[base + PAWN]):
+            t = s + step
+            if board[t] < 0:
+                if t >> 3 == promo_rank:
+                    for p in (QUEEN, ROOK, BISHOP, KNIGHT):
+                        add(s | t << 6 | p << 12)
+                else:
+                    add(s | t << 6)
+                    if s >> 3 == start_rank and board[t + step] < 0:
+                        add(s | (t + step) << 6 | DOUBLE_PUSH << 15)
+            for t in bits(PAWN_ATT[us][s] & opp):
+                if t >> 3 == promo_rank:
+                    for p in (QUEEN, ROOK, BISHOP, KNIGHT):
+                        add(s | t << 6 | p << 12)
+                else:
+                    add(s | t << 6)
+            if self.ep >= 0 and PAWN_ATT[us][s] >> self.ep & 1:
+                add(s | self.ep << 6 | EN_PASSANT << 15)
+
+        for s in bits(bb[base + KNIGHT]):
+            for t in bits(KNIGHT_ATT[s] & ~own):
+                add(s | t << 6)
+        for s in bits(bb[base + BISHOP]):
+            for t in bits(slide(s, occ, BISHOP_DIRS) & ~own):
+                add(s | t << 6)
+        for s in bits(bb[base + ROOK]):
+            for t in bits(slide(s, occ, ROOK_DIRS) & ~own):
+                add(s | t << 6)
+        for s in bits(bb[base + QUEEN]):
+            att = slide(s, occ, ROOK_DIRS) | slide(s, occ, BISHOP_DIRS)
+            for t in bits(att & ~own):
+                add(s | t << 6)
+        k = self.king_square(us)
+        for t in bits(KING_ATT[k] & ~own):
+            add(k | t << 6)
+
+        # castling: squares between empty, king not in or passing through check
+        kside, qside, home = (WK, WQ, 0) if us == WHITE else (BK, BQ, 56)
+        if self.castling & (kside | qside) and k == home + 4:
+            if (
+                self.castling & kside
+                and occ >> (home + 5) & 3 == 0
+                and not self.attacked(home + 4, them)
+                and not self.attacked(home + 5, them)
+                and not self.attacked(home + 6, them)
+            ):
+                add(k | (home + 6) << 6 | CASTLE << 15)
+            if (
+                self.castling & qside
+                and occ >> (home + 1) & 7 == 0
+                and not self.attacked(home + 4, them)
+                and not self.attacked(home + 3, them)
+                and not self.attacked(home + 2, them)
+            ):
+                add(k | (home + 2) << 6 | CASTLE << 15)
+        return moves
+
+    def legal_moves(self):
+        us = self.side
+        out = []
+        for m in self.pseudo_moves():
+            self.make(m)
+            if not self.attacked(self.king_square(us), us ^ 1):
+                out.append(m)
+            self.unmake()
+        return out
+
+    # --- make / unmake ---
+    def make(self, m):
+        frm, to = m & 63, m >> 6 & 63
+        promo, flags = m >> 12 & 7, m >> 15
+        us = self.side
+        self.stack.append(
+            (m, self.board[to], self.castling, self.ep, self.halfmove, self.hash)
+        )
+        self.hash ^= Z_CASTLE[self.castling] ^ Z_SIDE ^ self._ep_key()
+
+        piece = self._remove(frm)
+        self.halfmove += 1
+        if self.board[to] >= 0:
+            self._remove(to)
+            self.halfmove = 0
+        if piece % 6 == PAWN:
+            self.halfmove = 0
+            if flags & EN_PASSANT:
+                self._remove(to - 8 if us == WHITE else to + 8)
+        if promo:
+            piece = us * 6 + promo
+        self._put(piece, to)
+        if flags & CASTLE:
+            rf, rt = CASTLE_ROOK[to]
+            self._put(self._remove(rf), rt)
+
+        self.castling &= CASTLE_KEEP[frm] & CASTLE_KEEP[to]
+        self.ep = (frm + to) >> 1 if flags & DOUBLE_PUSH else -1
+        if us == BLACK:
+            self.fullmove += 1
+        self.side = us ^ 1
+        self.hash ^= Z_CASTLE[self.castling] ^ self._ep_key()
+
+    def unmake(self):
+        m, captured, castling, ep, halfmove, h = self.stack.pop()
+        frm, to = m & 63, m >> 6 & 63
+        promo, flags = m >> 12 & 7, m >> 15
+        us = self.side ^ 1
+        self.side = us
+        if us == BLACK:
+            self.fullmove -= 1
+
+        if flags & CASTLE:
+            rf, rt = CASTLE_ROOK[to]
+            self._put(self._remove(rt), rf)
+        piece = self._remove(to)
+        if promo:
+            piece = us * 6 + PAWN
+        self._put(piece, frm)
+        if captured >= 0:
+            self._put(captured, to)
+        elif flags & EN_PASSANT:
+            self._put((us ^ 1) * 6 + PAWN, to - 8 if us == WHITE else to + 8)
+
+        self.castling, self.ep, self.halfmove, self.hash = castling, ep, halfmove, h
+
+    def make_null(self):
+        # pass the move (search only); undone with unmake_null()
+        self.stack.append((None, -1, self.castling, self.ep, self.halfmove, self.hash))
+        self.hash ^= self._ep_key()
+        self.ep = -1
+        self.hash ^= Z_SIDE
+        self.side ^= 1
+
+    def unmake_null(self):
+        _, _, self.castling, self.ep, self.halfmove, self.hash = self.stack.pop()
+        self.side ^= 1
+
+    # --- game state ---
+    def is_capture(self, m):
+        return self.board[m >> 6 & 63] >= 0 or (m >> 15) & EN_PASSANT
+
+    def outcome(self):
+        """None while the game goes on, else "1-0", "0-1" or "1/2-1/2"."""
+        if not self.legal_moves():
+            if self.in_check():
+                return "0-1" if self.side == WHITE else "1-0"
+            return "1/2-1/2"
+        if self.halfmove >= 100 or self.repetitions() >= 3:
+            return "1/2-1/2"
+        return None
+
+    def repetitions(self):
+        count = 1
+        for entry in reversed(self.stack[-self.halfmove :] if self.halfmove else []):
+            if entry[5] == self.hash:
+                count += 1
+        return count
+
+    # --- notation ---
+    def uci(self, m):
+        s = square_name(m & 63) + square_name(m >> 6 & 63)
+        promo = m >> 12 & 7
+        return s + PIECE_CHARS[promo].lower() if promo else s
+
+    def san(self, m, suffix=True):
+        frm, to = m & 63, m >> 6 & 63
+        piece = self.board[frm] % 6
+        if m >> 15 & CASTLE:
+            text = "O-O" if to & 7 == 6 else "O-O-O"
+        elif piece == PAWN:
+            text = ""
+            if self.is_capture(m):
+                text = "abcdefgh"[frm & 7] + "x"
+            text += square_name(to)
+            if m >> 12 & 7:
+                text += "=" + PIECE_CHARS[m >> 12 & 7]
+        else:
+            text = PIECE_CHARS[piece]
+            rivals = [
+                o & 63
+                for o in self.legal_moves()
+                if o >> 6 & 63 == to
+                and o & 63 != frm
+                and self.board[o & 63] % 6 == piece
+            ]
+            if rivals:
+                if all(r & 7 != frm & 7 for r in rivals):
+                    text += "abcdefgh"[frm & 7]
+                elif all(r >> 3 != frm >> 3 for r in rivals):
+                    text += str((frm >> 3) + 1)
+                else:
+                    text += square_name(frm)
+            if self.is_capture(m):
+                text += "x"
+            text += square_name(to)
+        if suffix:
+            self.make(m)
+            if self.in_check():
+                text += "#" if not self.legal_moves() else "+"
+            self.unmake()
+        return text
+
+    def parse_uci(self, text):
+        text = text.strip().lower()
+        for m in self.legal_moves():
+            if self.uci(m) == text:
+                return m
+        return None
+
+    def parse_san(self, text):
+        text = text.strip().rstrip("+#!?").replace("0", "O")
+        legal = self.legal_moves()
+        for m in legal:
+            if self.san(m, suffix=False) == text:
+                return m
+        # forgiving match for typed input: any case, "x" and "=" optional
+        key = _san_key(text)
+        matches = [m for m in legal if _san_key(self.san(m, suffix=False)) == key]
+        if len(matches) > 1:
+            # "BC4" is a bishop move before it is a b-pawn capture
+            matches = [m for m in matches if self.board[m & 63] % 6 != PAWN]
+        return matches[0] if len(matches) == 1 else None
+
+    def parse_move(self, text):
+        """Accept UCI ("e2e4", "e7e8q") or SAN ("Nf3", "exd5", "O-O")."""
+        m = self.parse_uci(text)
+        return m if m is not None else self.parse_san(text)
+
+    def ascii(self):
+        lines = []
+        for rank in range(7, -1, -1):
+            row = []
+            for file in range(8):
+                p = self.board[rank * 8 + file]
+                if p < 0:
+                    row.append(".")
+                else:
+                    ch = PIECE_CHARS[p % 6]
+                    row.append(ch if p < 6 else ch.lower())
+            lines.append(f"{rank + 1}  " + " ".join(row))
+        lines.append("   a b c d e f g h")
+        return lines
+
+
+def _san_key(text):
+    return text.upper().replace("X", "").replace("=", "")
+
+
+# --- perft ---------------------------------------------------------------
+
+
+def perft(pos, depth):
+    if depth == 0:
+        return 1
+    moves = pos.legal_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for m in moves:
+        pos.make(m)
+        nodes += perft(pos, depth - 1)
+        pos.unmake()
+    return nodes
+
+
+def divide(pos, depth):
+    out = {}
+    for m in pos.legal_moves():
+        pos.make(m)
+        n = perft(pos, depth - 1)
+        pos.unmake()
+        out[pos.uci(m)] = n
+    return out
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="chess core tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("perft", help="count leaf nodes and report nodes/second")
+    p.add_argument("depth", type=int)
+    p.add_argument("--fen", default=START_FEN)
+    p.add_argument("--divide", action="store_true", help="per-root-move counts")
+    args = ap.parse_args(argv)
+
+    pos = Position(args.fen)
+    t = time.perf_counter()
+    if args.divide:
+        counts = divide(pos, args.depth)
+        for move, n in sorted(counts.items()):
+            print(f"{move}: {n}")
+        nodes = sum(counts.values())
+    else:
+        nodes = perft(pos, args.depth)
+    dt = time.perf_counter() - t
+    print(f"perft({args.depth}) = {nodes}  {dt:.2f}s  {nodes / dt if dt else 0:,.0f} nps")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# games/chess_book.py
+"""
+Opening book: a sorted file of fixed 16-byte records, read through mmap.
+
+    key     u64  Zobrist hash of the position (games.chess)
+    move    u16  from | to << 6 | promotion << 12
+    weight  u16  how good/popular the move is (higher is better)
+    spare   u32  zero
+
+Records are big-endian and sorted by key, then by weight descending, so
+a lookup is a binary search over the mapped file: nothing is parsed up
+front, and every process that opens the same book shares its pages
+through the OS page cache.
+
+    python -m wopr_term.games.chess_book build book.bin games.pgn [...]
+    python -m wopr_term.games.chess_book probe book.bin [--fen "<fen>"]
+"""
+
+import mmap
+import os
+import re
+import struct
+from collections import defaultdict
+
+from .chess import Position, START_FEN, WHITE
+
+RECORD = struct.Struct(">QHHI")
+_KEY = struct.Struct(">Q")
+_ENTRY = struct.Struct(">HH")
+MOVE_MASK = 0x7FFF  # the from/to/promotion bits of a games.chess move
+
+
+class Book:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size % RECORD.size:
+            self._file.close()
+            raise ValueError(f"{path}: not a book file (size {size})")
+        self.size = size // RECORD.size
+        # mmap refuses empty files
+        self._mm = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        )
+
+    def __len__(self):
+        return self.size
+
+    def lookup(self, key):
+        """[(move16, weight), ...] for a position hash, best first."""
+        mm, rec = self._mm, RECORD.size
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _KEY.unpack_from(mm, mid * rec)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        out = []
+        while lo < self.size and _KEY.unpack_from(mm, lo * rec)[0] == key:
+            out.append(_ENTRY.unpack_from(mm, lo * rec + 8))
+            lo += 1
+        return out
+
+    def moves(self, pos):
+        """Book moves for `pos` as legal games.chess moves with weights."""
+        entries = self.lookup(pos.hash)
+        if not entries:
+            return []
+        legal = {m & MOVE_MASK: m for m in pos.legal_moves()}
+        return [(legal[m], w) for m, w in entries if m in legal and w]
+
+    def choose(self, pos, rng):
+        """A weighted random book move, or None when out of book."""
+        candidates = self.moves(pos)
+        if not candidates:
+            return None
+        pick = rng.random() * sum(w for _, w in candidates)
+        for m, w in candidates:
+            pick -= w
+            if pick < 0:
+                return m
+        return candidates[-1][0]
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+
+_books = {}
+
+
+def open_book(path):
+    """Shared Book for `path`, or None if there is no usable book there.
+
+    A failed open is not remembered: a book built later is picked up.
+    """
+    book = _books.get(path)
+    if book is None:
+        try:
+            book = _books[path] = Book(path)
+        except (OSError, ValueError):
+            return None
+    return book
+
+
+# --- building from PGN ----------------------------------------------------
+
+_COMMENT = re.compile(r"\{[^}]*\}|;[^\n]*|\$\d+")
+_TAG = re.compile(r'^\[(\w+)\s+"([^"]*)"\]\s*$')
+_RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+
+
+def read_pgn(lines):
+    """Yield (tags, movetext tokens) per game."""
+    tags, text = {}, []
+    for line in lines:
+        m = _TAG.match(line.strip())
+        if m:
+            if text:
+                yield tags, _tokens(" ".join(text))
+                tags, text = {}, []
+            tags[m.group(1)] = m.group(2)
+        elif line.strip():
+            text.append(line)
+    if text:
+        yield tags, _tokens(" ".join(text))
+
+
+def _tokens(text):
+    text = _COMMENT.sub(" ", text)
+    # drop variations, which may nest
+    out, depth = [], 0
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif depth == 0:
+            out.append(ch)
+    tokens = []
+    for tok in "".join(out).split():
+        tok = re.sub(r"^\d+\.+", "", tok)  # "12." or "12...e5"
+        if tok and tok not in _RESULTS:
+            tokens.append(tok)
+    return tokens
+
+
+def build(pgn_paths, plies=20):
+    """Count book moves over the first `plies` half-moves of every game.
+
+    A move scores 2 if its side went on to win, 1 for a draw and 0 for a
+    loss, so the book leans towards moves that worked; write() still
+    keeps every move that was played.
+    """
+    counts = defaultdict(lambda: defaultdict(int))
+    games = 0
+    for path in pgn_paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for tags, tokens in read_pgn(f):
+                result = tags.get("Result", "*")
+                pos = Position(tags.get("FEN", START_FEN))
+                for tok in tokens[:plies]:
+                    m = pos.parse_san(tok)
+                    if m is None:
+                        break  # bad or unsupported movetext: keep what we have
+                    score = 1  # draw or unknown result
+                    if result in ("1-0", "0-1"):
+                        score = 2 if (result == "1-0") == (pos.side == WHITE) else 0
+                    counts[pos.hash][m & MOVE_MASK] += score
+                    pos.make(m)
+                games += 1
+    return counts, games
+
+
+def write(path, counts):
+    records = []
+    for key, moves in counts.items():
+        top = max(moves.values())
+        scale = 65535 / top if top > 65535 else 1
+        for move, w in moves.items():
+            # a played move is never dropped, however badly it went
+            w = min(65535, max(1, round(w * scale)))
+            records.append((key, -w, move))
+    records.sort()
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for key, neg_w, move in records:
+            f.write(RECORD.pack(key, move, -neg_w, 0))
+    os.replace(tmp, path)
+    return len(records)
+
+
+def main(argv=None):
+    import argparse
+    import random
+    import time
+
+    ap = argparse.ArgumentParser(description="opening book tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="compile PGN files into a book")
+    b.add_argument("out")
+    b.add_argument("pgn", nargs="+")
+    b.add_argument("--plies", type=int, default=20, help="half-moves per game")
+    p = sub.add_parser("probe", help="list book moves for a position")
+    p.add_argument("book")
+    p.add_argument("--fen", default=START_FEN)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "build":
+        counts, games = build(args.pgn, args.plies)
+        n = write(args.out, counts)
+        print(f"{games} games, {len(counts)} positions, {n} records -> {args.out}")
+        return
+
+    book = Book(args.book)
+    pos = Position(args.fen)
+    t = time.perf_counter()
+    reps = 10000
+    for _ in range(reps):
+        book.lookup(pos.hash)
+    us = (time.perf_counter() - t) / reps * 1e6
+    moves = book.moves(pos)
+    total = sum(w for _, w in moves) or 1
+    for m, w in moves:
+        print(f"{pos.san(m):8} {w:6}  {100 * w / total:5.1f}%")
+    print(f"{len(book)} records, lookup {us:.1f} us")
+    if moves:
+        print("pick:", pos.san(book.choose(pos, random.Random())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+# games/chess_search.py
+"""
+Chess search for WOPR, run in a worker process so the pygame loop never
+waits on it.
+
+Searcher is iterative-deepening alpha-beta with quiescence and a
+transposition table keyed by the position's Zobrist hash. SearchService
+owns one long-lived worker process: start() queues a search and returns
+at once, poll() drains progress/result messages without blocking, and
+cancel() stops a search within a few thousand nodes. Every request gets an
+id, so a late message from a cancelled search is simply ignored.
+"""
+
+import multiprocessing as mp
+import queue
+import time
+
+from .chess import Position, PAWN, WHITE, bits
+
+MATE = 100_000
+INF = MATE + 1
+MATE_BOUND = MATE - 1000  # scores past this are forced mates
+VALUES = (100, 320, 330, 500, 900, 0)
+TT_LIMIT = 1 << 20  # entries; the table is dropped when it grows past this
+
+
+def _center_table(weight):
+    # bonus for standing near the middle of the board
+    return [
+        weight * (6 - abs(7 - 2 * (sq & 7)) // 2 - abs(7 - 2 * (sq >> 3)) // 2)
+        for sq in range(64)
+    ]
+
+
+_CENTER = _center_table(4)
+_PAWN_ADVANCE = (
+    [4 * max(0, (sq >> 3) - 1) for sq in range(64)],
+    [4 * max(0, 6 - (sq >> 3)) for sq in range(64)],
+)
+
+
+def evaluate(pos):
+    """Material plus a little piece placement, for the side to move."""
+    score = 0
+    bb = pos.bb
+    for color, sign in ((0, 1), (1, -1)):
+        base = color * 6
+        for s in bits(bb[base + PAWN]):
+            score += sign * (VALUES[PAWN] + _PAWN_ADVANCE[color][s])
+        for piece in range(1, 5):
+            value = VALUES[piece]
+            for s in bits(bb[base + piece]):
+                score += sign * (value + _CENTER[s])
+    return score if pos.side == WHITE else -score
+
+
+class TimeControl:
+    """Search limits: fixed time per move, a clock with increment, or depth.
+
+    With a clock, a move gets about 1/30 of the remaining time plus most of
+    the increment. `depth` caps iterative deepening in every mode.
+    """
+
+    def __init__(self, movetime=None, clock=None, increment=0.0, depth=None):
+        self.movetime = movetime
+        self.clock = clock
+        self.increment = increment
+        self.depth = depth
+
+    def budget(self):
+        if self.movetime is not None:
+            return self.movetime
+        if self.clock is not None:
+            return max(
+                0.05, min(self.clock / 30 + self.increment * 0.8, self.clock / 2)
+            )
+        return None  # depth only
+
+    def describe(self):
+        if self.movetime is not None:
+            text = f"{self.movetime:g}S PER MOVE"
+        elif self.clock is not None:
+            text = f"CLOCK {self.clock:.0f}S +{self.increment:g}S"
+        else:
+            text = "NO TIME LIMIT"
+        return text + (f", DEPTH {self.depth}" if self.depth else "")
+
+
+def _to_tt(score, ply):
+    # the table holds mates as plies from the stored node, not from the root,
+    # so a hit reached by a different path still counts them right
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _from_tt(score, ply):
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+class _Stop(Exception):
+    pass
+
+
+class Searcher:
+    def __init__(self):
+        self.tt = {}
+        self.nodes = 0
+
+    def search(self, pos, tc, should_stop=None, on_info=None):
+        """Return (move, score); move is None only when there are no legal moves."""
+        if len(self.tt) > TT_LIMIT:
+            self.tt.clear()
+        self.pos = pos
+        self.nodes = 0
+        self._should_stop = should_stop or (lambda: False)
+        budget = tc.budget()
+        t0 = time.perf_counter()
+        self._deadline = t0 + budget if budget is not None else None
+        legal = pos.legal_moves()
+        if not legal:
+            return None, 0
+        best, best_score = legal[0], 0
+        max_depth = tc.depth or 64
+        for depth in range(1, max_depth + 1):
+            try:
+                score = self._negamax(depth, -INF, INF, 0)
+            except _Stop:
+                break
+            entry = self.tt.get(pos.hash)
+            if entry is not None and entry[3] is not None:
+                best, best_score = entry[3], score
+            elapsed = time.perf_counter() - t0
+            if on_info:
+                on_info(depth, score, self.pv(depth), self.nodes, elapsed)
+            if abs(score) >= MATE - 100 or len(legal) == 1:
+                break
+            # another iteration would not finish in the time left
+            if budget is not None and elapsed > budget * 0.5:
+                break
+        return best, best_score
+
+    def pv(self, limit):
+        pos, line = self.pos, []
+        while len(line) < limit:
+            entry = self.tt.get(pos.hash)
+            if entry is None or entry[3] is None or entry[3] not in pos.legal_moves():
+                break
+            line.append(entry[3])
+            pos.make(entry[3])
+        for _ in line:
+            pos.unmake()
+        return line
+
+    def _check_stop(self):
+        if self._should_stop():
+            raise _Stop
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise _Stop
+
+    def _ordered(self, moves, tt_move):
+        board = self.pos.board
+
+        def key(m):
+            if m == tt_move:
+                return -1_000_000
+            victim = board[m >> 6 & 63]
+            if victim >= 0:
+                # most valuable victim, least valuable attacker
+                return -(VALUES[victim % 6] * 10 - VALUES[board[m & 63] % 6] // 100)
+            return -(m >> 12 & 7) * 100  # promotions next
+
+        return sorted(moves, key=key)
+
+    def _negamax(self, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 511 == 0:
+            self._check_stop()
+        pos = self.pos
+        if ply and (pos.halfmove >= 100 or pos.repetitions() >= 2):
+            return 0
+        us = pos.side
+        in_check = pos.in_check()
+        if in_check:
+            depth += 1
+        if depth <= 0:
+            return self._quiesce(alpha, beta, ply)
+
+        key = pos.hash
+        entry = self.tt.get(key)
+        tt_move = None
+        if entry is not None:
+            e_depth, e_val, e_flag, tt_move = entry
+            e_val = _from_tt(e_val, ply)
+            if ply and e_depth >= depth:
+                if e_flag == 0:
+                    return e_val
+                if e_flag < 0 and e_val <= alpha:
+                    return e_val
+                if e_flag > 0 and e_val >= beta:
+                    return e_val
+
+        alpha0 = alpha
+        best_val, best_move = -INF, None
+        for m in self._ordered(pos.pseudo_moves(), tt_move):
+            pos.make(m)
+            if pos.attacked(pos.king_square(us), us ^ 1):
+                pos.unmake()
+                continue
+            val = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            pos.unmake()
+            if val > best_val:
+                best_val, best_move = val, m
+            if val > alpha:
+                alpha = val
+            if alpha >= beta:
+                break
+        if best_move is None:
+            return -MATE + ply if in_check else 0
+        flag = -1 if best_val <= alpha0 else (1 if best_val >= beta else 0)
+        self.tt[key] = (depth, _to_tt(best_val, ply), flag, best_move)
+        return best_val
+
+    def _quiesce(self, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 511 == 0:
+            self._check_stop()
+        pos = self.pos
+        stand = evaluate(pos)
+        if stand >= beta:
+            return stand
+        alpha = max(alpha, stand)
+        us = pos.side
+        captures = [m for m in pos.pseudo_moves() if pos.is_capture(m)]
+        for m in self._ordered(captures, None):
+            pos.make(m)
+            if pos.attacked(pos.king_square(us), us ^ 1):
+                pos.unmake()
+                continue
+            val = -self._quiesce(-beta, -alpha, ply + 1)
+            pos.unmake()
+            if val >= beta:
+                return val
+            alpha = max(alpha, val)
+        return alpha
+
+
+def _worker(requests, results, cancel):
+    searcher = Searcher()
+    while True:
+        req = requests.get()
+        if req is None:
+            return
+        sid, fen, moves, tc = req
+        if cancel.value >= sid:
+            continue  # cancelled before it started
+        pos = Position(fen)
+        for m in moves:
+            pos.make(m)
+
+        def on_info(depth, score, pv, nodes, elapsed):
+            line, sans = [], []
+            for m in pv:
+                sans.append(pos.san(m))
+                pos.make(m)
+                line.append(m)
+            for _ in line:
+                pos.unmake()
+            results.put(("info", sid, depth, score, sans, nodes, elapsed))
+
+        move, score = searcher.search(pos, tc, lambda: cancel.value >= sid, on_info)
+        results.put(("bestmove", sid, move, score))
+
+
+class SearchService:
+    """One worker process running Searcher; all calls return immediately."""
+
+    def __init__(self):
+        ctx = mp.get_context("spawn")  # never fork a process that owns SDL
+        self._requests = ctx.Queue()
+        self._results = ctx.Queue()
+        self._cancel = ctx.Value("q", 0, lock=False)
+        self._proc = ctx.Process(
+            target=_worker,
+            args=(self._requests, self._results, self._cancel),
+            daemon=True,
+        )
+        self._proc.start()
+        self._sid = 0
+        self.active = None  # id of the search whose results we still want
+
+    def start(self, fen, moves, tc):
+        """Search the position reached by playing `moves` from `fen`."""
+        self.cancel()
+        self._sid += 1
+        self.active = self._sid
+        self._requests.put((self._sid, fen, list(moves), tc))
+        return self._sid
+
+    def cancel(self):
+        """Drop the running search; its late messages are discarded."""
+        if self.active is not None:
+            self._cancel.value = self.active
+            self.active = None
+
+    def stop(self):
+        """End the running search now but keep its best move so far."""
+        if self.active is not None:
+            self._cancel.value = self.active
+
+    def poll(self):
+        """Messages for the active search that have arrived since last call."""
+        out = []
+        while True:
+            try:
+                msg = self._results.get_nowait()
+            except queue.Empty:
+                return out
+            if msg[1] != self.active:
+                continue
+            if msg[0] == "bestmove":
+                self.active = None
+            out.append(msg)
+
+    @property
+    def thinking(self):
+        return self.active is not None
+
+    def close(self):
+        self.cancel()
+        if self._proc.is_alive():
+            self._requests.put(None)
+            self._proc.join(timeout=1.0)
+            if self._proc.is_alive():
+                self._proc.terminate()
+
+
+_service = None
+
+
+def service():
+    """The shared SearchService, started on first use."""
+    global _service
+    if _service is None or not _service._proc.is_alive():
+        _service = SearchService()
+    return _service
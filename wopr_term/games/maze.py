@@ -0,0 +1,340 @@
+# games/maze.py
+"""
+Falken's Maze: perfect mazes on large grids, generated and solved in slices.
+
+Cell i = y * w + x. The only per-cell storage is 2 bits in a bytearray:
+bit 0 = passage to the east, bit 1 = passage to the south (north/west
+are the neighbour's east/south), so a 2000 x 2000 maze is 1 MB of walls.
+Generators and solvers keep their own flat arrays (bitsets, bytearrays,
+array('I')) and are Python generators that yield every few hundred
+steps; Job runs one for a time slice per frame.
+"""
+
+import heapq
+import random
+import time
+from array import array
+from collections import deque
+
+N, E, S, W = range(4)
+OPPOSITE = (S, W, N, E)
+_CHUNK = 256  # steps between yields
+
+
+class Bitset:
+    def __init__(self, n):
+        self.bits = bytearray((n + 7) >> 3)
+
+    def add(self, i):
+        self.bits[i >> 3] |= 1 << (i & 7)
+
+    def has(self, i):
+        return self.bits[i >> 3] >> (i & 7) & 1
+
+
+class Maze:
+    def __init__(self, w, h):
+        self.w = w
+        self.h = h
+        self.n = w * h
+        self.cells = bytearray((self.n + 3) >> 2)
+
+    def neighbor(self, i, d):
+        """Index of the cell next to i in direction d, or -1 off the grid."""
+        w = self.w
+        x = i % w
+        if d == E:
+            return i + 1 if x < w - 1 else -1
+        if d == W:
+            return i - 1 if x > 0 else -1
+        if d == S:
+            return i + w if i + w < self.n else -1
+        return i - w if i >= w else -1
+
+    def carve(self, i, d):
+        if d == W:
+            i, d = i - 1, E
+        elif d == N:
+            i, d = i - self.w, S
+        self.cells[i >> 2] |= (1 if d == E else 2) << ((i & 3) << 1)
+
+    def is_open(self, i, d):
+        if d == W:
+            if i % self.w == 0:
+                return False
+            i, d = i - 1, E
+        elif d == N:
+            if i < self.w:
+                return False
+            i, d = i - self.w, S
+        return self.cells[i >> 2] >> ((i & 3) << 1) & (1 if d == E else 2) != 0
+
+    def exits(self, i):
+        return [self.neighbor(i, d) for d in range(4) if self.is_open(i, d)]
+
+    def nbytes(self):
+        return len(self.cells)
+
+
+class Job:
+    """Drives a generator for a time slice per step(); `head` is its last yield."""
+
+    def __init__(self, gen):
+        self.gen = gen
+        self.head = None
+        self.done = False
+        self.steps = 0
+
+    def step(self, slice_s):
+        if self.done:
+            return True
+        stop = time.perf_counter() + slice_s
+        try:
+            while time.perf_counter() < stop:
+                self.head = next(self.gen)
+                self.steps += 1
+        except StopIteration:
+            self.done = True
+        return self.done
+
+    def run(self):
+        """Blocking (tools, benchmarks)."""
+        for self.head in self.gen:
+            self.steps += 1
+        self.done = True
+
+
+# --- generators (each yields the cell it is working on) -------------------
+
+
+def backtracker(maze, rng):
+    visited = Bitset(maze.n)
+    start = rng.randrange(maze.n)
+    visited.add(start)
+    stack = array("I", [start])
+    ops = 0
+    while stack:
+        i = stack[-1]
+        opts = []
+        for d in range(4):
+            j = maze.neighbor(i, d)
+            if j >= 0 and not visited.has(j):
+                opts.append((d, j))
+        if opts:
+            d, j = opts[rng.randrange(len(opts))]
+            maze.carve(i, d)
+            visited.add(j)
+            stack.append(j)
+        else:
+            stack.pop()
+        ops += 1
+        if ops % _CHUNK == 0:
+            yield i
+
+
+class Shuffle:
+    """A random permutation of range(m), computed one index at a time.
+
+    A 4-round Feistel network permutes the smallest power of four that
+    covers m; iterating it in order and dropping outputs >= m leaves every
+    index in range(m) exactly once. O(1) memory, where a shuffled list of
+    m indices costs 4 bytes each.
+    """
+
+    def __init__(self, m, rng):
+        self.m = m
+        self.half = (max(1, (m - 1).bit_length()) + 1) // 2
+        self.keys = [rng.getrandbits(32) for _ in range(4)]
+
+    def __iter__(self):
+        m, half = self.m, self.half
+        mask = (1 << half) - 1
+        k0, k1, k2, k3 = self.keys
+        for x in range(1 << 2 * half):
+            left, right = x >> half, x & mask
+            f = ((right ^ k0) * 0x45D9F3B) & 0xFFFFFFFF
+            left, right = right, left ^ ((f ^ f >> 16) & mask)
+            f = ((right ^ k1) * 0x45D9F3B) & 0xFFFFFFFF
+            left, right = right, left ^ ((f ^ f >> 16) & mask)
+            f = ((right ^ k2) * 0x45D9F3B) & 0xFFFFFFFF
+            left, right = right, left ^ ((f ^ f >> 16) & mask)
+            f = ((right ^ k3) * 0x45D9F3B) & 0xFFFFFFFF
+            left, right = right, left ^ ((f ^ f >> 16) & mask)
+            y = left << half | right
+            if y < m:  # outside range(m): skipping it keeps the order a permutation
+                yield y
+
+
+def kruskal(maze, rng):
+    n = maze.n
+    # edge e joins cell e >> 1 to its east (even e) or south (odd e)
+    # neighbour; the edges come in a random order without being stored, so
+    # the union-find parents are the only per-cell array. It starts zeroed
+    # (cheap even for millions of cells) and stores value + 1, with 0
+    # meaning "the identity": parent[i] == i.
+    parent = array("I", [0]) * n
+
+    def find(a):
+        while parent[a]:
+            up = parent[a] - 1
+            if parent[up]:  # path halving
+                parent[a] = parent[up]
+            a = up
+        return a
+
+    joined, ops = 0, 0
+    for e in Shuffle(2 * n, rng):
+        if joined == n - 1:
+            break
+        i, d = e >> 1, S if e & 1 else E
+        j = maze.neighbor(i, d)
+        if j < 0:
+            continue
+        a, b = find(i), find(j)
+        if a != b:
+            parent[a] = b + 1
+            maze.carve(i, d)
+            joined += 1
+        ops += 1
+        if ops % _CHUNK == 0:
+            yield i
+
+
+def wilson(maze, rng):
+    n = maze.n
+    tree = Bitset(n)
+    tree.add(rng.randrange(n))
+    heading = bytearray(n)  # last direction the current walk left each cell by
+    left, scan, ops = n - 1, 0, 0
+    while left:
+        while tree.has(scan):
+            scan += 1
+        # loop-erased random walk: only the last exit from each cell counts
+        i = scan
+        while not tree.has(i):
+            while True:
+                d = rng.randrange(4)
+                j = maze.neighbor(i, d)
+                if j >= 0:
+                    break
+            heading[i] = d
+            i = j
+            ops += 1
+            if ops % _CHUNK == 0:
+                yield i
+        i = scan
+        while not tree.has(i):
+            d = heading[i]
+            maze.carve(i, d)
+            tree.add(i)
+            left -= 1
+            i = maze.neighbor(i, d)
+            ops += 1  # a long walk carves as many cells as it took steps
+            if ops % _CHUNK == 0:
+                yield i
+
+
+GENERATORS = {"BACKTRACK": backtracker, "KRUSKAL": kruskal, "WILSON": wilson}
+
+
+# --- solvers --------------------------------------------------------------
+
+
+class Solver:
+    """BFS or A* from `start` to `goal`, run as a Job.
+
+    came[i] is 0 for unvisited cells, else 1 + the direction back to the
+    cell it was reached from. `path` is filled in once the goal is found.
+    """
+
+    def __init__(self, maze, start, goal, method="BFS"):
+        self.maze = maze
+        self.start = start
+        self.goal = goal
+        self.method = method
+        self.came = bytearray(maze.n)
+        self.visited = 0
+        self.path = None
+        self.job = Job(self._astar() if method == "A*" else self._bfs())
+
+    def _expand(self, i):
+        maze, came = self.maze, self.came
+        for d in range(4):
+            if maze.is_open(i, d):
+                j = maze.neighbor(i, d)
+                if not came[j] and j != self.start:
+                    came[j] = OPPOSITE[d] + 1
+                    yield j
+
+    def _bfs(self):
+        frontier = deque([self.start])
+        while frontier:
+            i = frontier.popleft()
+            self.visited += 1
+            if i == self.goal:
+                break
+            frontier.extend(self._expand(i))
+            if self.visited % _CHUNK == 0:
+                yield i
+        self._trace()
+
+    def _astar(self):
+        w, goal = self.maze.w, self.goal
+        gx, gy = goal % w, goal // w
+
+        def h(i):
+            return abs(i % w - gx) + abs(i // w - gy)
+
+        # a perfect maze reaches each cell once, so no decrease-key is needed
+        heap = [(h(self.start), 0, self.start)]
+        while heap:
+            _, g, i = heapq.heappop(heap)
+            self.visited += 1
+            if i == goal:
+                break
+            for j in self._expand(i):
+                heapq.heappush(heap, (g + 1 + h(j), g + 1, j))
+            if self.visited % _CHUNK == 0:
+                yield i
+        self._trace()
+
+    def _trace(self):
+        came, maze = self.came, self.maze
+        if self.goal != self.start and not came[self.goal]:
+            return  # unreachable: the maze is not finished
+        path = array("I", [self.goal])
+        i = self.goal
+        while i != self.start:
+            i = maze.neighbor(i, came[i] - 1)
+            path.append(i)
+        path.reverse()
+        self.path = path
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="maze generation/solve benchmark")
+    ap.add_argument("width", type=int)
+    ap.add_argument("height", type=int)
+    ap.add_argument("--algo", default="BACKTRACK", choices=sorted(GENERATORS))
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    maze = Maze(args.width, args.height)
+    t = time.perf_counter()
+    Job(GENERATORS[args.algo](maze, random.Random(args.seed))).run()
+    gen_s = time.perf_counter() - t
+    print(f"{args.algo} {maze.w}x{maze.h}: {gen_s:.2f}s  {maze.n / gen_s:,.0f} cells/s")
+    for method in ("BFS", "A*"):
+        t = time.perf_counter()
+        s = Solver(maze, 0, maze.n - 1, method)
+        s.job.run()
+        print(
+            f"{method}: path {len(s.path)}  visited {s.visited}"
+            f"  {time.perf_counter() - t:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
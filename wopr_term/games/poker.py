@@ -0,0 +1,492 @@
+# games/poker.py
+"""
+Texas hold'em hand evaluation and Monte Carlo equity.
+
+A card is rank * 4 + suit (rank 0 = deuce .. 12 = ace). Hands of 5, 6 or
+7 cards are scored by table lookups alone, no comparisons:
+
+    rank table   indexed by the sum of RANK_KEY over the cards. The keys
+                 are chosen so that sum is unique for every multiset of
+                 ranks a hand can have, which makes it a perfect hash of
+                 the ranks (one table per hand size).
+    flush table  indexed by the 13-bit mask of ranks held in one suit.
+                 A suit can only make a flush when 5+ cards share it, and
+                 then the flush is the best hand those cards can make.
+
+Both give a class from 1 (7-5-4-3-2 offsuit) to 7462 (royal flush);
+higher is better and equal classes tie. The tables are plain array("H")
+so evaluate() works without NumPy; evaluate_batch() scores a whole
+(n, 7) array of hands with a handful of NumPy gathers.
+
+equity() deals random boards and opponent hands for a batch of rollouts
+at once and scores them with evaluate_batch(). EquityJob spreads batches
+over the shared worker pool (games/strategic.py) and is polled by the
+UI, like the strategic model.
+
+    python -m wopr_term.games.poker bench
+    python -m wopr_term.games.poker equity AS KS --board QS JS 2D
+"""
+
+import random
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # evaluate() and monte_carlo() still work
+    np = None
+
+RANKS = "23456789TJQKA"
+SUITS = "CDHS"
+RANK_NAMES = (
+    "TWO",
+    "THREE",
+    "FOUR",
+    "FIVE",
+    "SIX",
+    "SEVEN",
+    "EIGHT",
+    "NINE",
+    "TEN",
+    "JACK",
+    "QUEEN",
+    "KING",
+    "ACE",
+)
+
+HIGH_CARD, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS = range(8)
+STRAIGHT_FLUSH = 8
+
+# per-rank keys whose sums are unique over every 5-, 6- or 7-card rank
+# multiset (at most four of a rank); the largest 7-card sum is 7,825,759.
+# These are the keys of Kevin Sheng's SKPokerEval.
+RANK_KEY = (0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181)
+WHEEL = 0b1000000001111  # A-2-3-4-5
+STRAIGHTS = [(top, 0b11111 << (top - 4)) for top in range(12, 3, -1)] + [(3, WHEEL)]
+
+
+def card(text):
+    """'AS' / 'td' -> card number."""
+    text = text.strip().upper()
+    if len(text) != 2 or text[0] not in RANKS or text[1] not in SUITS:
+        raise ValueError(f"bad card {text!r} (rank 2-9TJQKA, suit CDHS)")
+    return RANKS.index(text[0]) * 4 + SUITS.index(text[1])
+
+
+def card_str(c):
+    return RANKS[c >> 2] + SUITS[c & 3]
+
+
+def cards_str(cards):
+    return " ".join(card_str(c) for c in cards)
+
+
+# ----- table construction (once per process) -----
+
+
+def _value(category, *ranks):
+    # comparable raw value: category, then up to five ranks, 4 bits each
+    v = category
+    for r in ranks:
+        v = v << 4 | r
+    return v << 4 * (5 - len(ranks))
+
+
+def _straight(mask):
+    for top, m in STRAIGHTS:
+        if mask & m == m:
+            return top
+    return -1
+
+
+def _top_bits(mask, n):
+    return [r for r in range(12, -1, -1) if mask >> r & 1][:n]
+
+
+def _flush_value(mask):
+    top = _straight(mask)
+    if top >= 0:
+        return _value(STRAIGHT_FLUSH, top)
+    return _value(FLUSH, *_top_bits(mask, 5))
+
+
+def _ranks_value(counts):
+    # best 5-card hand (flushes aside) from per-rank counts
+    desc = [r for r in range(12, -1, -1) if counts[r]]
+    quads = [r for r in desc if counts[r] >= 4]
+    trips = [r for r in desc if counts[r] >= 3]
+    pairs = [r for r in desc if counts[r] >= 2]
+    if quads:
+        return _value(QUADS, quads[0], *[r for r in desc if r != quads[0]][:1])
+    if trips and len(pairs) >= 2:
+        t = trips[0]
+        return _value(FULL_HOUSE, t, [r for r in pairs if r != t][0])
+    top = _straight(sum(1 << r for r in desc))
+    if top >= 0:
+        return _value(STRAIGHT, top)
+    if trips:
+        return _value(TRIPS, trips[0], *[r for r in desc if r != trips[0]][:2])
+    if len(pairs) >= 2:
+        hi, lo = pairs[:2]
+        return _value(TWO_PAIR, hi, lo, *[r for r in desc if r not in (hi, lo)][:1])
+    if pairs:
+        return _value(PAIR, pairs[0], *[r for r in desc if r != pairs[0]][:3])
+    return _value(HIGH_CARD, *desc[:5])
+
+
+def _multisets(n):
+    # (rank key, counts) for every way to hold n cards, at most 4 per rank
+    counts = [0] * 13
+
+    def walk(r, left, key):
+        if r == 12:
+            if left <= 4:
+                counts[12] = left
+                yield key + left * RANK_KEY[12], counts
+            return
+        for c in range(min(4, left) + 1):
+            counts[r] = c
+            yield from walk(r + 1, left - c, key + c * RANK_KEY[r])
+        counts[r] = 0
+
+    return walk(0, n, 0)
+
+
+class Tables:
+    """The class list, the flush table and one rank table per hand size."""
+
+    def __init__(self):
+        flush_values = {
+            m: _flush_value(m) for m in range(1 << 13) if bin(m).count("1") >= 5
+        }
+        five = {key: _ranks_value(counts) for key, counts in _multisets(5)}
+        # every 5-card hand value, worst first: 7462 of them
+        self.values = sorted(set(five.values()) | set(flush_values.values()))
+        self._class = {v: i + 1 for i, v in enumerate(self.values)}
+        self.flush = array("H", bytes(2 << 13))
+        for m, v in flush_values.items():
+            self.flush[m] = self._class[v]
+        # 3 bits of count per suit; suit with 5+ cards, or 0xF for none
+        self.flush_suit = array("B", [0xF]) * (1 << 12)
+        for key in range(1 << 12):
+            for s in range(4):
+                if key >> 3 * s & 7 >= 5:
+                    self.flush_suit[key] = s
+        self._ranks = {}
+        self._np = {}
+
+    def ranks(self, n):
+        """Rank table for n-card hands, indexed by the rank-key sum."""
+        table = self._ranks.get(n)
+        if table is None:
+            if not 5 <= n <= 7:
+                raise ValueError(f"hands have 5 to 7 cards, not {n}")
+            table = array("H", bytes(2 * (RANK_KEY[12] * 4 + RANK_KEY[11] * 3 + 1)))
+            cls = self._class
+            for key, counts in _multisets(n):
+                table[key] = cls[_ranks_value(counts)]
+            self._ranks[n] = table
+        return table
+
+    def numpy(self, n):
+        """(rank table, flush table, flush-suit table) as NumPy views, no copies."""
+        t = self._np.get(n)
+        if t is None:
+            t = self._np[n] = (
+                np.frombuffer(self.ranks(n), dtype=np.uint16),
+                np.frombuffer(self.flush, dtype=np.uint16),
+                np.frombuffer(self.flush_suit, dtype=np.uint8),
+            )
+        return t
+
+
+_tables = None
+
+
+def tables():
+    """The shared tables, built on first use (well under a second)."""
+    global _tables
+    if _tables is None:
+        _tables = Tables()
+    return _tables
+
+
+# ----- evaluation -----
+
+
+def evaluate(cards):
+    """Class (1..7462, higher wins) of the best 5-card hand in 5-7 cards."""
+    t = tables()
+    key = suits = 0
+    for c in cards:
+        key += RANK_KEY[c >> 2]
+        suits += 1 << 3 * (c & 3)
+    s = t.flush_suit[suits]
+    if s != 0xF:
+        mask = 0
+        for c in cards:
+            if c & 3 == s:
+                mask |= 1 << (c >> 2)
+        return t.flush[mask]
+    return t.ranks(len(cards))[key]
+
+
+if np is not None:
+    _RANK_KEY = np.array(RANK_KEY, dtype=np.int32)
+    _SUIT_KEY = np.array([1, 8, 64, 512], dtype=np.int16)
+    _BIT = (1 << np.arange(13)).astype(np.int16)
+
+
+def evaluate_batch(cards):
+    """evaluate() for every row of an (n, 5..7) array of cards; uint16 classes."""
+    cards = np.asarray(cards)
+    ranks_t, flush_t, suit_t = tables().numpy(cards.shape[1])
+    ranks = cards >> 2
+    best = ranks_t[_RANK_KEY[ranks].sum(axis=1)]
+    fs = suit_t[_SUIT_KEY[cards & 3].sum(axis=1)]
+    rows = np.flatnonzero(fs != 0xF)  # about 3% of 7-card hands
+    if len(rows):
+        suited = (cards[rows] & 3) == fs[rows, None]
+        mask = np.where(suited, _BIT[ranks[rows]], 0).sum(axis=1)
+        best[rows] = flush_t[mask]
+    return best
+
+
+def describe(cls):
+    """'FULL HOUSE, KINGS OVER TENS' and so on."""
+    v = tables().values[cls - 1]
+    cat = v >> 20
+    r = [v >> 16 - 4 * i & 0xF for i in range(5)]
+    name = [RANK_NAMES[x] for x in r]
+    many = [n + ("ES" if n == "SIX" else "S") for n in name]
+    if cat == STRAIGHT_FLUSH:
+        return "ROYAL FLUSH" if r[0] == 12 else f"STRAIGHT FLUSH, {name[0]} HIGH"
+    if cat == QUADS:
+        return f"FOUR {many[0]}"
+    if cat == FULL_HOUSE:
+        return f"FULL HOUSE, {many[0]} OVER {many[1]}"
+    if cat == FLUSH:
+        return f"FLUSH, {name[0]} HIGH"
+    if cat == STRAIGHT:
+        return f"STRAIGHT, {name[0]} HIGH"
+    if cat == TRIPS:
+        return f"THREE {many[0]}"
+    if cat == TWO_PAIR:
+        return f"TWO PAIR, {many[0]} AND {many[1]}"
+    if cat == PAIR:
+        return f"PAIR OF {many[0]}"
+    return f"{name[0]} HIGH"
+
+
+# ----- equity -----
+
+
+def _deal(rng, deck, n, k):
+    # first k cards of n independent shuffles of `deck`: a partial
+    # Fisher-Yates run on all rows at once, k vectorised swaps
+    d = np.tile(deck, (n, 1))
+    rows = np.arange(n)
+    for i in range(k):
+        j = rng.integers(i, len(deck), n)
+        a = d[rows, i]
+        d[rows, i] = d[rows, j]
+        d[rows, j] = a
+    return d[:, :k]
+
+
+def equity(hero, board, opponents, n, seed, chunk=50_000):
+    """Play `n` random run-outs of hero's hand against random opponent hands.
+
+    Returns {"n", "wins", "ties", "equity"}; equity counts a tie as a
+    share of the pot, so equity / n is the expected pot share.
+    """
+    rng = np.random.default_rng(seed)
+    known = set(hero) | set(board)
+    deck = np.array([c for c in range(52) if c not in known], dtype=np.uint8)
+    more = 5 - len(board)
+    wins = ties = 0
+    share = 0.0
+    for start in range(0, n, chunk):
+        m = min(chunk, n - start)
+        drawn = _deal(rng, deck, m, more + 2 * opponents)
+        boards = np.empty((m, 5), dtype=np.uint8)
+        boards[:, : len(board)] = board
+        boards[:, len(board) :] = drawn[:, :more]
+        hand = np.empty((m, 7), dtype=np.uint8)
+        hand[:, 2:] = boards
+        hand[:, :2] = hero
+        mine = evaluate_batch(hand)
+        best = np.zeros(m, dtype=np.uint16)
+        level = np.zeros(m, dtype=np.int8)  # opponents holding `best`
+        for o in range(opponents):
+            hand[:, :2] = drawn[:, more + 2 * o : more + 2 * o + 2]
+            theirs = evaluate_batch(hand)
+            level = np.where(theirs > best, 1, level + (theirs == best))
+            best = np.maximum(best, theirs)
+        won = mine > best
+        tied = mine == best
+        wins += int(won.sum())
+        ties += int(tied.sum())
+        share += float(won.sum()) + float((1.0 / (1 + level[tied])).sum())
+    return {"n": n, "wins": wins, "ties": ties, "equity": share}
+
+
+def monte_carlo(hero, board, opponents, n, rng=random):
+    """equity() one hand at a time with evaluate(): slow, but needs no NumPy."""
+    deck = [c for c in range(52) if c not in hero and c not in board]
+    more = 5 - len(board)
+    share = 0.0
+    for _ in range(n):
+        drawn = rng.sample(deck, more + 2 * opponents)
+        full = list(board) + drawn[:more]
+        mine = evaluate(list(hero) + full)
+        theirs = [
+            evaluate(drawn[more + 2 * o : more + 2 * o + 2] + full)
+            for o in range(opponents)
+        ]
+        best = max(theirs)
+        if mine > best:
+            share += 1.0
+        elif mine == best:
+            share += 1.0 / (1 + theirs.count(best))
+    return share / n if n else 0.0
+
+
+def warm():
+    """Build the 7-card tables in this process (run it in the workers early)."""
+    tables().ranks(7)
+    return True
+
+
+def prepare():
+    """Start the shared pool and have each worker build its tables now.
+
+    Raises OSError where worker processes cannot be started.
+    """
+    from .strategic import pool, workers
+
+    return [pool().submit(warm) for _ in range(workers())]
+
+
+class EquityJob:
+    """Streams equity() batches through the shared pool until `total` are in.
+
+    poll() never blocks; `equity` is the estimate from whatever batches
+    have finished so far, so a caller on a clock can act on it early.
+    """
+
+    def __init__(self, hero, board, opponents, total, batch, seed=None):
+        from .strategic import pool, workers
+
+        self.args = (tuple(hero), tuple(board), opponents)
+        self.total = total
+        self.batch = batch
+        self.done = 0
+        self.share = 0.0
+        self._seeds = np.random.SeedSequence(seed)
+        self._submitted = 0
+        self._inflight = []
+        self._pool = pool()
+        self.workers = workers()
+        self._fill()
+
+    @property
+    def finished(self):
+        return self.done >= self.total
+
+    @property
+    def equity(self):
+        return self.share / self.done if self.done else 0.5
+
+    def _fill(self):
+        while len(self._inflight) < 2 * self.workers and self._submitted < self.total:
+            n = min(self.batch, self.total - self._submitted)
+            seed = int(self._seeds.spawn(1)[0].generate_state(1)[0])
+            self._inflight.append(self._pool.submit(equity, *self.args, n, seed))
+            self._submitted += n
+
+    def poll(self):
+        still = []
+        for f in self._inflight:
+            if f.done():
+                r = f.result()
+                self.done += r["n"]
+                self.share += r["equity"]
+            else:
+                still.append(f)
+        self._inflight = still
+        self._fill()
+        return self.done
+
+    def cancel(self):
+        for f in self._inflight:
+            f.cancel()
+        self._inflight = []
+        self._submitted = self.total
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="poker evaluator tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("bench", help="report hands evaluated per second")
+    b.add_argument("-n", type=int, default=1_000_000, help="hands per batch test")
+    e = sub.add_parser("equity", help="equity of a hand against random hands")
+    e.add_argument("hand", nargs=2)
+    e.add_argument("--board", nargs="*", default=[])
+    e.add_argument("--opponents", type=int, default=1)
+    e.add_argument("-n", type=int, default=2_000_000, help="rollouts")
+    e.add_argument("--batch", type=int, default=100_000)
+    e.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    t = time.perf_counter()
+    tables().ranks(7)
+    print(f"tables: {time.perf_counter() - t:.2f}s")
+
+    if args.cmd == "equity":
+        hero = [card(c) for c in args.hand]
+        board = [card(c) for c in args.board]
+        t = time.perf_counter()
+        job = EquityJob(hero, board, args.opponents, args.n, args.batch, args.seed)
+        while not job.finished:
+            job.poll()
+            time.sleep(0.005)
+        dt = time.perf_counter() - t
+        print(
+            f"{cards_str(hero)} | {cards_str(board) or '-'} vs {args.opponents}: "
+            f"equity {job.equity:.2%}  {job.done:,} boards in {dt:.2f}s "
+            f"({job.done / dt:,.0f}/s on {job.workers} worker(s))"
+        )
+        return
+
+    rng = random.Random(0)
+    hands = [rng.sample(range(52), 7) for _ in range(20_000)]
+    t = time.perf_counter()
+    for h in hands:
+        evaluate(h)
+    dt = time.perf_counter() - t
+    print(f"evaluate()        7 cards: {len(hands) / dt:>14,.0f} hands/s")
+    if np is None:
+        print("numpy not installed: no batch evaluation")
+        return
+    gen = np.random.default_rng(0)
+    for k in (5, 7):
+        cards = np.argsort(gen.random((args.n, 52)), axis=1)[:, :k].astype(np.uint8)
+        evaluate_batch(cards[:1000])  # builds the table outside the timing
+        t = time.perf_counter()
+        evaluate_batch(cards)
+        dt = time.perf_counter() - t
+        print(f"evaluate_batch()  {k} cards: {args.n / dt:>14,.0f} hands/s")
+    t = time.perf_counter()
+    r = equity([card("AS"), card("KS")], [], 1, 500_000, 0)
+    dt = time.perf_counter() - t
+    print(
+        f"equity() one process:  {r['n'] / dt:>10,.0f} boards/s "
+        f"(AS KS vs 1: {r['equity'] / r['n']:.2%})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# games/strategic.py
+"""
+The "strategic model" behind GLOBAL THERMONUCLEAR WAR: a toy exchange
+model, Monte Carlo'd.
+
+Each side is a set of arrays (city values, silos, warheads). simulate()
+plays a whole batch of first-strike / retaliation scenarios at once with
+NumPy, each with its own random reliability, doctrine and targeting, and
+returns only the aggregate counts. StrategicModel keeps a process pool
+busy with batches and merges the results as they arrive, so throughput
+grows with the number of cores and the UI only ever polls.
+"""
+
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # GTWState falls back to the scripted run
+    np = None
+
+SIDES = ("USA", "USSR")
+
+CITIES = 200
+SILOS = 100
+MIRV = 10  # warheads per silo
+SLBM = 600
+BOMBERS = 300
+PK_HARD = 0.55  # chance one arriving warhead kills a silo
+PK_SOFT = 0.95  # ... or a city
+WIN_LOSS = 0.1  # a side "wins" losing under this share of its value
+RUIN = 0.5  # while the other loses more than this
+
+
+def _cities(seed):
+    rng = np.random.default_rng(seed)
+    value = np.sort(rng.pareto(1.2, CITIES) + 1.0)[::-1]
+    return value / value.sum()
+
+
+_city_value = None
+
+
+def city_values():
+    global _city_value
+    if _city_value is None:
+        _city_value = (_cities(1983), _cities(1984))
+    return _city_value
+
+
+def _strike(rng, value, warheads, reliability):
+    """Destroyed share of `value` when `warheads` (per scenario) hit the best cities."""
+    b = len(warheads)
+    targeted = np.minimum(warheads // 2, CITIES)
+    per_city = np.where(np.arange(CITIES)[None, :] < targeted[:, None], 2, 0)
+    arrived = rng.binomial(per_city, reliability[:, None])
+    hit = rng.random((b, CITIES)) < 1.0 - (1.0 - PK_SOFT) ** arrived
+    return hit @ value
+
+
+def simulate(first, n, seed):
+    """Run `n` scenarios where side `first` (0 or 1) strikes first."""
+    rng = np.random.default_rng(seed)
+    value = city_values()
+    attacker, defender = value[first], value[1 - first]
+
+    # first strike: two warheads on every enemy silo, the rest on cities
+    rel = rng.uniform(0.65, 0.9, n)
+    arrived = rng.binomial(2, rel[:, None], (n, SILOS))
+    silos_hit = (rng.random((n, SILOS)) < 1.0 - (1.0 - PK_HARD) ** arrived).sum(1)
+    spare = SILOS * MIRV + SLBM + BOMBERS - 2 * SILOS
+    countervalue = (spare * rng.uniform(0.0, 1.0, n)).astype(np.int64)
+    defender_loss = _strike(rng, defender, countervalue, rel)
+
+    # retaliation with whatever survived
+    launch_on_warning = rng.random(n) < 0.35
+    silos_left = np.where(launch_on_warning, SILOS, SILOS - silos_hit)
+    subs = rng.uniform(0.6, 0.95, n)
+    alert = rng.uniform(0.2, 0.5, n)
+    reply = (silos_left * MIRV + SLBM * subs + BOMBERS * alert).astype(np.int64)
+    attacker_loss = _strike(rng, attacker, reply, rng.uniform(0.6, 0.85, n))
+
+    first_wins = (attacker_loss < WIN_LOSS) & (defender_loss > RUIN)
+    second_wins = (defender_loss < WIN_LOSS) & (attacker_loss > RUIN)
+    return {
+        "first": first,
+        "n": n,
+        "attacker_loss": float(attacker_loss.sum()),
+        "defender_loss": float(defender_loss.sum()),
+        "first_wins": int(first_wins.sum()),
+        "second_wins": int(second_wins.sum()),
+        "mutual": int(((attacker_loss > RUIN) & (defender_loss > RUIN)).sum()),
+    }
+
+
+class Totals:
+    def __init__(self):
+        self.n = 0
+        self.attacker_loss = 0.0
+        self.defender_loss = 0.0
+        self.first_wins = 0
+        self.second_wins = 0
+        self.mutual = 0
+
+    def add(self, r):
+        self.n += r["n"]
+        self.attacker_loss += r["attacker_loss"]
+        self.defender_loss += r["defender_loss"]
+        self.first_wins += r["first_wins"]
+        self.second_wins += r["second_wins"]
+        self.mutual += r["mutual"]
+
+    def share(self, count):
+        return count / self.n if self.n else 0.0
+
+
+_pool = None
+_workers = 0
+
+
+def pool():
+    """Shared worker pool, started on first use; one core is left for the UI."""
+    global _pool, _workers
+    if _pool is None:
+        n = max(1, (os.cpu_count() or 2) - 1)
+        _pool = ProcessPoolExecutor(max_workers=n, mp_context=mp.get_context("spawn"))
+        _workers = n
+    return _pool
+
+
+def workers():
+    """Processes in the shared pool (starting it if needed)."""
+    pool()
+    return _workers
+
+
+class StrategicModel:
+    """Streams batches through the pool until `total` scenarios are done.
+
+    Scenarios alternate between each side striking first. poll() never
+    blocks: it folds in whatever batches have finished and tops the pool
+    back up.
+    """
+
+    def __init__(self, total, batch, seed=None):
+        self.total = total
+        self.batch = batch
+        self.totals = (Totals(), Totals())  # indexed by the side striking first
+        self._seeds = np.random.SeedSequence(seed)
+        self._submitted = 0
+        self._inflight = []
+        self._pool = pool()
+        self.workers = workers()
+        self._fill()
+
+    @property
+    def done(self):
+        return self.totals[0].n + self.totals[1].n
+
+    @property
+    def finished(self):
+        return self.done >= self.total
+
+    def _fill(self):
+        while len(self._inflight) < 2 * self.workers and self._submitted < self.total:
+            n = min(self.batch, self.total - self._submitted)
+            first = (self._submitted // self.batch) % 2
+            seed = self._seeds.spawn(1)[0].generate_state(1)[0]
+            self._inflight.append(self._pool.submit(simulate, first, n, int(seed)))
+            self._submitted += n
+
+    def collect(self):
+        """Results of the batches finished since the last call; refills the pool."""
+        out, still = [], []
+        for f in self._inflight:
+            if f.done():
+                out.append(f.result())
+            else:
+                still.append(f)
+        self._inflight = still
+        self._fill()
+        return out
+
+    def add(self, results):
+        for r in results:
+            self.totals[r["first"]].add(r)
+        return self.done
+
+    def poll(self):
+        return self.add(self.collect())
+
+    def cancel(self):
+        for f in self._inflight:
+            f.cancel()
+        self._inflight = []
+        self._submitted = self.total
+
+    def winner(self, threshold=0.01):
+        """(side, share) of the best first strike, or None if none ever pays."""
+        best = max(
+            range(2), key=lambda s: self.totals[s].share(self.totals[s].first_wins)
+        )
+        share = self.totals[best].share(self.totals[best].first_wins)
+        return (SIDES[best], share) if share >= threshold else None
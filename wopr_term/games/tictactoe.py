@@ -0,0 +1,187 @@
+# games/tictactoe.py
+"""
+Perfect-play tic-tac-toe.
+
+A position is two 9-bit masks (x, o); bit r*3+c is cell (r, c). Side to
+move follows from the mark counts (X moves first). The whole game tree is
+solved once by memoised negamax into flat tables indexed by
+x | o << 9, shared by every caller in the process.
+"""
+
+import random
+import time
+from array import array
+
+LINES = (
+    0b000000111,
+    0b000111000,
+    0b111000000,
+    0b001001001,
+    0b010010010,
+    0b100100100,
+    0b100010001,
+    0b001010100,
+)
+FULL = 0b111111111
+
+_UNSOLVED = 2
+_score = None  # score for the side to move: 1 win, 0 draw, -1 loss
+_best = None  # bitmask of moves that achieve that score
+
+
+def key(x, o):
+    return x | (o << 9)
+
+
+def has_line(mask):
+    for line in LINES:
+        if mask & line == line:
+            return True
+    return False
+
+
+def winner(x, o):
+    if has_line(x):
+        return "X"
+    if has_line(o):
+        return "O"
+    return None
+
+
+def to_move(x, o):
+    return "X" if bin(x).count("1") == bin(o).count("1") else "O"
+
+
+def game_over(x, o):
+    return winner(x, o) is not None or (x | o) == FULL
+
+
+def solve():
+    """Build the shared tables (5478 reachable positions); cheap after the first call."""
+    global _score, _best
+    if _score is None:
+        score = array("b", [_UNSOLVED]) * (1 << 18)
+        best = array("H", [0]) * (1 << 18)
+        _negamax(0, 0, score, best)
+        _score, _best = score, best
+    return _score, _best
+
+
+def _negamax(me, them, score, best):
+    # `me` is the side to move; tables are keyed in (x, o) order
+    x, o = (me, them) if to_move(me, them) == "X" else (them, me)
+    k = key(x, o)
+    if score[k] != _UNSOLVED:
+        return score[k]
+    if has_line(them):
+        score[k] = -1
+        return -1
+    free = FULL & ~(me | them)
+    if not free:
+        score[k] = 0
+        return 0
+    top, moves = -2, 0
+    m = free
+    while m:
+        bit = m & -m
+        m ^= bit
+        s = -_negamax(them, me | bit, score, best)
+        if s > top:
+            top, moves = s, bit
+        elif s == top:
+            moves |= bit
+    score[k] = top
+    best[k] = moves
+    return top
+
+
+def cells(mask):
+    out = []
+    while mask:
+        bit = mask & -mask
+        out.append(bit.bit_length() - 1)
+        mask ^= bit
+    return out
+
+
+def best_moves(x, o):
+    """Cell indices (0-8) of every optimal move for the side to move."""
+    return cells(solve()[1][key(x, o)])
+
+
+def evaluate(x, o):
+    """1 / 0 / -1 for the side to move under perfect play."""
+    return solve()[0][key(x, o)]
+
+
+def play(x, o, cell):
+    bit = 1 << cell
+    if (x | o) & bit:
+        raise ValueError(f"cell {cell} is taken")
+    if to_move(x, o) == "X":
+        return x | bit, o
+    return x, o | bit
+
+
+class SelfPlay:
+    """WOPR playing itself: perfect play with a little exploration.
+
+    `run(budget)` plays whole games until the time budget (seconds) is
+    spent, so it can be sliced into a frame without stalling the UI.
+    """
+
+    def __init__(self, explore=0.1, seed=None):
+        self.explore = explore
+        self.rng = random.Random(seed)
+        self.games = 0
+        self.results = {"X": 0, "O": 0, "DRAW": 0}
+        self.last = (0, 0)  # final position of the most recent game
+        self.elapsed = 0.0
+        solve()
+
+    def play_game(self):
+        score, best = solve()
+        rng = self.rng
+        x = o = 0
+        turn_x = True
+        while True:
+            k = x | (o << 9)
+            if rng.random() < self.explore:
+                options = cells(FULL & ~(x | o))
+            else:
+                options = cells(best[k])
+            bit = 1 << rng.choice(options)
+            if turn_x:
+                x |= bit
+                if has_line(x):
+                    result = "X"
+                    break
+            else:
+                o |= bit
+                if has_line(o):
+                    result = "O"
+                    break
+            if (x | o) == FULL:
+                result = "DRAW"
+                break
+            turn_x = not turn_x
+        self.games += 1
+        self.results[result] += 1
+        self.last = (x, o)
+        return result
+
+    def run(self, budget):
+        t0 = time.perf_counter()
+        deadline = t0 + budget
+        n = 0
+        while True:
+            self.play_game()
+            n += 1
+            if n % 16 == 0 and time.perf_counter() >= deadline:
+                break
+        self.elapsed += time.perf_counter() - t0
+        return n
+
+    @property
+    def rate(self):
+        return self.games / self.elapsed if self.elapsed else 0.0
@@ -0,0 +1,93 @@
+# input.py
+"""
+Engine-level input handling, between SDL's queue and State.handle_events.
+
+- Only the event types the states read are queued at all. Mouse motion,
+  key-up and window chatter never reach Python.
+- Expose, show and restore events are queued but never reach the states.
+  The window is normally presented as dirty rects of a retained frame, so
+  after one of them the engine presents the whole frame again.
+- Runs of TEXTINPUT events (a paste, or fast typing during a slow frame)
+  become one event, so the terminal buffer grows once per run.
+- Input-to-present latency: from the moment a key event reaches the
+  queue until the frame that shows its effect has been handed to the
+  display. Arrival is SDL's timestamp where pygame passes it on, else the
+  first time the engine sees the event waiting: when the queue is read,
+  or when it is checked before and after each present (stamp()), so keys
+  that come in while a frame is built or the scheduler sleeps are not
+  timed from the next read. It is sampled into PROFILER, so PROFILE and
+  the overlay report it next to the frame phases.
+"""
+
+import time
+
+import pygame
+
+from .profiler import PROFILER
+
+INPUT_EVENTS = (pygame.QUIT, pygame.KEYDOWN, pygame.TEXTINPUT, pygame.VIDEORESIZE)
+# the window lost its pixels (uncovered, shown, un-minimised)
+EXPOSE_EVENTS = (
+    pygame.VIDEOEXPOSE,
+    pygame.WINDOWEXPOSED,
+    pygame.WINDOWSHOWN,
+    pygame.WINDOWRESTORED,
+)
+KEY_EVENTS = (pygame.KEYDOWN, pygame.TEXTINPUT)
+
+
+def coalesce(events):
+    """Merge consecutive TEXTINPUT events; everything else keeps its order."""
+    out = []
+    for e in events:
+        if e.type == pygame.TEXTINPUT and out and out[-1].type == pygame.TEXTINPUT:
+            out[-1] = pygame.event.Event(pygame.TEXTINPUT, text=out[-1].text + e.text)
+        else:
+            out.append(e)
+    return out
+
+
+def arrived(event, now):
+    """perf_counter() time `event` was queued; `now` if it carries no stamp."""
+    ms = getattr(event, "timestamp", None)  # SDL's, on the get_ticks() clock
+    if ms is None:
+        return now
+    return now - max(0, pygame.time.get_ticks() - ms) / 1000.0
+
+
+class InputDispatcher:
+    def __init__(self):
+        self._since = None  # when the oldest key read but not yet shown arrived
+        self._seen = None  # when a key still in the queue was first seen there
+        self.exposed = False  # the engine owes the window a full present
+
+    def install(self):
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(INPUT_EVENTS + EXPOSE_EVENTS))
+
+    def process(self, events):
+        if not events:
+            return events
+        if any(e.type in EXPOSE_EVENTS for e in events):
+            self.exposed = True
+            events = [e for e in events if e.type not in EXPOSE_EVENTS]
+        key = next((e for e in events if e.type in KEY_EVENTS), None)
+        if key is not None:
+            if self._since is None:
+                self._since = self._seen or arrived(key, time.perf_counter())
+            self._seen = None
+        return coalesce(events)
+
+    def presented(self, changed):
+        # a frame that changed nothing cannot have shown the key's effect
+        if self._since is not None and changed:
+            PROFILER.record_latency(time.perf_counter() - self._since)
+            self._since = None
+        self.stamp()
+
+    def stamp(self):
+        # keys that came in after the queue was read wait for the next read,
+        # after the rest of the frame and the scheduler's sleep: time them
+        # from when they are first seen waiting instead
+        if self._seen is None and pygame.event.peek(KEY_EVENTS):
+            self._seen = time.perf_counter()
@@ -0,0 +1,128 @@
+# loadgen.py
+"""
+Fake telnet clients for load-testing the remote terminal server.
+
+    python -m wopr_term.server --stats &
+    python -m wopr_term.loadgen --clients 300 --commands 10
+
+Each client logs on as JOSHUA and then types commands from a fixed mix,
+pausing between them like a person would. For every command it times
+the echo (first byte back) and the full response (until the prompt is
+shown again), and the percentiles over all clients are printed at the
+end. All clients run on one asyncio loop.
+"""
+
+import asyncio
+import random
+import re
+import time
+
+from .config import SERVER_HOST, SERVER_PORT
+
+# every one of these ends back at the "> " prompt
+COMMANDS = ("HELP", "STATUS", "GAMES", "PLAY POKER", "PLAY CHESS", "HELLO")
+_ANSI = re.compile(rb"\x1b\[[0-9;]*[A-Za-z]|\xff[\xfb-\xfe].")
+PROMPT = b"\r\n> "  # the prompt row, redrawn once a response is done
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.seen = b""
+
+    async def until(self, marker, timeout):
+        """Read until the (ANSI-stripped) output stops on `marker`."""
+        deadline = time.perf_counter() + timeout
+        while not self.seen.endswith(marker):
+            left = deadline - time.perf_counter()
+            if left <= 0:
+                raise asyncio.TimeoutError(marker)
+            data = await asyncio.wait_for(self.reader.read(4096), left)
+            if not data:
+                raise ConnectionError("server closed the connection")
+            self.seen = (self.seen + _ANSI.sub(b"", data))[-256:]
+        self.seen = b""
+
+    async def type(self, line):
+        t0 = time.perf_counter()
+        self.writer.write(line.encode() + b"\r\n")
+        await self.writer.drain()
+        data = await self.reader.read(4096)  # the echo
+        echo = time.perf_counter() - t0
+        self.seen = _ANSI.sub(b"", data)
+        return t0, echo
+
+
+async def run_client(i, args, stats, rng):
+    await asyncio.sleep(rng.random() * args.ramp)
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    c = Client(reader, writer)
+    try:
+        await c.until(b"LOGON> ", args.timeout)
+        await c.type("JOSHUA")
+        await c.until(b"PASSWORD> ", args.timeout)
+        await c.type("JOSHUA5")
+        await c.until(PROMPT, args.timeout)
+        for _ in range(args.commands):
+            await asyncio.sleep(rng.expovariate(1.0 / args.think))
+            t0, echo = await c.type(rng.choice(COMMANDS))
+            await c.until(PROMPT, args.timeout)
+            stats["echo"].append(echo)
+            stats["response"].append(time.perf_counter() - t0)
+        writer.write(b"EXIT\r\n")
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError) as err:
+        stats["errors"].append(f"client {i}: {err!r}")
+    finally:
+        writer.close()
+
+
+def _pct(values, p):
+    s = sorted(values)
+    return s[min(len(s) - 1, int(len(s) * p))] * 1000.0 if s else float("nan")
+
+
+async def run(args):
+    stats = {"echo": [], "response": [], "errors": []}
+    rng = random.Random(args.seed)
+    t0 = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_client(i, args, stats, random.Random(rng.random()))
+            for i in range(args.clients)
+        )
+    )
+    secs = time.perf_counter() - t0
+    n = len(stats["response"])
+    print(f"{args.clients} clients, {n} commands in {secs:.1f}s ({n / secs:.1f}/s)")
+    for name in ("echo", "response"):
+        v = stats[name]
+        print(
+            f"{name:9s} p50 {_pct(v, 0.5):8.1f} ms  p95 {_pct(v, 0.95):8.1f} ms"
+            f"  max {_pct(v, 1.0):8.1f} ms"
+        )
+    for err in stats["errors"][:10]:
+        print(err)
+    if stats["errors"]:
+        print(f"{len(stats['errors'])} CLIENTS FAILED")
+    return 1 if stats["errors"] else 0
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="load generator for wopr_term.server")
+    ap.add_argument("--host", default=SERVER_HOST)
+    ap.add_argument("--port", type=int, default=SERVER_PORT)
+    ap.add_argument("--clients", type=int, default=200)
+    ap.add_argument("--commands", type=int, default=10, help="per client")
+    ap.add_argument("--think", type=float, default=1.0, help="mean pause (s)")
+    ap.add_argument("--ramp", type=float, default=5.0, help="spread connects (s)")
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--seed", type=int, default=0)
+    return asyncio.run(run(ap.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,39 +1,105 @@
 # main.py
-import pygame
-from .config import W, H, FONT_NAME, FONT_SIZE
-from .engine import Engine
-from .states.login import LoginState
-from .states.tictactoe import TicTacToeState
+# Only config and the startup helpers load at import time; pygame, the
+# engine and the first state are imported inside main() so that
+# --profile-startup can time them.
+import argparse
+import random
 
+from .config import FONT_NAME, FONT_SIZE, RENDER_SCALE, RENDER_FILTER
+from .startup import StartupProfile, load_font
 
-def main():
-    pygame.init()
-    screen = pygame.display.set_mode((W, H))
-    clock = pygame.time.Clock()
 
-    font = pygame.font.SysFont(FONT_NAME, FONT_SIZE) or pygame.font.Font(
-        None, FONT_SIZE
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="WOPR terminal")
+    ap.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print time per import and init step up to the first frame",
     )
+    ap.add_argument(
+        "--record",
+        metavar="PATH",
+        help="log input and frame times for `python -m wopr_term.session replay`",
+    )
+    args = ap.parse_args(argv)
+
+    startup = StartupProfile()
+    if args.profile_startup:
+        startup.install()
+
+    with startup.step("load pygame"):
+        import pygame
+    with startup.step("pygame.init"):
+        pygame.init()
+    with startup.step("set_mode"):
+        from .engine import open_window
+
+        screen = open_window()
+    with startup.step("font"):
+        # the frame is drawn at 1/RENDER_SCALE of the window, text included
+        font_size = max(6, round(FONT_SIZE / RENDER_SCALE))
+        font = load_font(FONT_NAME, font_size)
+    with startup.step("engine"):
+        from .engine import Engine
+        from .profiler import PROFILER
 
-    engine = Engine(screen, font)
-    # engine.set_state(LoginState)
-    engine.set_state(TicTacToeState)
+        engine = Engine(
+            screen,
+            font,
+            defer_effects=True,
+            render_scale=RENDER_SCALE,
+            render_filter=RENDER_FILTER,
+        )
+    with startup.step("first state"):
+        # from .states.login import LoginState
+        # engine.set_state(LoginState)
+        from .states.tictactoe import TicTacToeState
+
+        start = TicTacToeState
+
+    recorder = None
+    if args.record:
+        from .session import Recorder, state_target
+
+        seed = random.randrange(1 << 63)
+        random.seed(seed)  # replays reseed with the same value
+        recorder = Recorder(
+            args.record,
+            state_target(start),
+            seed,
+            screen.get_size(),
+            (FONT_NAME, font_size),
+            RENDER_SCALE,
+        )
+        engine.tape = recorder.result
+    engine.set_state(start)
 
     pygame.key.start_text_input()
 
+    first = True
     while engine.running:
-        dt = clock.tick(60) / 1000.0
-        events = pygame.event.get()
-
-        # advance blink
-        engine.term.blink += dt
+        # sleeps while idle; states advance the cursor blink in update()
+        PROFILER.begin_frame()
+        dt, events = engine.scheduler.next_frame()
+        if recorder is not None:
+            recorder.frame(dt, events)
 
         # state cycle
-        engine.state.handle_events(events)
-        engine.state.update(dt)
-        engine.state.draw(screen)
+        with PROFILER.phase("handle_events"):
+            engine.state.handle_events(events)
+        with PROFILER.phase("update"):
+            engine.state.update(dt)
+        # engine.screen: a resize or F11 may have replaced the display surface
+        engine.present(engine.state.draw(engine.screen))
+        if first and args.profile_startup:
+            startup.uninstall()
+            print("\n".join(startup.report_lines()))
+        first = False
+        PROFILER.end_frame()
 
-        pygame.display.flip()
+    PROFILER.stop_trace()
+    if recorder is not None:
+        recorder.close(engine.term)
 
     pygame.quit()
 
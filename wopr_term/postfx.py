@@ -0,0 +1,174 @@
+# postfx.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+from .config import CRT_QUALITY, CRT_TIERS, CRT_FADE_S
+from .effects import make_vignette, make_scanlines
+from .profiler import PROFILER
+from .sizecache import SizeCache
+
+_masks = SizeCache()  # (size, scanlines, vignette) -> (multiply, add) layers
+_glow_bufs = SizeCache()  # size -> glow buffer (contents are rebuilt on use)
+_fade_bufs = SizeCache()  # size -> (multiply, add) layers part-way through a fade
+
+
+def crt_mask(size, scanlines=True, vignette=True):
+    """Scanlines and vignette folded into a (multiply, add) pair of overlays.
+
+    The add layer paints the scanline raster (None without scanlines).
+    """
+    key = (tuple(size), scanlines, vignette)
+    return _masks.get(key, lambda: _build_mask(*key))
+
+
+def _build_mask(size, scanlines, vignette):
+    if vignette:
+        mask = make_vignette(size).copy()
+    else:
+        mask = pygame.Surface(size, pygame.SRCALPHA)
+        mask.fill((255, 255, 255, 255))
+    raster = None
+    if scanlines:
+        rows, raster = make_scanlines(size)
+        if vignette:  # the vignette darkens the raster too
+            raster.blit(mask, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+        mask.blit(rows, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    return mask, raster
+
+
+_builder = None
+
+
+def _build_later(size, scanlines, vignette):
+    """crt_mask() on a background thread; returns a Future."""
+    global _builder
+    if _builder is None:
+        _builder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crt-mask")
+    return _builder.submit(crt_mask, size, scanlines, vignette)
+
+
+class PostFX:
+    """CRT post-processing: composites the terminal back buffer onto the screen.
+
+    Everything per-pixel is prebuilt; per frame the stage only touches the
+    dirty rects it is handed. Glow is kept in its own buffer and only the
+    changed regions are re-blurred.
+
+    With defer=True the mask is built on a worker thread: frames go out
+    without it until it is ready, then it fades in over CRT_FADE_S. A
+    resize to a size with no cached mask does the same, so dragging the
+    window never waits for a mask.
+    """
+
+    def __init__(self, size, quality=CRT_QUALITY, defer=False):
+        self.size = tuple(size)
+        self.glow_buf = None
+        self._pending = None
+        self.set_quality(quality, defer)
+
+    def set_quality(self, quality, defer=False):
+        quality = quality.upper()
+        if quality not in CRT_TIERS:
+            raise ValueError(f"unknown CRT quality {quality!r}")
+        self.quality = quality
+        self.glow, self._scanlines, self._vignette = CRT_TIERS[quality]
+        self._load(defer)
+
+    def resize(self, size):
+        size = tuple(size)
+        if size != self.size:
+            self.size = size
+            key = (size, self._scanlines, self._vignette)
+            self._load(defer=key not in _masks)
+
+    def _load(self, defer):
+        # the mask and glow buffer for the current size and tier
+        if self._pending is not None:
+            self._pending.cancel()  # superseded (e.g. a resize mid-drag)
+        self._pending = None
+        self._fade_from = None
+        self.mask = self.raster = self._mask = None
+        if self._scanlines or self._vignette:
+            args = (self.size, self._scanlines, self._vignette)
+            if defer:
+                self._pending = _build_later(*args)
+            else:
+                self.mask, self.raster = crt_mask(*args)
+        self.glow_buf = None
+        if self.glow:
+            self.glow_buf = _glow_bufs.get(self.size, lambda: pygame.Surface(self.size))
+        self.stale = True  # the caller should resubmit the whole frame
+
+    @property
+    def warming(self):
+        """True until a deferred mask has been built and fully faded in."""
+        return self._pending is not None or self._fade_from is not None
+
+    def _warm(self):
+        # called once per frame; swaps in the next step of the fade
+        if self._pending is not None:
+            if not self._pending.done():
+                return
+            self._mask = self._pending.result()
+            self._pending = None
+            self._fade_from = time.perf_counter()
+        t = (time.perf_counter() - self._fade_from) / CRT_FADE_S
+        if t >= 1.0:
+            self.mask, self.raster = self._mask
+            self._fade_from = None
+        else:
+            # the finished layers are shared, so the fade is built in scratch
+            # buffers: mask * t + white * (1 - t), and raster * t over black
+            mask, raster = self._mask
+            size = self.size
+            self.mask, fade_raster = _fade_bufs.get(
+                size,
+                lambda: (pygame.Surface(size, pygame.SRCALPHA), pygame.Surface(size)),
+            )
+            k = int(255 * t)
+            self.mask.fill((k, k, k, 255))
+            self.mask.blit(mask, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+            self.mask.fill((255 - k,) * 3, special_flags=pygame.BLEND_RGB_ADD)
+            if raster is not None:
+                self.raster = fade_raster
+                self.raster.fill((k, k, k))
+                self.raster.blit(raster, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+        self.stale = True
+
+    def apply(self, screen, src, rects):
+        for rect in rects:
+            with PROFILER.phase("glow"):
+                if self.glow_buf is not None:
+                    self._reglow(src, rect)
+                    screen.blit(self.glow_buf, rect, area=rect)
+                else:
+                    screen.blit(src, rect, area=rect)
+            if self.mask is not None:
+                with PROFILER.phase("crt_mask"):
+                    screen.blit(
+                        self.mask,
+                        rect,
+                        area=rect,
+                        special_flags=pygame.BLEND_RGBA_MULT,
+                    )
+                    if self.raster is not None:
+                        screen.blit(
+                            self.raster,
+                            rect,
+                            area=rect,
+                            special_flags=pygame.BLEND_RGB_ADD,
+                        )
+        self.stale = False
+        if self.warming:
+            self._warm()
+
+    def _reglow(self, src, rect):
+        # blur a slightly larger area so the glow bleeds across rect edges
+        pad = rect.inflate(8, 8).clip(src.get_rect())
+        region = src.subsurface(pad)
+        glow = pygame.transform.smoothscale(
+            region, (int(pad.w * 1.02), int(pad.h * 1.02))
+        )
+        glow = pygame.transform.smoothscale(glow, pad.size)
+        self.glow_buf.blit(glow, rect, area=rect.move(-pad.x, -pad.y))
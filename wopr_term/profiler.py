@@ -0,0 +1,181 @@
+# profiler.py
+import json
+import time
+from collections import deque
+
+import pygame
+
+PHASES = (
+    "events",
+    "handle_events",
+    "update",
+    "text",
+    "glow",
+    "crt_mask",
+    "upscale",
+    "present",
+)
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("prof", "name", "t0")
+
+    def __init__(self, prof, name):
+        self.prof = prof
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.prof._add(self.name, self.t0, time.perf_counter())
+        return False
+
+
+class FrameProfiler:
+    """Per-phase frame timings with rolling stats and Chrome trace export.
+
+    Disabled by default; `phase()` then hands back a shared no-op context
+    manager so the instrumented code pays almost nothing.
+    """
+
+    def __init__(self, window=240):
+        self.enabled = False
+        self.overlay = False
+        self.window = window
+        self.samples = {name: deque(maxlen=window) for name in PHASES}
+        self.frames = deque(maxlen=window)
+        self.latency = deque(maxlen=window)  # input dequeued -> frame presented
+        self._cur = {}
+        self._frame_t0 = None
+        self._trace = None
+        self._trace_first = True
+        self._epoch = time.perf_counter()
+
+    # recording
+    def phase(self, name):
+        return _Phase(self, name) if self.enabled else _NULL
+
+    def _add(self, name, t0, t1):
+        if self._frame_t0 is None:
+            self._frame_t0 = t0
+        self._cur[name] = self._cur.get(name, 0.0) + (t1 - t0)
+        if self._trace is not None:
+            self._emit(name, t0, t1 - t0)
+
+    def begin_frame(self):
+        self._cur = {}
+        self._frame_t0 = None
+
+    def end_frame(self):
+        # a frame's cost is the sum of its phases; time spent asleep in the
+        # scheduler waiting for input is not counted
+        if not self.enabled or self._frame_t0 is None:
+            return
+        t1 = time.perf_counter()
+        for name in PHASES:
+            self.samples[name].append(self._cur.get(name, 0.0))
+        self.frames.append(sum(self._cur.values()))
+        if self._trace is not None:
+            self._emit("frame", self._frame_t0, t1 - self._frame_t0, tid=0)
+        self._frame_t0 = None
+
+    def record_latency(self, seconds):
+        if self.enabled:
+            self.latency.append(seconds)
+
+    def reset(self):
+        for d in self.samples.values():
+            d.clear()
+        self.frames.clear()
+        self.latency.clear()
+
+    # reporting
+    def stats(self):
+        out = {}
+        series = dict(self.samples, frame=self.frames, latency=self.latency)
+        for name in PHASES + ("frame", "latency"):
+            data = series[name]
+            if not data:
+                continue
+            s = sorted(data)
+            out[name] = {
+                "mean_ms": 1000.0 * sum(s) / len(s),
+                "p95_ms": 1000.0 * s[min(len(s) - 1, int(len(s) * 0.95))],
+                "max_ms": 1000.0 * s[-1],
+            }
+        return out
+
+    def report_lines(self):
+        stats = self.stats()
+        if not stats:
+            return ["NO FRAMES RECORDED."]
+        lines = [f"{'PHASE':14s}{'MEAN':>8s}{'P95':>8s}{'MAX':>8s}"]
+        for name, st in stats.items():
+            lines.append(
+                f"{name.upper():14s}"
+                f"{st['mean_ms']:8.2f}{st['p95_ms']:8.2f}{st['max_ms']:8.2f}"
+            )
+        lines.append(f"(MS, LAST {len(self.frames)} FRAMES)")
+        return lines
+
+    def draw_overlay(self, screen, font):
+        """Draw the rolling stats in the top-right corner; returns the dirty rect."""
+        lines = self.report_lines()
+        lh = font.get_linesize()
+        surfs = [font.render(line, True, (255, 255, 255)) for line in lines]
+        w = max(s.get_width() for s in surfs) + 12
+        rect = pygame.Rect(screen.get_width() - w - 8, 8, w, lh * len(surfs) + 12)
+        screen.fill((0, 0, 0), rect)
+        y = rect.y + 6
+        for s in surfs:
+            screen.blit(s, (rect.x + 6, y))
+            y += lh
+        return rect
+
+    # trace export (Chrome trace-event JSON, loads in chrome://tracing / Perfetto)
+    def start_trace(self, path):
+        self.stop_trace()
+        self._trace = open(path, "w")
+        self._trace.write("[\n")
+        self._trace_first = True
+        self.enabled = True
+
+    def stop_trace(self):
+        if self._trace is not None:
+            self._trace.write("\n]\n")
+            self._trace.close()
+            self._trace = None
+
+    @property
+    def tracing(self):
+        return self._trace is not None
+
+    def _emit(self, name, t0, dur, tid=1):
+        ev = {
+            "name": name,
+            "ph": "X",
+            "ts": round((t0 - self._epoch) * 1e6, 1),
+            "dur": round(dur * 1e6, 1),
+            "pid": 1,
+            "tid": tid,
+        }
+        if not self._trace_first:
+            self._trace.write(",\n")
+        self._trace_first = False
+        self._trace.write(json.dumps(ev))
+
+
+PROFILER = FrameProfiler()
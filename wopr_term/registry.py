@@ -0,0 +1,151 @@
+# registry.py
+"""
+Command and game names for the WOPR prompt.
+
+Names live in a prefix trie, so a lookup costs the length of what was
+typed rather than the number of entries. An exact name or any
+unambiguous prefix resolves ("PLAY GLOB" -> GLOBAL THERMONUCLEAR WAR),
+and the same walk drives TAB completion. Games register a "module:Class"
+string and are imported on first PLAY, so a long game list costs nothing
+at startup.
+"""
+
+import importlib
+
+
+class _Node:
+    __slots__ = ("children", "value", "terminal", "count")
+
+    def __init__(self):
+        self.children = {}
+        self.value = None
+        self.terminal = False
+        self.count = 0  # names stored at or below this node
+
+
+class Trie:
+    def __init__(self, items=()):
+        self._root = _Node()
+        for key, value in items:
+            self.insert(key, value)
+
+    def __len__(self):
+        return self._root.count
+
+    def insert(self, key, value):
+        path = [self._root]
+        node = self._root
+        for ch in key:
+            node = node.children.setdefault(ch, _Node())
+            path.append(node)
+        if not node.terminal:
+            for n in path:
+                n.count += 1
+        node.terminal = True
+        node.value = value
+
+    def _find(self, prefix):
+        node = self._root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def get(self, key, default=None):
+        node = self._find(key)
+        return node.value if node is not None and node.terminal else default
+
+    def match(self, prefix):
+        """Value for an exact name or an unambiguous prefix, else None."""
+        node = self._find(prefix)
+        if node is None:
+            return None
+        if node.terminal:
+            return node.value
+        if node.count != 1:
+            return None
+        while not node.terminal:
+            (node,) = node.children.values()
+        return node.value
+
+    def complete(self, prefix):
+        """Every name starting with `prefix`, sorted."""
+        node = self._find(prefix)
+        out = []
+        if node is not None:
+            self._collect(node, prefix, out)
+        return sorted(out)
+
+    def _collect(self, node, key, out):
+        if node.terminal:
+            out.append(key)
+        for ch, child in node.children.items():
+            self._collect(child, key + ch, out)
+
+    def extend(self, prefix):
+        """`prefix` grown for as long as every name under it agrees."""
+        node = self._find(prefix)
+        if node is None:
+            return prefix
+        while not node.terminal and len(node.children) == 1:
+            ((ch, node),) = node.children.items()
+            prefix += ch
+        return prefix
+
+
+class Game:
+    """A PLAY target; `target` is "package.module:Class", None if not built yet."""
+
+    def __init__(self, name, target=None, args=None):
+        self.name = name
+        self.target = target
+        self.args = args  # fixed state args; None means parse what the player typed
+        self._cls = None
+
+    def load(self):
+        if self._cls is None and self.target is not None:
+            module, cls = self.target.split(":")
+            self._cls = getattr(importlib.import_module(module, __package__), cls)
+        return self._cls
+
+
+GAMES = Trie()
+GAME_LIST = []  # what GAMES prints, in registration order
+
+
+def register_game(name, target=None, args=None, listed=True):
+    GAMES.insert(name, Game(name, target, args))
+    if listed:
+        GAME_LIST.append(name)
+
+
+def find_game(words):
+    """Split PLAY's words into (game, remaining args).
+
+    The longest run of leading words that names a game (or is an
+    unambiguous prefix of one) wins, so "TIC 5 4" finds TIC-TAC-TOE with
+    args ["5", "4"]. Returns (None, candidates) when nothing matches.
+    """
+    for k in range(len(words), 0, -1):
+        game = GAMES.match(" ".join(words[:k]))
+        if game is not None:
+            return game, words[k:]
+    return None, GAMES.complete(" ".join(words[:1]))
+
+
+# the catalogue; modules are only imported when a game is first played
+register_game("FALKEN'S MAZE", ".states.maze:MazeState")
+register_game("BLACK JACK")
+register_game("GIN RUMMY")
+register_game("HEARTS")
+register_game("CHESS", ".states.chess:ChessState")
+register_game("POKER", ".states.poker:PokerState")
+register_game("FIGHTER COMBAT")
+register_game("GUERRILLA ENGAGEMENT")
+register_game("DESERT WARFARE")
+register_game("AIR-TO-GROUND ACTIONS")
+register_game("THEATERWIDE TACTICAL WARFARE")
+register_game("GLOBAL THERMONUCLEAR WAR", ".states.gtw:GTWState")
+register_game("TIC-TAC-TOE", ".states.tictactoe:TicTacToeState", listed=False)
+register_game("GOMOKU", ".states.tictactoe:TicTacToeState", (15, 5), listed=False)
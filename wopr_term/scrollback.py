@@ -0,0 +1,66 @@
+# scrollback.py
+from .config import SCROLLBACK_LINES, SCROLLBACK_CHARS
+
+
+class Scrollback:
+    """Fixed-capacity ring of terminal lines.
+
+    append() is O(1); once `capacity` lines or `max_chars` characters are
+    held, the oldest lines are dropped. Indexing and view() read straight
+    from the ring without copying.
+    """
+
+    def __init__(self, capacity=SCROLLBACK_LINES, max_chars=SCROLLBACK_CHARS):
+        self.capacity = max(1, capacity)
+        self.max_chars = max_chars
+        self._ring = [None] * self.capacity
+        self._head = 0  # index of the oldest line
+        self._len = 0
+        self.chars = 0
+        self.total = 0  # lines ever appended; never reset, so it works as a cursor
+
+    def append(self, text):
+        if self._len == self.capacity:
+            self._drop_oldest()
+        self._ring[(self._head + self._len) % self.capacity] = text
+        self._len += 1
+        self.chars += len(text)
+        self.total += 1
+        while self.chars > self.max_chars and self._len > 1:
+            self._drop_oldest()
+
+    def _drop_oldest(self):
+        self.chars -= len(self._ring[self._head])
+        self._ring[self._head] = None
+        self._head = (self._head + 1) % self.capacity
+        self._len -= 1
+
+    def clear(self):
+        self._ring = [None] * self.capacity
+        self._head = 0
+        self._len = 0
+        self.chars = 0
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("scrollback index out of range")
+        return self._ring[(self._head + i) % self.capacity]
+
+    def __iter__(self):
+        return self.view(0, self._len)
+
+    def view(self, start, stop):
+        """Yield lines[start:stop] (clamped) straight from the ring."""
+        start = max(0, start)
+        stop = min(self._len, stop)
+        ring, cap = self._ring, self.capacity
+        for i in range(self._head + start, self._head + stop):
+            yield ring[i % cap]
+
+    def tail(self, n):
+        return self.view(self._len - n, self._len)
@@ -0,0 +1,315 @@
+# server.py
+"""
+REMOTE TERMINAL ACCESS: WOPR over telnet, many sessions in one process.
+
+    python -m wopr_term.server [--host H] [--port P] [--baud B] [--stats]
+    telnet 127.0.0.1 2323
+
+Every connection gets its own StateMachine and TextTerminal, starting at
+LOGON. Nothing here opens a window: states run exactly as they do
+locally, input arrives as the same pygame events the local dispatcher
+produces, and the terminal is drawn as ANSI text (only what changed
+since the last write, like the local dirty rects).
+
+One asyncio loop serves everyone. Reading a client only runs that
+client's handlers. A single ticker steps just the sessions with
+something to do (output being typed, an animating state) SERVER_TICK_HZ
+times a second. Everyone else is updated twice a second, which is all
+the local scheduler does for an idle terminal. A few hundred sessions fit
+on one core. States that need the window, the shared chess worker or
+the shared worker pool (State.remote = False) are refused (GTW, which
+works without its model, plays the scripted countdown instead), and so is
+PROFILE, which switches the process-wide profiler and writes its trace
+on the host (StateMachine.host_only), so remote clients cannot queue
+work on the host's cores or touch its files.
+"""
+
+import os
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import asyncio
+import time
+
+import pygame
+
+from .config import (
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_COLUMNS,
+    SERVER_TICK_HZ,
+    SERVER_WRITE_LIMIT,
+    TELETYPE_BAUD,
+)
+from .engine import StateMachine
+from .terminal import TextTerminal
+from .wrap import CharLayout
+
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+ECHO, SGA = 1, 3
+# we echo and the client sends each key as it is typed (character mode)
+HELLO = bytes((IAC, WILL, ECHO, IAC, WILL, SGA, IAC, DO, SGA)) + b"\x1b[32m"
+GOODBYE = b"\x1b[0m\r\n"
+_IDLE_S = 0.5
+
+_KEYS = {
+    0x7F: pygame.K_BACKSPACE,
+    0x08: pygame.K_BACKSPACE,
+    0x09: pygame.K_TAB,
+}
+
+
+def _key(key):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0)
+
+
+class AnsiTerminal(TextTerminal):
+    """A TextTerminal drawn as a stream of text for an ANSI terminal."""
+
+    def __init__(self, columns=SERVER_COLUMNS):
+        super().__init__(CharLayout(columns))
+        self._sent = 0  # lines.total already written out
+        self._row = ""  # what the client's bottom row shows
+        self._cleared = True
+
+    def clear(self):
+        super().clear()
+        self._cleared = True
+
+    def render(self):
+        """The text that brings the client's screen up to date ("" if none)."""
+        out = []
+        if self._cleared:
+            out.append("\x1b[2J\x1b[H")
+            self._sent = self.lines.total - len(self.lines)
+            self._row = ""
+            self._cleared = False
+        new = self.lines.total - self._sent
+        if new:
+            # finished lines replace the bottom row and push it down
+            out.append("\r\x1b[K")
+            n = len(self.lines)
+            out.extend(line + "\r\n" for line in self.lines.view(n - new, n))
+            self._sent = self.lines.total
+            self._row = ""
+        typing = self.output.typing
+        row = self.prompt + self.buffer if typing is None else typing
+        row = row[-(self.layout.width - 1) :]
+        if row != self._row:
+            if row.startswith(self._row):
+                out.append(row[len(self._row) :])
+            else:
+                out.append("\r\x1b[K" + row)
+            self._row = row
+        return "".join(out)
+
+
+class TelnetInput:
+    """Bytes from a telnet client -> the events a local keyboard would make."""
+
+    def __init__(self):
+        self._mode = None  # None, "esc", "csi", or a telnet command in progress
+        self._text = bytearray()
+        self._cr = False  # swallow the LF/NUL that follows a CR
+
+    def feed(self, data):
+        events = []
+        for b in data:
+            mode = self._mode
+            if mode == "esc":
+                self._mode = None
+                if b == ord("["):
+                    self._mode = "csi"
+                    continue
+                events.append(_key(pygame.K_ESCAPE))  # then b is read as usual
+            elif mode is not None:
+                self._mode = self._telnet(mode, b)
+                continue
+            if b == IAC:
+                self._mode = "iac"
+                continue
+            cr, self._cr = self._cr, False
+            if 32 <= b != 0x7F:
+                self._text.append(b)
+                continue
+            self._flush_text(events)
+            if b == 0x0D:
+                events.append(_key(pygame.K_RETURN))
+                self._cr = True
+            elif b == 0x0A:
+                if not cr:
+                    events.append(_key(pygame.K_RETURN))
+            elif b in _KEYS:
+                events.append(_key(_KEYS[b]))
+            elif b == 0x1B:
+                self._mode = "esc"
+            elif b in (0x03, 0x04):  # ^C, ^D
+                events.append(pygame.event.Event(pygame.QUIT))
+        if self._mode == "esc":  # a lone ESC: nothing followed it in this read
+            events.append(_key(pygame.K_ESCAPE))
+            self._mode = None
+        self._flush_text(events)
+        return events
+
+    def _telnet(self, mode, b):
+        # returns the next mode
+        if mode == "iac":
+            if b == IAC:
+                self._text.append(b)  # escaped 0xFF data byte
+                return None
+            if b in (WILL, WONT, DO, DONT):
+                return "opt"
+            return "sb" if b == SB else None
+        if mode == "opt":
+            return None  # option negotiation: we asked for what we need
+        if mode == "sb":
+            return "sb-iac" if b == IAC else "sb"
+        if mode == "sb-iac":
+            return None if b == SE else "sb"
+        # csi: arrows, function keys... nothing a text state reads
+        return None if 0x40 <= b <= 0x7E else "csi"
+
+    def _flush_text(self, events):
+        if self._text:
+            text = self._text.decode("utf-8", errors="ignore")
+            self._text.clear()
+            if text:
+                events.append(pygame.event.Event(pygame.TEXTINPUT, text=text))
+
+
+class RemoteSession(StateMachine):
+    local = False
+
+    def __init__(self, writer, baud):
+        super().__init__(AnsiTerminal())
+        self.writer = writer
+        self.input = TelnetInput()
+        self.term.output.set_baud(baud)
+        self._last = time.perf_counter()
+
+    def host_only(self):
+        self.term.println("NOT AVAILABLE ON REMOTE TERMINALS.")
+        return False
+
+    def set_state(self, state_cls, *args, **kwargs):
+        if not state_cls.remote and not self.host_only():
+            return
+        super().set_state(state_cls, *args, **kwargs)
+
+    @property
+    def busy(self):
+        return self.running and (self.term.output.busy or self.state.is_animating())
+
+    def receive(self, data):
+        self.state.handle_events(self.input.feed(data))
+        self.send()
+
+    def step(self, now):
+        dt, self._last = now - self._last, now
+        self.state.update(dt)
+        # a slow reader keeps its output queued instead of in our buffers
+        if self.writer.transport.get_write_buffer_size() < SERVER_WRITE_LIMIT:
+            self.term.output.pump()
+        self.send()
+
+    def send(self):
+        text = self.term.render()
+        if text:
+            self.writer.write(text.encode())
+
+
+class Server:
+    def __init__(self, start, baud=TELETYPE_BAUD):
+        self.start = start
+        self.baud = baud
+        self.sessions = set()
+        self.active = set()  # sessions the ticker steps at full rate
+        self.worst_tick = 0.0
+
+    async def serve(self, host, port, stats=False):
+        server = await asyncio.start_server(self._client, host, port, backlog=1024)
+        print(f"WOPR LISTENING ON {host}:{port}")
+        # keep references: the loop only holds tasks weakly
+        self._tasks = [asyncio.create_task(self._ticker())]
+        if stats:
+            self._tasks.append(asyncio.create_task(self._stats()))
+        async with server:
+            await server.serve_forever()
+
+    async def _client(self, reader, writer):
+        session = RemoteSession(writer, self.baud)
+        writer.write(HELLO)
+        session.set_state(self.start)
+        self.sessions.add(session)
+        self.active.add(session)
+        try:
+            while session.running:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                session.receive(data)
+                self.active.add(session)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.discard(session)
+            self.active.discard(session)
+            if not writer.is_closing():
+                writer.write(GOODBYE)
+                writer.close()
+
+    async def _ticker(self):
+        period = 1.0 / SERVER_TICK_HZ
+        idle_due = 0.0
+        while True:
+            await asyncio.sleep(period)
+            t0 = now = time.perf_counter()
+            sessions = self.active
+            if now >= idle_due:
+                sessions = self.sessions
+                idle_due = now + _IDLE_S
+            for s in list(sessions):
+                s.step(now)
+                if not s.running:
+                    if not s.writer.is_closing():
+                        s.writer.write(GOODBYE)
+                        s.writer.close()  # the reader loop sees EOF and cleans up
+                elif not s.busy:
+                    self.active.discard(s)
+                else:
+                    self.active.add(s)
+            self.worst_tick = max(self.worst_tick, time.perf_counter() - t0)
+
+    async def _stats(self):
+        while True:
+            await asyncio.sleep(5.0)
+            print(
+                f"SESSIONS {len(self.sessions):5d}  ACTIVE {len(self.active):5d}  "
+                f"WORST TICK {self.worst_tick * 1000:6.1f} MS"
+            )
+            self.worst_tick = 0.0
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="WOPR remote terminal server")
+    ap.add_argument("--host", default=SERVER_HOST)
+    ap.add_argument("--port", type=int, default=SERVER_PORT)
+    ap.add_argument("--baud", type=int, default=TELETYPE_BAUD, help="0 = no typing")
+    ap.add_argument("--stats", action="store_true", help="print load every 5s")
+    args = ap.parse_args(argv)
+
+    from .states.login import LoginState
+
+    try:
+        asyncio.run(
+            Server(LoginState, args.baud).serve(args.host, args.port, args.stats)
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
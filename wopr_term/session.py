@@ -0,0 +1,346 @@
+# session.py
+"""
+Session logs: record a run's input and frame times, replay them headless.
+
+    python game.py --record run.wopr
+    python -m wopr_term.session replay run.wopr [--render] [--loose]
+    python -m wopr_term.session dump run.wopr
+
+A log is a zlib stream (sync-flushed after the header, then every second
+or few hundred frames, so a crash loses at most the last second) of
+varint-packed records:
+
+    header  magic, W, H, random seed, font size, render scale, font name,
+            "module:Class" of the first state
+    frame   dt in microseconds, then the frame's events (already filtered
+            and coalesced by the input dispatcher)
+    result  a key and the repr of a background result a state consumed
+            during the frame before it (StateMachine.background)
+    end     the final scrollback, once all queued output has been typed
+
+Replay seeds `random` the same way and feeds each frame's events and dt to
+the state exactly as the main loop did, with the teletype on a virtual
+clock that only advances by the recorded dt, so a log replays as fast as
+the machine can run the states. Background work (the chess search, poker
+equity, the GTW model) arrives on wall-clock time, so replay does not wait
+for it: the jobs still run, but states are handed the recorded results
+on the frames that consumed them and the live ones are dropped. Work
+budgeted in wall time inside a frame (maze slices) still runs for real,
+so text that reports its timings can differ; --loose compares with
+digits masked.
+"""
+
+import ast
+
+import importlib
+import os
+import random
+import re
+import sys
+import time
+import zlib
+
+import pygame
+
+MAGIC = b"WOPR-SESSION\x03"
+_MAGIC_V2 = b"WOPR-SESSION\x02"  # no background results
+_MAGIC_V1 = b"WOPR-SESSION\x01"  # no render scale in the header (always 1)
+_FRAME, _END, _RESULT = 1, 2, 3
+# event types a log can hold: the input dispatcher lets nothing else through
+_EVENTS = (pygame.QUIT, pygame.KEYDOWN, pygame.TEXTINPUT, pygame.VIDEORESIZE)
+_SYNC_EVERY = 256  # frames between zlib sync flushes...
+_SYNC_S = 1.0  # ...or seconds, whichever comes first
+
+
+def _put_uint(buf, n):
+    while n >= 0x80:
+        buf.append(n & 0x7F | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def _put_str(buf, s):
+    data = s.encode("utf-8")
+    _put_uint(buf, len(data))
+    buf += data
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def uint(self):
+        n = shift = 0
+        while True:
+            b = self.data[self.pos]
+            self.pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                return n
+            shift += 7
+
+    def str(self):
+        n = self.uint()
+        s = self.data[self.pos : self.pos + n].decode("utf-8")
+        self.pos += n
+        return s
+
+    def more(self):
+        return self.pos < len(self.data)
+
+
+def state_target(cls):
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+class Recorder:
+    def __init__(self, path, start, seed, size, font, scale=1):
+        self._file = open(path, "wb")
+        self._z = zlib.compressobj(9)
+        self.frames = 0
+        buf = bytearray(MAGIC)
+        for n in (*size, seed, font[1], scale):
+            _put_uint(buf, n)
+        _put_str(buf, font[0])
+        _put_str(buf, start)
+        self._write(buf, zlib.Z_SYNC_FLUSH)  # a log that crashes early still loads
+
+    def _write(self, buf, mode=None):
+        self._file.write(self._z.compress(bytes(buf)))
+        if mode is not None:
+            self._file.write(self._z.flush(mode))
+            self._file.flush()
+            self._synced = time.monotonic()
+
+    def frame(self, dt, events):
+        buf = bytearray((_FRAME,))
+        _put_uint(buf, round(dt * 1e6))
+        _put_uint(buf, len(events))
+        for e in events:
+            buf.append(_EVENTS.index(e.type))
+            if e.type == pygame.KEYDOWN:
+                for n in (e.key, e.mod, getattr(e, "scancode", 0)):
+                    _put_uint(buf, n)
+                _put_str(buf, getattr(e, "unicode", ""))
+            elif e.type == pygame.TEXTINPUT:
+                _put_str(buf, e.text)
+            elif e.type == pygame.VIDEORESIZE:
+                _put_uint(buf, e.w)
+                _put_uint(buf, e.h)
+        self.frames += 1
+        sync = (
+            self.frames % _SYNC_EVERY == 0 or time.monotonic() - self._synced >= _SYNC_S
+        )
+        self._write(buf, zlib.Z_SYNC_FLUSH if sync else None)
+
+    def result(self, key, value):
+        """Log a background result consumed this frame (engine.tape)."""
+        if value:
+            buf = bytearray((_RESULT,))
+            _put_str(buf, key)
+            _put_str(buf, repr(value))
+            self._write(buf)
+        return value
+
+    def close(self, term):
+        """Type out anything still queued and store the final scrollback."""
+        drain(term)
+        buf = bytearray((_END,))
+        _put_uint(buf, len(term.lines))
+        for line in term.lines:
+            _put_str(buf, line)
+        self._write(buf, zlib.Z_FINISH)
+        self._file.close()
+
+
+class Session:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            # decompressobj, not decompress(): a crashed run has no stream end
+            data = zlib.decompressobj().decompress(f.read())
+        if not data.startswith((MAGIC, _MAGIC_V2, _MAGIC_V1)):
+            raise ValueError(f"{path}: not a session log")
+        r = _Reader(data)
+        r.pos = len(MAGIC)
+        w, h, self.seed, font_size = (r.uint() for _ in range(4))
+        # the window size; states saw it divided by the render scale
+        self.size = (w, h)
+        self.scale = 1 if data.startswith(_MAGIC_V1) else r.uint()
+        self.font = (r.str(), font_size)
+        self.start = r.str()
+        self.frames = []  # [(dt, [event, ...]), ...]
+        self.results = {}  # frame index -> [(key, value), ...] consumed in it
+        self.final = None  # scrollback lines, None if the run did not end cleanly
+        while r.more():
+            kind = r.uint()
+            if kind == _FRAME:
+                self.frames.append(self._frame(r))
+            elif kind == _RESULT:
+                key, value = r.str(), ast.literal_eval(r.str())
+                self.results.setdefault(len(self.frames) - 1, []).append((key, value))
+            elif kind == _END:
+                self.final = [r.str() for _ in range(r.uint())]
+            else:
+                raise ValueError(f"{path}: bad record {kind} at byte {r.pos}")
+
+    @staticmethod
+    def _frame(r):
+        dt = r.uint() / 1e6
+        events = []
+        for _ in range(r.uint()):
+            etype = _EVENTS[r.uint()]
+            if etype == pygame.KEYDOWN:
+                key, mod, scancode = r.uint(), r.uint(), r.uint()
+                e = pygame.event.Event(
+                    etype, key=key, mod=mod, scancode=scancode, unicode=r.str()
+                )
+            elif etype == pygame.TEXTINPUT:
+                e = pygame.event.Event(etype, text=r.str())
+            elif etype == pygame.VIDEORESIZE:
+                w, h = r.uint(), r.uint()
+                e = pygame.event.Event(etype, w=w, h=h, size=(w, h))
+            else:
+                e = pygame.event.Event(etype)
+            events.append(e)
+        return dt, events
+
+
+def drain(term):
+    """Move every queued line into the scrollback right away."""
+    out = term.output
+    out.set_baud(0)
+    out.flush()
+    while out.busy:
+        out.pump()
+
+
+class VirtualClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class Playback:
+    """engine.tape for a replay: the recorded results, frame by frame."""
+
+    def __init__(self, results):
+        self.results = {i: list(rs) for i, rs in results.items()}
+        self.frame = -1
+
+    def __call__(self, key, live):
+        # the live result is dropped; only what the recorded run consumed counts
+        pending = self.results.get(self.frame, ())
+        for i, (k, value) in enumerate(pending):
+            if k == key:
+                del pending[i]
+                return value
+        return None
+
+
+def replay(session, render=False):
+    """Run a session's frames through a fresh engine; returns (engine, seconds)."""
+    from .config import RENDER_FILTER
+    from .engine import Engine
+    from .startup import load_font
+
+    pygame.init()
+    screen = pygame.display.set_mode(session.size)
+    random.seed(session.seed)
+    engine = Engine(
+        screen,
+        load_font(*session.font),
+        render_scale=session.scale,
+        render_filter=RENDER_FILTER,
+    )
+    clock = engine.term.output.clock = VirtualClock()
+    tape = engine.tape = Playback(session.results)
+    module, name = session.start.split(":")
+    engine.set_state(getattr(importlib.import_module(module), name))
+
+    t0 = time.perf_counter()
+    for i, (dt, events) in enumerate(session.frames):
+        tape.frame = i
+        clock.t += dt
+        engine.state.handle_events(events)
+        engine.state.update(dt)
+        if render:
+            engine.present(engine.state.draw(engine.screen))
+        else:
+            engine.term.output.pump()  # normally run by the draw
+        if not engine.running:
+            break
+    drain(engine.term)
+    return engine, time.perf_counter() - t0
+
+
+def compare(expected, actual, loose=False):
+    """Index of the first differing line (-1 if equal) after optional masking."""
+    if loose:
+        mask = re.compile(r"\d+")
+        expected = [mask.sub("#", s) for s in expected]
+        actual = [mask.sub("#", s) for s in actual]
+    for i, (a, b) in enumerate(zip(expected, actual)):
+        if a != b:
+            return i
+    return -1 if len(expected) == len(actual) else min(len(expected), len(actual))
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="session log tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("replay", help="replay headless and check the scrollback")
+    p.add_argument("log")
+    p.add_argument("--render", action="store_true", help="draw every frame too")
+    p.add_argument("--loose", action="store_true", help="ignore digits when checking")
+    d = sub.add_parser("dump", help="print the frames and events in a log")
+    d.add_argument("log")
+    args = ap.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    session = Session(args.log)
+    if args.cmd == "dump":
+        print(
+            f"{session.start}  seed {session.seed}  {session.size}"
+            f"  scale {session.scale}  {session.font}"
+        )
+        for i, (dt, events) in enumerate(session.frames):
+            if events:
+                names = ", ".join(
+                    pygame.event.event_name(e.type)
+                    + (f" {e.text!r}" if e.type == pygame.TEXTINPUT else "")
+                    + (f" {pygame.key.name(e.key)}" if e.type == pygame.KEYDOWN else "")
+                    for e in events
+                )
+                print(f"{i:7d} {dt * 1000:8.2f} ms  {names}")
+            for key, value in session.results.get(i, ()):
+                print(f"{i:7d} {'':11s}  {key}: {value!r:.100}")
+        return 0
+
+    engine, secs = replay(session, args.render)
+    recorded = sum(dt for dt, _ in session.frames)
+    print(
+        f"{len(session.frames)} frames ({recorded:.1f}s recorded) replayed in "
+        f"{secs:.2f}s, {len(session.frames) / max(secs, 1e-9):,.0f} frames/s"
+    )
+    if session.final is None:
+        print("NO FINAL SCROLLBACK IN LOG (run did not exit cleanly); not checked.")
+        return 0
+    actual = list(engine.term.lines)
+    bad = compare(session.final, actual, args.loose)
+    if bad < 0:
+        print(f"SCROLLBACK MATCHES ({len(actual)} lines).")
+        return 0
+    print(f"SCROLLBACK DIFFERS AT LINE {bad}:")
+    print(f"  recorded: {session.final[bad] if bad < len(session.final) else '<end>'}")
+    print(f"  replayed: {actual[bad] if bad < len(actual) else '<end>'}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
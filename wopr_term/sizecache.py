@@ -0,0 +1,47 @@
+# sizecache.py
+import threading
+from collections import OrderedDict
+
+from .config import SIZE_CACHE_SIZE
+
+
+class SizeCache:
+    """Small LRU for things built per window size (layouts, buffers, masks).
+
+    Keys are the size plus whatever else the value depends on. A resize
+    back to a size seen recently (dragging the window, leaving fullscreen)
+    reuses what was built for it. Lookups are locked because the CRT masks
+    are built on a worker thread; builds run outside the lock.
+    """
+
+    def __init__(self, capacity=SIZE_CACHE_SIZE):
+        self.capacity = capacity
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def get(self, key, build):
+        """The cached value for `key`, calling build() the first time."""
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            if len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
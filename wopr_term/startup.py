@@ -0,0 +1,161 @@
+# startup.py
+"""
+Cold-start helpers.
+
+- load_font(): the system font scan (pygame.font.match_font, which shells
+  out to fc-list or walks the registry) runs once per font name; the
+  resolved file path is kept in CACHE_DIR and reused on later starts.
+- StartupProfile: `python game.py --profile-startup` times every module
+  import and every init step up to the first presented frame.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from .config import CACHE_DIR
+
+FONT_CACHE_PATH = os.path.join(CACHE_DIR, "fonts.json")
+
+
+def _read_font_cache():
+    try:
+        with open(FONT_CACHE_PATH) as f:
+            paths = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return paths if isinstance(paths, dict) else {}
+
+
+def _write_font_cache(paths):
+    # the cache is an optimisation only, so a read-only home is not an error
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{FONT_CACHE_PATH}.{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(paths, f, indent=1, sort_keys=True)
+        os.replace(tmp, FONT_CACHE_PATH)
+    except OSError:
+        pass
+
+
+def resolve_font(name):
+    """File path for a system font name ("" if there is none), cached on disk."""
+    import pygame
+
+    paths = _read_font_cache()
+    path = paths.get(name)
+    # "" records "not installed"; a cached file that has gone away is re-resolved
+    if path is None or (path and not os.path.exists(path)):
+        path = pygame.font.match_font(name) or ""
+        paths[name] = path
+        _write_font_cache(paths)
+    return path
+
+
+def load_font(name, size):
+    """Like SysFont(name, size), falling back to pygame's default font."""
+    import pygame
+
+    path = resolve_font(name)
+    if path:
+        try:
+            return pygame.font.Font(path, size)
+        except (pygame.error, OSError):
+            pass
+    return pygame.font.Font(None, size)
+
+
+# --- --profile-startup ----------------------------------------------------
+
+
+class _TimedLoader:
+    """Wraps a module loader so that executing the module is timed."""
+
+    def __init__(self, loader, name, profile):
+        self._loader = loader
+        self._name = name
+        self._profile = profile
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profile._enter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profile._leave("import " + self._name)
+
+
+class StartupProfile:
+    """Self and cumulative time per import and per named init step.
+
+    Nested work is charged to the innermost entry, like `python -X
+    importtime`: an import's self time excludes the imports it triggers.
+    """
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.entries = []  # (name, self_s, total_s, depth)
+        self._stack = []  # [start, child_s] per open entry
+
+    # meta path finder protocol: time modules not yet imported
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, name, self)
+                return spec
+        return None
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def _enter(self):
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def _leave(self, name):
+        start, child = self._stack.pop()
+        total = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][1] += total
+        self.entries.append((name, total - child, total, len(self._stack)))
+
+    @contextmanager
+    def step(self, name):
+        self._enter()
+        try:
+            yield
+        finally:
+            self._leave(name)
+
+    def report_lines(self, top=25):
+        elapsed = time.perf_counter() - self.t0
+        imports = [e for e in self.entries if e[0].startswith("import ")]
+        steps = [e for e in self.entries if not e[0].startswith("import ")]
+        import_s = sum(e[1] for e in imports)
+        lines = [
+            f"STARTUP {elapsed * 1000:.1f} MS TO FIRST FRAME "
+            f"({len(imports)} imports, {import_s * 1000:.1f} ms)",
+            "",
+            f"{'self ms':>9} {'total ms':>9}  step",
+        ]
+        for name, own, total, depth in steps:
+            lines.append(f"{own * 1000:9.1f} {total * 1000:9.1f}  {'  ' * depth}{name}")
+        lines += ["", f"{'self ms':>9} {'total ms':>9}  slowest imports"]
+        for name, own, total, depth in sorted(imports, key=lambda e: -e[1])[:top]:
+            lines.append(f"{own * 1000:9.1f} {total * 1000:9.1f}  {name[7:]}")
+        return lines
@@ -1,43 +1,207 @@
-
 # states/chess.py
-import pygame
+import random
+import time
 from ..engine import State
-# Hook up python-chess later if desired
+from ..config import CHESS_MOVETIME_S, CHESS_BOOK_PATH
+from ..games.chess import Position, START_FEN, WHITE
+from ..games.chess_book import open_book
+from ..games.chess_search import MATE, TimeControl, service
 
 class ChessState(State):
+    remote = False  # the search worker is one process, shared by the whole app
+
     def enter(self):
+        self.pos = Position()
+        self.player = WHITE
+        self.tc = TimeControl(movetime=CHESS_MOVETIME_S)
+        self.wopr_clock = None  # seconds left when LEVEL CLOCK is in force
+        self.search = service()  # starts the worker now, not on the first move
+        # set by think(), cleared by the bestmove this state consumes (which a
+        # replay hands back from the log), not by the worker's own timing
+        self.thinking = False
+        self._think_t0 = 0.0
+        self.book = open_book(CHESS_BOOK_PATH)  # None without a book file
+        self.rng = random.Random(random.getrandbits(64))  # reproducible in replays
         self.term.prompt = "CHESS> "
         self.term.println("CHESS MODE READY.")
-        self.term.println("CMDS: BOARD, MOVE <...>, UNDO, RESET, EXIT (back)")
-
-    def handle_events(self, events):
-        for e in events:
-            if e.type == pygame.QUIT:
-                self.engine.quit()
-            elif e.type == pygame.TEXTINPUT:
-                self.term.handle_textinput(e.text)
-            elif e.type == pygame.KEYDOWN:
-                if e.key == pygame.K_ESCAPE:
-                    from .prompt import PromptState
-                    self.engine.set_state(PromptState)
-                else:
-                    entry = self.term.handle_keydown(e.key)
-                    if entry is not None:
-                        cmd = entry.strip().upper()
-                        self.term.println(self.term.prompt + cmd)
-                        if cmd == "EXIT":
-                            from .prompt import PromptState
-                            self.engine.set_state(PromptState)
-                        elif cmd == "BOARD":
-                            self.term.println("[board here]")
-                        elif cmd.startswith("MOVE"):
-                            self.term.println("OK.")
-                        elif cmd == "RESET":
-                            self.term.println("NEW GAME.")
-                        elif cmd == "UNDO":
-                            self.term.println("TAKEN BACK.")
-                        else:
-                            self.term.println("UNKNOWN CHESS CMD.")
+        self.term.println("CMDS: BOARD, MOVE <...>, UNDO, RESET, GO, STOP, LEVEL, BOOK, EXIT (back)")
+
+    def is_animating(self):
+        # poll the worker every frame while it thinks
+        return self.thinking
+
+    def on_escape(self):
+        self.leave()
+
+    def on_command(self, entry):
+        cmd = entry.strip().upper()
+        self.term.println(self.term.prompt + entry.strip())
+        if cmd == "EXIT":
+            self.leave()
+        elif cmd == "BOARD":
+            self.show_board()
+        elif cmd.split()[:1] == ["MOVE"]:
+            self.move(entry.strip()[4:].strip())
+        elif cmd == "RESET":
+            self.cancel_search()
+            self.pos = Position()
+            self.player = WHITE
+            if self.tc.clock is not None:
+                self.wopr_clock = self.tc.clock
+            self.term.println("NEW GAME.")
+        elif cmd == "UNDO":
+            self.undo()
+        elif cmd == "GO":
+            self.go()
+        elif cmd == "STOP":
+            if self.thinking:
+                self.search.stop()
+            else:
+                self.term.println("NOT THINKING.")
+        elif cmd == "BOOK":
+            self.show_book()
+        elif cmd.split()[:1] == ["LEVEL"]:
+            self.level(cmd.split()[1:])
+        else:
+            self.term.println("UNKNOWN CHESS CMD.")
+
+    def leave(self):
+        self.cancel_search()
+        self.engine.home()
+
+    def cancel_search(self):
+        self.search.cancel()
+        self.thinking = False
+
+    def show_board(self):
+        for line in self.pos.ascii():
+            self.term.println(line)
+        side = "WHITE" if self.pos.side == WHITE else "BLACK"
+        self.term.println(f"{side} TO MOVE.")
+
+    def move(self, text):
+        if not text:
+            self.term.println("USAGE: MOVE <SAN OR UCI>, E.G. MOVE E4 / MOVE G1F3")
+            return
+        if self.thinking:
+            self.term.println("WOPR IS THINKING. STOP TO HURRY IT.")
+            return
+        if self.pos.outcome():
+            self.term.println("GAME OVER. RESET OR UNDO.")
+            return
+        m = self.pos.parse_move(text)
+        if m is None:
+            self.term.println(f"ILLEGAL MOVE: {text}")
+            return
+        self.play(m, "OK. {}")
+        if not self.pos.outcome():
+            self.think()
+
+    def play(self, m, template):
+        self.term.println(template.format(self.pos.san(m)))
+        self.pos.make(m)
+        result = self.pos.outcome()
+        if result == "1/2-1/2":
+            self.term.println("DRAW.")
+        elif result:
+            self.term.println(f"CHECKMATE. {result}")
+
+    def undo(self):
+        if self.thinking:
+            # WOPR has not replied yet: take back just the player's move
+            self.cancel_search()
+            plies = 1
+        else:
+            plies = 2 if self.pos.side == self.player else 1
+        plies = min(plies, len(self.pos.stack))
+        if not plies:
+            self.term.println("NOTHING TO TAKE BACK.")
+            return
+        for _ in range(plies):
+            self.pos.unmake()
+        self.player = self.pos.side
+        self.term.println("TAKEN BACK.")
+
+    def go(self):
+        # WOPR takes over the side to move; the player gets the other one
+        if self.thinking:
+            self.term.println("WOPR IS THINKING.")
+        elif self.pos.outcome():
+            self.term.println("GAME OVER. RESET OR UNDO.")
+        else:
+            self.player = self.pos.side ^ 1
+            self.think()
+
+    def level(self, args):
+        try:
+            if args[:1] == ["MOVETIME"]:
+                self.tc = TimeControl(movetime=float(args[1]), depth=self.tc.depth)
+                self.wopr_clock = None
+            elif args[:1] == ["CLOCK"]:
+                inc = float(args[2]) if len(args) > 2 else 0.0
+                self.tc = TimeControl(clock=float(args[1]), increment=inc, depth=self.tc.depth)
+                self.wopr_clock = self.tc.clock
+            elif args[:1] == ["DEPTH"]:
+                self.tc.depth = int(args[1]) or None
+            elif args:
+                raise ValueError(args[0])
+        except (IndexError, ValueError):
+            self.term.println("USAGE: LEVEL [MOVETIME <S> | CLOCK <S> [INC] | DEPTH <N>]")
+            return
+        self.term.println(f"LEVEL: {self.tc.describe()}")
+
+    def show_book(self):
+        moves = self.book.moves(self.pos) if self.book else []
+        if not moves:
+            self.term.println("NO BOOK MOVES." if self.book else "NO OPENING BOOK.")
+            return
+        total = sum(w for _, w in moves)
+        for m, w in moves:
+            self.term.println(f"  {self.pos.san(m):8} {100 * w / total:5.1f}%")
+
+    def think(self):
+        if self.book:
+            m = self.book.choose(self.pos, self.rng)
+            if m is not None:
+                self.play(m, "WOPR PLAYS {}. (BOOK)")
+                return
+        tc = self.tc
+        if self.wopr_clock is not None:
+            tc = TimeControl(clock=self.wopr_clock, increment=tc.increment, depth=tc.depth)
+        moves = [entry[0] for entry in self.pos.stack]
+        self.search.start(START_FEN, moves, tc)
+        self.thinking = True
+        self._think_t0 = time.perf_counter()
+        self.term.println("WOPR IS THINKING...")
 
     def update(self, dt):
         self.term.blink += dt
+        msgs = self.search.poll()
+        spent = time.perf_counter() - self._think_t0
+        # the worker answers on wall-clock time; a replay gets the recorded messages
+        got = self.engine.background("chess", (msgs, spent) if msgs else None)
+        if not got:
+            return
+        msgs, spent = got
+        for msg in msgs:
+            if msg[0] == "info":
+                _, _, depth, score, pv, nodes, elapsed = msg
+                nps = nodes / elapsed if elapsed else 0
+                self.term.println(
+                    f"  DEPTH {depth:>2}  {_score_text(score):>6}  {' '.join(pv)}"
+                    f"  ({nodes} NODES, {nps:,.0f}/S)"
+                )
+            else:
+                _, _, move, score = msg
+                self.thinking = False
+                if self.wopr_clock is not None:
+                    self.wopr_clock = max(0.0, self.wopr_clock - spent) + self.tc.increment
+                if move is not None:
+                    self.play(move, "WOPR PLAYS {}.")
+
+
+def _score_text(score):
+    if abs(score) >= MATE - 100:
+        plies = MATE - abs(score)
+        return f"{'+' if score > 0 else '-'}M{(plies + 1) // 2}"
+    return f"{score / 100:+.2f}"
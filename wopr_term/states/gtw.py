@@ -1,7 +1,7 @@
-
 # states/gtw.py
-import pygame
 from ..engine import State
+from ..config import GTW_SCENARIOS, GTW_BATCH, GTW_REPORT_S
+from ..games import strategic
 
 class GTWState(State):
     def enter(self):
@@ -10,40 +10,101 @@ class GTWState(State):
         self.term.println("HINT: TYPE 'USA' OR 'USSR'")
         self.t0 = 0.0
         self.defcon = 5
+        # without numpy the model cannot run, and telnet sessions may not
+        # queue work on the host's worker pool: play the scripted countdown
+        self.scripted = strategic.np is None or not self.engine.local
+        self.model = None
+        self._report_t = 0.0
+        self._model_t = 0.0  # seconds the model has run, in frame time
+
+    def on_escape(self):
+        self.leave()
+
+    def on_command(self, entry):
+        cmd = entry.strip().upper()
+        self.term.println(self.term.prompt + cmd)
+        if cmd in ("USA", "USSR"):
+            self.term.println(f"SIDE CONFIRMED: {cmd}")
+            self.term.println("INITIALIZING STRATEGIC MODEL...")
+            if not self.scripted and self.model is None:
+                self.start_model()
+        elif cmd == "EXIT":
+            self.leave()
+        else:
+            self.term.println("ACK.")
+
+    def leave(self):
+        if self.model is not None:
+            self.model.cancel()
+        self.engine.home()
 
-    def handle_events(self, events):
-        for e in events:
-            if e.type == pygame.QUIT:
-                self.engine.quit()
-            elif e.type == pygame.TEXTINPUT:
-                self.term.handle_textinput(e.text)
-            elif e.type == pygame.KEYDOWN:
-                if e.key == pygame.K_ESCAPE:
-                    from .prompt import PromptState
-                    self.engine.set_state(PromptState)
-                else:
-                    entry = self.term.handle_keydown(e.key)
-                    if entry is not None:
-                        cmd = entry.strip().upper()
-                        self.term.println(self.term.prompt + cmd)
-                        if cmd in ("USA", "USSR"):
-                            self.term.println(f"SIDE CONFIRMED: {cmd}")
-                            self.term.println("INITIALIZING STRATEGIC MODEL...")
-                        elif cmd == "EXIT":
-                            from .prompt import PromptState
-                            self.engine.set_state(PromptState)
-                        else:
-                            self.term.println("ACK.")
+    def start_model(self):
+        try:
+            self.model = strategic.StrategicModel(GTW_SCENARIOS, GTW_BATCH)
+        except OSError:
+            # no worker processes on this host
+            self.scripted = True
+            return
+        self._model_t = 0.0
+        self.term.println(
+            f"RUNNING {GTW_SCENARIOS:,} FIRST-STRIKE SCENARIOS"
+            f" ON {self.model.workers} CORE(S)."
+        )
+
+    def is_animating(self):
+        # full rate only while the countdown runs or the model has batches out
+        return self.scripted or (self.model is not None and not self.model.finished)
 
     def update(self, dt):
         self.term.blink += dt
-        self.t0 += dt
-        new_defcon = max(1, 5 - int(self.t0 // 6))
-        if new_defcon != self.defcon:
-            self.defcon = new_defcon
+        if self.scripted:
+            self.t0 += dt
+            self.set_defcon(max(1, 5 - int(self.t0 // 6)))
+            if self.defcon == 1:
+                self.term.println("SIMULATION COMPLETE.")
+                self.finish(None)
+        elif self.model is not None:
+            # batches arrive on wall-clock time; a replay gets the recorded ones
+            results = self.engine.background("gtw", self.model.collect())
+            done = self.model.add(results or ())
+            self._model_t += dt
+            self._report_t += dt
+            if self._report_t >= GTW_REPORT_S or self.model.finished:
+                self._report_t = 0.0
+                self.report(done)
+            self.set_defcon(max(1, 5 - int(4 * done / self.model.total)))
+            if self.model.finished:
+                self.term.println("SIMULATION COMPLETE.")
+                for first, side in enumerate(strategic.SIDES):
+                    t = self.model.totals[first]
+                    other = strategic.SIDES[1 - first]
+                    # share() is 0 for a side that never got a batch
+                    self.term.println(
+                        f"{side} FIRST STRIKE: WINS {t.share(t.first_wins):.2%}  "
+                        f"LOSSES {side} {t.share(t.attacker_loss):.0%} / "
+                        f"{other} {t.share(t.defender_loss):.0%}"
+                    )
+                self.finish(self.model.winner())
+
+    def set_defcon(self, defcon):
+        if defcon != self.defcon:
+            self.defcon = defcon
             self.term.println(f"DEFCON STATUS: {self.defcon}")
-        if self.defcon == 1:
-            self.term.println("SIMULATION COMPLETE.")
+
+    def report(self, done):
+        rate = done / self._model_t if self._model_t else 0.0
+        a, b = self.model.totals
+        n = a.n + b.n
+        mutual = (a.mutual + b.mutual) / n if n else 0.0
+        wins = (a.first_wins + b.first_wins) / n if n else 0.0
+        self.term.println(
+            f"SCENARIOS {done:>7,}  {rate:>7,.0f}/S  MUTUAL DESTRUCTION {mutual:.1%}  FIRST-STRIKE WINS {wins:.2%}"
+        )
+
+    def finish(self, winner):
+        if winner is None:
             self.term.println("A STRANGE GAME. THE ONLY WINNING MOVE IS NOT TO PLAY.")
-            from .prompt import PromptState
-            self.engine.set_state(PromptState)
+        else:
+            side, share = winner
+            self.term.println(f"WINNER: {side} FIRST STRIKE ({share:.1%} OF SCENARIOS).")
+        self.engine.home()
@@ -0,0 +1,247 @@
+# states/maze.py
+"""
+Falken's Maze: watch WOPR build a maze, then solve it.
+- Top 3/4: viewport onto the maze (only visible cells are drawn)
+- Bottom 1/4: terminal
+- G=new maze  1/2/3=backtracker/Kruskal/Wilson  B=BFS  A=A*
+  Arrows=pan  F=follow  +/-=zoom  Esc=back
+"""
+
+import random
+import time
+import pygame
+
+from ..engine import State
+from ..sizecache import SizeCache
+from ..config import MAZE_CELL_PX, MAZE_SLICE_MS
+from ..games.maze import GENERATORS, Bitset, Job, Maze, Solver, E, S
+
+BG = (0, 0, 0)
+WALL = (0, 255, 120)
+VISITED = (0, 60, 40)
+PATH = (230, 230, 90)
+HEAD = (220, 80, 80)
+SEP_COL = (90, 90, 90)
+
+ALGOS = ("BACKTRACK", "KRUSKAL", "WILSON")
+
+
+class MazeState(State):
+    remote = False  # draws the maze itself
+
+    def __init__(self, engine, w=80, h=45, algo="BACKTRACK"):
+        super().__init__(engine)
+        self.w = w
+        self.h = h
+        self.algo = algo
+
+    @classmethod
+    def parse_args(cls, args):
+        # PLAY FALKEN'S MAZE [W [H]] [BACKTRACK|KRUSKAL|WILSON]
+        usage = (
+            "USAGE: PLAY FALKEN'S MAZE [W [H]] [BACKTRACK|KRUSKAL|WILSON]  (2..4096)"
+        )
+        args = list(args)
+        algo = "BACKTRACK"
+        if args and not args[-1].isdigit():
+            algo = args.pop()
+        try:
+            w, h = ([int(v) for v in args] + [80, 0])[:2]
+        except ValueError:
+            raise ValueError(usage)
+        h = h or (w * 9 // 16 if args else 45)
+        if (
+            algo not in ALGOS
+            or len(args) > 2
+            or not 2 <= min(w, h) <= max(w, h) <= 4096
+        ):
+            raise ValueError(usage)
+        return w, h, algo
+
+    def enter(self):
+        self.cs = MAZE_CELL_PX
+        self.cam = [0, 0]  # top-left visible cell
+        self.follow = True
+        self._view = None  # cached viewport, redrawn only when it changes
+        self._views = SizeCache()  # one surface per viewport size
+        self._dirty = True
+        self._drawn_at = self._draw_cost = 0.0
+        self._recompute_layout(self.engine.screen.get_size())
+        self.term.clear()
+        self.term.prompt = "MAZE> "
+        self.term.println("G=new  1/2/3=backtrack/kruskal/wilson  B=BFS  A=A*")
+        self.term.println("Arrows=pan  F=follow  +/-=zoom  Esc=back")
+        self.generate()
+
+    # ----- maze -----
+    def generate(self):
+        self.maze = Maze(self.w, self.h)
+        self.solver = None
+        self.on_path = None
+        # seeded from `random`, so recorded sessions replay the same maze
+        rng = random.Random(random.getrandbits(64))
+        self.job = Job(GENERATORS[self.algo](self.maze, rng))
+        self._t0 = time.perf_counter()
+        self._dirty = True
+        self.term.println(f"GENERATING {self.w}x{self.h} ({self.algo})...")
+
+    def solve(self, method):
+        if not self.job.done:
+            self.term.println("MAZE NOT FINISHED.")
+            return
+        self.on_path = None
+        self.solver = Solver(self.maze, 0, self.maze.n - 1, method)
+        self.job = self.solver.job
+        self._t0 = time.perf_counter()
+        self._dirty = True
+
+    def finished(self):
+        secs = time.perf_counter() - self._t0
+        if self.solver is None:
+            self.term.println(
+                f"DONE IN {secs:.1f}S. WALLS: {self.maze.nbytes():,} BYTES."
+            )
+            return
+        path = self.solver.path
+        self.on_path = Bitset(self.maze.n)
+        for i in path:
+            self.on_path.add(i)
+        self.term.println(
+            f"{self.solver.method}: PATH {len(path):,}  "
+            f"VISITED {self.solver.visited:,}  {secs:.2f}S"
+        )
+
+    # ----- events -----
+    def on_text(self, text):
+        pass  # single-key commands only; nothing is typed at MAZE>
+
+    def on_resize(self, size):
+        self._recompute_layout(size)
+
+    def on_key(self, e):
+        k = e.key
+        if k == pygame.K_ESCAPE:
+            self.engine.home()
+        elif k == pygame.K_g:
+            self.generate()
+        elif k in (pygame.K_1, pygame.K_2, pygame.K_3):
+            self.algo = ALGOS[k - pygame.K_1]
+            self.generate()
+        elif k == pygame.K_b:
+            self.solve("BFS")
+        elif k == pygame.K_a:
+            self.solve("A*")
+        elif k == pygame.K_f:
+            self.follow = not self.follow
+        elif k in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+            self.zoom(2)
+        elif k in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.zoom(-2)
+        elif k in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN):
+            cols, rows = self._grid()
+            step = 1 if e.mod & pygame.KMOD_SHIFT else 4
+            dx = {pygame.K_LEFT: -1, pygame.K_RIGHT: 1}.get(k, 0) * (cols // step)
+            dy = {pygame.K_UP: -1, pygame.K_DOWN: 1}.get(k, 0) * (rows // step)
+            self.follow = False
+            self.move_camera(self.cam[0] + dx, self.cam[1] + dy)
+
+    def zoom(self, delta):
+        cs = max(6, min(32, self.cs + delta))
+        if cs != self.cs:
+            self.cs = cs
+            self.move_camera(*self.cam)
+
+    def move_camera(self, x, y):
+        cols, rows = self._grid()
+        x = max(0, min(x, self.w - cols))
+        y = max(0, min(y, self.h - rows))
+        self.cam = [x, y]
+        self._dirty = True
+
+    # ----- frame -----
+    def is_animating(self):
+        return not self.job.done
+
+    def update(self, dt):
+        self.term.blink += dt
+        if self.job.done:
+            return
+        if self.job.step(MAZE_SLICE_MS / 1000.0):
+            self.finished()
+        self._dirty = True
+        if self.follow and self.job.head is not None:
+            cols, rows = self._grid()
+            x, y = self.job.head % self.w, self.job.head // self.w
+            cx, cy = self.cam
+            # recentre only once the head leaves the middle of the view
+            if not (cx + cols // 4 <= x < cx + 3 * cols // 4):
+                cx = x - cols // 2
+            if not (cy + rows // 4 <= y < cy + 3 * rows // 4):
+                cy = y - rows // 2
+            self.move_camera(cx, cy)
+
+    def draw(self, surface):
+        size = self.top_rect.size
+        view = self._views.get(size, lambda: pygame.Surface(size))
+        if view is not self._view:
+            self._view = view
+            self._dirty = True
+        now = time.perf_counter()
+        # while animating, a big viewport is redrawn less often so that
+        # drawing stays under about a third of the frame time
+        if self._dirty and (
+            self.job.done or now - self._drawn_at >= 3 * self._draw_cost
+        ):
+            self._draw_view(self._view)
+            self._dirty = False
+            self._drawn_at = time.perf_counter()
+            self._draw_cost = self._drawn_at - now
+        surface.blit(self._view, self.top_rect)
+        pygame.draw.line(
+            surface, SEP_COL, self.term_rect.topleft, self.term_rect.topright, 2
+        )
+        self.term.render(surface.subsurface(self.term_rect))
+
+    def _draw_view(self, view):
+        view.fill(BG)
+        maze, cs, w = self.maze, self.cs, self.w
+        cols, rows = self._grid()
+        cx, cy = self.cam
+        came = self.solver.came if self.solver is not None else None
+        on_path = self.on_path
+        line = pygame.draw.line
+        x1, y1 = min(w, cx + cols + 1), min(self.h, cy + rows + 1)
+        for y in range(cy, y1):
+            py = (y - cy) * cs
+            for x in range(cx, x1):
+                i = y * w + x
+                px = (x - cx) * cs
+                if on_path is not None and on_path.has(i):
+                    view.fill(PATH, (px + 1, py + 1, cs - 1, cs - 1))
+                elif came is not None and (came[i] or i == 0):
+                    view.fill(VISITED, (px + 1, py + 1, cs - 1, cs - 1))
+                if not maze.is_open(i, E):
+                    line(view, WALL, (px + cs, py), (px + cs, py + cs))
+                if not maze.is_open(i, S):
+                    line(view, WALL, (px, py + cs), (px + cs, py + cs))
+        # outer walls along the top and left edges of the maze
+        if cy == 0:
+            line(view, WALL, (0, 0), ((x1 - cx) * cs, 0))
+        if cx == 0:
+            line(view, WALL, (0, 0), (0, (y1 - cy) * cs))
+        head = self.job.head
+        if not self.job.done and head is not None:
+            hx, hy = head % w - cx, head // w - cy
+            if 0 <= hx <= cols and 0 <= hy <= rows:
+                view.fill(HEAD, (hx * cs + 1, hy * cs + 1, cs - 1, cs - 1))
+
+    # ----- layout -----
+    def _grid(self):
+        return self.top_rect.w // self.cs, self.top_rect.h // self.cs
+
+    def _recompute_layout(self, size):
+        w, h = size
+        top_h = int(h * 0.75)
+        self.top_rect = pygame.Rect(0, 0, w, top_h)
+        self.term_rect = pygame.Rect(0, top_h, w, h - top_h)
+        self._dirty = True
@@ -0,0 +1,293 @@
+# states/poker.py
+import random
+import time
+from ..engine import State
+from ..config import (
+    POKER_STACK,
+    POKER_BLINDS,
+    POKER_ROLLOUTS,
+    POKER_BATCH,
+    POKER_THINK_S,
+    POKER_FALLBACK_ROLLOUTS,
+)
+from ..games import poker
+
+YOU, WOPR = 0, 1
+NAMES = ("YOU", "WOPR")
+STREETS = ("PREFLOP", "FLOP", "TURN", "RIVER")
+BET_CAP = 4  # bets per street: a bet and three raises
+
+
+class PokerState(State):
+    """Heads-up fixed-limit hold'em against WOPR.
+
+    WOPR decides from its Monte Carlo equity against a random hand,
+    computed on the worker pool while the frame loop keeps running; it
+    acts on whatever boards are in after POKER_THINK_S.
+    """
+
+    remote = False  # equity runs on the shared worker pool
+
+    def enter(self):
+        self.term.prompt = "POKER> "
+        self.rng = random.Random(random.getrandbits(64))  # reproducible in replays
+        self.stacks = [POKER_STACK, POKER_STACK]
+        self.dealer = WOPR  # flips before every hand: you deal the first
+        self.hands = 0
+        self.live = False  # a hand is being played
+        self.to_act = None
+        self.job = None
+        self.job_for = None
+        self._think_t0 = 0.0
+        # without numpy or worker processes the rollouts run here, a few at a time
+        self.local = poker.np is None
+        if not self.local:
+            try:
+                poker.prepare()
+            except OSError:
+                self.local = True
+        poker.tables().ranks(7)  # showdowns use the tables in this process too
+        sb, bb = POKER_BLINDS
+        self.term.println(f"TEXAS HOLD'EM, FIXED LIMIT. BLINDS {sb}/{bb}.")
+        self.term.println(
+            "CMDS: CHECK, CALL, BET, RAISE, FOLD, EQUITY, DEAL, EXIT (back)"
+        )
+        self.deal()
+
+    def is_animating(self):
+        # poll the pool every frame while an estimate is running
+        return self.job is not None
+
+    def on_escape(self):
+        self.leave()
+
+    def on_command(self, entry):
+        cmd = entry.strip().upper()
+        self.term.println(self.term.prompt + cmd)
+        if cmd == "EXIT":
+            self.leave()
+        elif cmd == "DEAL":
+            if self.live:
+                self.term.println("FINISH THIS HAND FIRST (OR FOLD).")
+            else:
+                self.deal()
+        elif cmd in ("CHECK", "CALL", "BET", "RAISE", "FOLD", "EQUITY"):
+            if not self.live:
+                self.term.println("NO HAND IN PLAY. DEAL?")
+            elif self.job is not None or self.to_act != YOU:
+                self.term.println("WOPR IS THINKING.")
+            elif cmd == "EQUITY":
+                self.think(YOU)
+            else:
+                self.player_action(cmd)
+        else:
+            self.term.println("UNKNOWN POKER CMD.")
+
+    def leave(self):
+        if self.job is not None:
+            self.job.cancel()
+        self.engine.home()
+
+    # the hand
+    def deal(self):
+        sb, bb = POKER_BLINDS
+        if min(self.stacks) < bb:
+            winner = YOU if self.stacks[YOU] >= bb else WOPR
+            self.term.println(
+                "YOU WIN THE MATCH." if winner == YOU else "WOPR WINS THE MATCH."
+            )
+            self.term.println("NEW MATCH.")
+            self.stacks = [POKER_STACK, POKER_STACK]
+            self.hands = 0
+        self.hands += 1
+        self.dealer = 1 - self.dealer
+        self.deck = list(range(52))
+        self.rng.shuffle(self.deck)
+        self.hole = [[self.deck.pop(), self.deck.pop()] for _ in (YOU, WOPR)]
+        self.board = []
+        self.pot = 0
+        self.street = 0
+        self.bets = [0, 0]
+        # heads-up, the button posts the small blind and acts first preflop
+        self._put(self.dealer, sb)
+        self._put(1 - self.dealer, bb)
+        self.raises = 1  # the big blind is the first bet
+        self.acted = [False, False]
+        self.live = True
+        self.term.println(f"HAND {self.hands}. {NAMES[self.dealer]} ON THE BUTTON.")
+        self.term.println(f"YOUR CARDS: {poker.cards_str(self.hole[YOU])}")
+        self.turn(self.dealer)
+
+    def _put(self, p, chips):
+        chips = min(chips, self.stacks[p])  # short stacks go all in
+        self.stacks[p] -= chips
+        self.bets[p] += chips
+        self.pot += chips
+
+    def _owe(self, p):
+        return self.bets[1 - p] - self.bets[p]
+
+    def _bet_size(self):
+        return POKER_BLINDS[1] * (1 if self.street < 2 else 2)
+
+    def can_raise(self, p):
+        return (
+            self.raises < BET_CAP
+            and self.stacks[p] > self._owe(p)
+            and self.stacks[1 - p] > 0
+        )
+
+    def turn(self, p):
+        self.to_act = p
+        if p == WOPR:
+            self.think(WOPR)
+            return
+        owe = self._owe(YOU)
+        if owe:
+            options = "CALL, RAISE OR FOLD?" if self.can_raise(YOU) else "CALL OR FOLD?"
+            self.term.println(f"POT {self.pot}. {owe} TO CALL. {options}")
+        else:
+            options = "CHECK OR BET?" if self.can_raise(YOU) else "CHECK?"
+            self.term.println(f"POT {self.pot}. {options}")
+
+    def player_action(self, cmd):
+        owe = self._owe(YOU)
+        if cmd == "CHECK" and owe:
+            self.term.println(f"YOU OWE {owe}. CALL OR FOLD.")
+        elif cmd in ("BET", "RAISE") and not self.can_raise(YOU):
+            self.term.println("BETTING IS CAPPED. CALL OR FOLD.")
+        else:
+            self.act(YOU, "RAISE" if cmd == "BET" else cmd)
+
+    def act(self, p, action):
+        owe = self._owe(p)
+        who = NAMES[p]
+        s = "S" if p == WOPR else ""
+        if action == "FOLD":
+            self.term.println(f"{who} FOLD{s}.")
+            self.award(1 - p)
+            return
+        if action == "RAISE":
+            self._put(p, owe + self._bet_size())
+            self.raises += 1
+            verb = "RAISE" if owe or self.street == 0 else "BET"
+            self.term.println(f"{who} {verb}{s}. {self.bets[p]} IN.")
+            self.acted[1 - p] = False
+        elif owe:
+            self._put(p, owe)
+            self.term.println(f"{who} CALL{s}.")
+        else:
+            self.term.println(f"{who} CHECK{s}.")
+        self.acted[p] = True
+        settled = self.bets[0] == self.bets[1] or min(self.stacks) == 0
+        if self.acted[1 - p] and settled:
+            self.next_street()
+        else:
+            self.turn(1 - p)
+
+    def next_street(self):
+        # an all-in call for less than the bet: the excess goes back
+        big = 0 if self.bets[0] > self.bets[1] else 1
+        extra = self.bets[big] - self.bets[1 - big]
+        self.stacks[big] += extra
+        self.pot -= extra
+        self.bets = [0, 0]
+        self.raises = 0
+        self.acted = [False, False]
+        while True:
+            self.street += 1
+            if self.street == len(STREETS):
+                self.showdown()
+                return
+            for _ in range(3 if self.street == 1 else 1):
+                self.board.append(self.deck.pop())
+            self.term.println(f"{STREETS[self.street]}: {poker.cards_str(self.board)}")
+            if min(self.stacks) > 0:
+                break  # else someone is all in: run the board out
+        self.turn(1 - self.dealer)
+
+    def showdown(self):
+        mine, wopr = (poker.evaluate(self.hole[p] + self.board) for p in (YOU, WOPR))
+        self.term.println(
+            f"WOPR SHOWS {poker.cards_str(self.hole[WOPR])}: {poker.describe(wopr)}."
+        )
+        self.term.println(f"YOU HAVE {poker.describe(mine)}.")
+        if mine == wopr:
+            half = self.pot // 2
+            self.stacks[self.dealer] += half
+            self.stacks[1 - self.dealer] += self.pot - half  # odd chip out of position
+            self.term.println(f"SPLIT POT ({self.pot}).")
+            self.pot = 0
+            self.end_hand()
+        else:
+            self.award(YOU if mine > wopr else WOPR)
+
+    def award(self, p):
+        self.stacks[p] += self.pot
+        self.term.println(f"{NAMES[p]} WIN{'S' if p == WOPR else ''} {self.pot}.")
+        self.pot = 0
+        self.end_hand()
+
+    def end_hand(self):
+        self.live = False
+        self.to_act = None
+        self.term.println(
+            f"STACKS: YOU {self.stacks[YOU]}, WOPR {self.stacks[WOPR]}. DEAL?"
+        )
+
+    # equity
+    def think(self, p):
+        hero, board = self.hole[p], self.board
+        if self.local:
+            t0 = time.perf_counter()
+            n = POKER_FALLBACK_ROLLOUTS
+            equity = poker.monte_carlo(hero, board, 1, n, self.rng)
+            self.resolve(p, equity, n, time.perf_counter() - t0)
+            return
+        self.job = poker.EquityJob(
+            hero, board, 1, POKER_ROLLOUTS, POKER_BATCH, self.rng.getrandbits(64)
+        )
+        self.job_for = p
+        self._think_t0 = time.perf_counter()
+
+    def update(self, dt):
+        self.term.blink += dt
+        if self.job is None:
+            return
+        done = self.job.poll()
+        elapsed = time.perf_counter() - self._think_t0
+        result = None
+        # WOPR answers on the clock; the player's EQUITY runs to the end
+        if self.job.finished or (
+            self.job_for == WOPR and done and elapsed >= POKER_THINK_S
+        ):
+            result = (self.job.equity, self.job.done, elapsed)
+        # a replay gets the recorded estimate, on the frame it was used
+        result = self.engine.background("poker", result)
+        if result is not None:
+            self.job.cancel()
+            self.job = None
+            self.resolve(self.job_for, *result)
+
+    def resolve(self, p, equity, n, elapsed):
+        if p == YOU:
+            self.term.println(
+                f"YOUR EQUITY VS A RANDOM HAND: {equity:.1%} "
+                f"({n:,} BOARDS IN {elapsed:.2f}S)."
+            )
+            return
+        self.term.println(f"WOPR PLAYED OUT {n:,} BOARDS IN {elapsed:.2f}S.")
+        self.act(WOPR, self.decide(equity))
+
+    def decide(self, equity):
+        owe = self._owe(WOPR)
+        pot_odds = owe / (self.pot + owe)
+        r = self.rng.random()
+        # strong hands raise, good ones sometimes do, and the odd bluff
+        if self.can_raise(WOPR) and (
+            equity > 0.65 or (equity > 0.5 and r < 0.3) or r < 0.05
+        ):
+            return "RAISE"
+        if owe == 0 or equity >= pot_odds:
+            return "CALL"
+        return "FOLD"
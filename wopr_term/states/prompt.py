@@ -1,9 +1,24 @@
 # states/prompt.py
 import pygame
 from ..engine import State
-from .chess import ChessState
-from .gtw import GTWState
-from .tictactoe import TicTacToeState
+from ..config import PROFILE_TRACE_PATH
+from ..profiler import PROFILER
+from ..registry import GAME_LIST, GAMES, Trie, find_game
+
+# command word -> PromptState method; any unambiguous prefix works too
+COMMANDS = Trie(
+    [
+        ("HELP", "help"),
+        ("STATUS", "status"),
+        ("GAMES", "games"),
+        ("PLAY", "play"),
+        ("PROFILE", "profile"),
+        ("CLEAR", "clear"),
+        ("EXIT", "exit"),
+    ]
+)
+# ...except these, which throw something away: they must be typed in full
+WHOLE_WORD = {"clear", "exit"}
 
 
 class PromptState(State):
@@ -13,61 +28,128 @@ class PromptState(State):
         self.term.println("WOPR SYSTEM 4.0  (c) 1983")
         self.term.println("TYPE HELP FOR COMMANDS.")
 
-    def handle_events(self, events):
-        for e in events:
-            if e.type == pygame.QUIT:
-                self.engine.quit()
-            elif e.type == pygame.TEXTINPUT:
-                self.term.handle_textinput(e.text)
-            elif e.type == pygame.KEYDOWN:
-                if e.key == pygame.K_ESCAPE:
-                    self.engine.quit()
-                else:
-                    entry = self.term.handle_keydown(e.key)
-                    if entry is not None:
-                        cmd = entry.strip().upper()
-                        self.term.println(self.term.prompt + cmd)
-                        self.route_command(cmd)
+    def on_escape(self):
+        self.engine.quit()
+
+    def on_key(self, e):
+        if e.key == pygame.K_TAB:
+            self.complete()
+        else:
+            super().on_key(e)
+
+    def on_command(self, entry):
+        cmd = entry.strip().upper()
+        self.term.println(self.term.prompt + cmd)
+        self.route_command(cmd)
 
     def route_command(self, cmd):
         if not cmd:
             return
-        if cmd == "HELP":
-            self.term.println("CMDS: HELP, STATUS, GAMES, PLAY <NAME>, CLEAR, EXIT")
-        elif cmd == "STATUS":
-            self.term.println("SYS STATUS: NOMINAL  NET: ONLINE  TEMP: 32C")
-        elif cmd == "CLEAR":
-            self.term.clear()
-        elif cmd == "EXIT":
-            self.engine.quit()
-        elif cmd == "GAMES":
-            for g in [
-                "FALKEN'S MAZE",
-                "BLACK JACK",
-                "GIN RUMMY",
-                "HEARTS",
-                "CHESS",
-                "POKER",
-                "FIGHTER COMBAT",
-                "GUERRILLA ENGAGEMENT",
-                "DESERT WARFARE",
-                "AIR-TO-GROUND ACTIONS",
-                "THEATERWIDE TACTICAL WARFARE",
-                "GLOBAL THERMONUCLEAR WAR",
-            ]:
-                self.term.println(g)
-        elif cmd.startswith("PLAY"):
-            name = cmd[4:].strip()
-            if name == "CHESS":
-                self.engine.set_state(ChessState)
-            elif name == "GLOBAL THERMONUCLEAR WAR":
-                self.engine.set_state(GTWState)
-            elif name == "TIC-TAC-TOE":
-                self.engine.set_state(TicTacToeState)
+        word, _, rest = cmd.partition(" ")
+        handler = COMMANDS.get(word)
+        if handler is None:
+            handler = COMMANDS.match(word)
+            if handler in WHOLE_WORD:
+                handler = None  # a stray "E" must not quit
+        if handler is None:
+            self.term.println("UNKNOWN COMMAND. TYPE HELP.")
+        else:
+            getattr(self, handler)(rest.strip())
+
+    def complete(self):
+        """TAB: extend the command or game name as far as it is unambiguous."""
+        text = self.term.buffer.upper().lstrip()
+        word, space, rest = text.partition(" ")
+        if not space:
+            names, head, prefix = COMMANDS, "", word
+        elif COMMANDS.match(word) == "play":
+            names, head, prefix = GAMES, "PLAY ", rest.lstrip()
+        else:
+            return
+        options = names.complete(prefix)
+        if len(options) == 1:
+            self.term.buffer = head + options[0] + " "
+        elif options:
+            grown = names.extend(prefix)
+            if grown == prefix:
+                # nothing more to add: show the choices instead
+                self.term.println(self.term.prompt + self.term.buffer)
+                self.term.println("  ".join(options))
+            self.term.buffer = head + grown
+
+    # ----- commands -----
+    def help(self, arg):
+        self.term.println(
+            "CMDS: HELP, STATUS, GAMES, PLAY <NAME>, PROFILE, CLEAR, EXIT  (TAB COMPLETES)"
+        )
+
+    def status(self, arg):
+        self.term.println("SYS STATUS: NOMINAL  NET: ONLINE  TEMP: 32C")
+
+    def clear(self, arg):
+        self.term.clear()
+
+    def exit(self, arg):
+        self.engine.quit()
+
+    def games(self, arg):
+        for g in GAME_LIST:
+            self.term.println(g)
+
+    def play(self, arg):
+        game, args = find_game(arg.split())
+        if game is None:
+            if len(args) > 1:
+                self.term.println("WHICH ONE? " + ", ".join(args))
+            else:
+                self.term.println(f"{arg or '(none)'}: (demo not implemented)")
+            return
+        cls = game.load()
+        if cls is None:
+            self.term.println(f"{game.name}: (demo not implemented)")
+            return
+        try:
+            state_args = game.args if game.args is not None else cls.parse_args(args)
+        except ValueError as err:
+            self.term.println(str(err))
+            return
+        self.engine.set_state(cls, *state_args)
+
+    def profile(self, arg):
+        if not self.engine.host_only():
+            return  # the profiler and its trace file belong to the host
+        if arg == "":
+            if not PROFILER.enabled:
+                PROFILER.enabled = True
+                self.term.println("PROFILER ON. TYPE PROFILE AGAIN FOR STATS.")
+                self.term.println("PROFILE OVERLAY | TRACE | RESET | OFF")
+                return
+            for line in PROFILER.report_lines():
+                self.term.println(line)
+            self.term.flush()
+        elif arg == "OFF":
+            PROFILER.enabled = False
+            PROFILER.overlay = False
+            PROFILER.stop_trace()
+            self.term.invalidate()
+            self.term.println("PROFILER OFF.")
+        elif arg == "RESET":
+            PROFILER.reset()
+            self.term.println("PROFILER STATS CLEARED.")
+        elif arg == "OVERLAY":
+            PROFILER.overlay = not PROFILER.overlay
+            PROFILER.enabled = PROFILER.enabled or PROFILER.overlay
+            self.term.invalidate()
+            self.term.println(f"OVERLAY {'ON' if PROFILER.overlay else 'OFF'}.")
+        elif arg == "TRACE":
+            if PROFILER.tracing:
+                PROFILER.stop_trace()
+                self.term.println(f"TRACE WRITTEN TO {PROFILE_TRACE_PATH}")
             else:
-                self.term.println(f"{name or '(none)'}: (demo not implemented)")
+                PROFILER.start_trace(PROFILE_TRACE_PATH)
+                self.term.println(f"TRACING FRAMES TO {PROFILE_TRACE_PATH}")
         else:
-            self.term.println("UNKNOWN COMMAND. TYPE HELP.")
+            self.term.println("USAGE: PROFILE [OVERLAY|TRACE|RESET|OFF]")
 
     def update(self, dt):
         self.term.blink += dt
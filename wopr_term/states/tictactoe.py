@@ -1,16 +1,29 @@
 """
 wopr_term/states/tictactoe.py
-Basic Tic-Tac-Toe state: verifies layout only.
+Tic-Tac-Toe against WOPR, on 3x3 or any N x N board with k-in-a-row.
 - Top 3/4: board area (colored)
 - Bottom 1/4: terminal area (colored)
+- 3x3 uses the solved tables in games/tictactoe.py; bigger boards use the
+  time-sliced alpha-beta in games/board.py
+- L toggles the self-play "learning" run (3x3 only)
 """
 
+import random
 import pygame
 
 # --- robust import so this file can run directly OR via package ---
 try:
     # Normal package usage (python -m wopr_term.states.tictactoe)
     from ..engine import State
+    from ..config import (
+        SELFPLAY_BUDGET_MS,
+        SELFPLAY_REPORT_S,
+        BOARD_MOVE_BUDGET_S,
+        BOARD_SLICE_MS,
+    )
+    from ..games import tictactoe as ttt
+    from ..games.board import Board, Search, X, O
+    from ..sizecache import SizeCache
 except ImportError:
     # Direct-run fallback: add project root to sys.path and import absolute
     import os, sys
@@ -20,6 +33,15 @@ except ImportError:
     if _ROOT not in sys.path:
         sys.path.insert(0, _ROOT)
     from wopr_term.engine import State  # type: ignore
+    from wopr_term.config import (  # type: ignore
+        SELFPLAY_BUDGET_MS,
+        SELFPLAY_REPORT_S,
+        BOARD_MOVE_BUDGET_S,
+        BOARD_SLICE_MS,
+    )
+    from wopr_term.games import tictactoe as ttt  # type: ignore
+    from wopr_term.games.board import Board, Search, X, O  # type: ignore
+    from wopr_term.sizecache import SizeCache  # type: ignore
 
 # --- colors for visual debugging ---
 GREEN = (0, 255, 120)
@@ -30,13 +52,34 @@ BOARD_BG = (30, 50, 90)  # not black
 TERM_BG = (20, 20, 20)
 SEP_COL = (90, 90, 90)
 
+_layouts = SizeCache()  # (window size, n) -> rects, see _layout()
+
 
 class TicTacToeState(State):
     """
-    Minimal layout/debug version.
-    Draws only two rectangles and a separator line.
+    Human (X) against WOPR (O). On 3x3 WOPR plays a random move among the
+    optimal ones, so it never loses.
     """
 
+    remote = False  # draws the board itself
+
+    def __init__(self, engine, n=3, k=None):
+        super().__init__(engine)
+        self.n = n
+        self.k = k or n
+
+    @classmethod
+    def parse_args(cls, args):
+        # PLAY TIC-TAC-TOE [N [K]]: N x N board, K in a row
+        usage = "USAGE: PLAY TIC-TAC-TOE [N [K]]  (3 <= K <= N <= 19)"
+        try:
+            n, k = ([int(v) for v in args] + [3, 0])[:2]
+        except ValueError:
+            raise ValueError(usage)
+        if len(args) > 2 or not 3 <= (k or n) <= n <= 19:
+            raise ValueError(usage)
+        return n, k or n
+
     def enter(self):
         # 👇 borrow the engine’s terminal so self.term exists
         if not hasattr(self, "term") or self.term is None:
@@ -45,61 +88,150 @@ class TicTacToeState(State):
         self._recompute_layout(self.engine.screen.get_size())
 
         # game state
-        self.board = [[" "] * 3 for _ in range(3)]
-        self.turn = "X"
-        self.sel = [1, 1]
+        self.board = Board(self.n, self.k)
+        self.sel = [self.n // 2, self.n // 2]
+        self.over = False
+        self.search = None  # Search while WOPR is thinking
+        self.selfplay = None  # ttt.SelfPlay while learning
+        self._report_t = 0.0
+        if self.solved:
+            ttt.solve()
 
         # initialize the terminal UI
         if self.term is not None:
             self.term.clear()
             self.term.prompt = "TIC-TAC-TOE> "
-            self.term.println("Arrows=move  Enter/Space=place  Esc=back")
+            if not self.solved:
+                self.term.println(f"{self.n}x{self.n} BOARD, {self.k} IN A ROW WINS.")
+            self.term.println("Arrows=move  Enter/Space=place  L=learn  Esc=back")
         else:
             # helpful one-time debug
             print("⚠️ No engine terminal attached; bottom pane will remain blank.")
 
-    def handle_events(self, events):
-        for e in events:
-            if e.type == pygame.QUIT:
-                self.engine.quit()
-            elif e.type == pygame.VIDEORESIZE:
-                # Recompute rectangles on window resize
-                self._recompute_layout((e.w, e.h))
-            elif e.type == pygame.TEXTINPUT and hasattr(self, "term") and self.term:
-                self.term.handle_textinput(e.text)
-            elif e.type == pygame.KEYDOWN:
-                if e.key == pygame.K_ESCAPE:
-                    try:
-                        from .prompt import PromptState
-
-                        self.engine.set_state(PromptState)
-                    except Exception:
-                        self.engine.quit()
-                elif e.key in (pygame.K_LEFT, pygame.K_a):
-                    self.sel[1] = max(0, self.sel[1] - 1)
-                elif e.key in (pygame.K_RIGHT, pygame.K_d):
-                    self.sel[1] = min(2, self.sel[1] + 1)
-                elif e.key in (pygame.K_UP, pygame.K_w):
-                    self.sel[0] = max(0, self.sel[0] - 1)
-                elif e.key in (pygame.K_DOWN, pygame.K_s):
-                    self.sel[0] = min(2, self.sel[0] + 1)
-                elif e.key in (pygame.K_RETURN, pygame.K_KP_ENTER, pygame.K_SPACE):
-                    r, c = self.sel
-                    if self.board[r][c] == " ":
-                        self.board[r][c] = self.turn
-                        self.turn = "O" if self.turn == "X" else "X"
+    def on_resize(self, size):
+        # Recompute rectangles on window resize
+        self._recompute_layout(size)
+
+    def on_text(self, text):
+        if getattr(self, "term", None):
+            self.term.handle_textinput(text)
+
+    def on_escape(self):
+        # the dev runner's engine has no prompt to go back to
+        getattr(self.engine, "home", self.engine.quit)()
+
+    def on_key(self, e):
+        if e.key == pygame.K_ESCAPE:
+            self.on_escape()
+        elif e.key in (pygame.K_LEFT, pygame.K_a):
+            self.sel[1] = max(0, self.sel[1] - 1)
+        elif e.key in (pygame.K_RIGHT, pygame.K_d):
+            self.sel[1] = min(self.n - 1, self.sel[1] + 1)
+        elif e.key in (pygame.K_UP, pygame.K_w):
+            self.sel[0] = max(0, self.sel[0] - 1)
+        elif e.key in (pygame.K_DOWN, pygame.K_s):
+            self.sel[0] = min(self.n - 1, self.sel[0] + 1)
+        elif e.key == pygame.K_l:
+            self.toggle_learning()
+        elif e.key in (pygame.K_RETURN, pygame.K_KP_ENTER, pygame.K_SPACE):
+            if self.selfplay is not None or self.search is not None:
+                return
+            if self.over:
+                self.new_game()
+                return
+            r, c = self.sel
+            if self.board.at(r, c) == 0:
+                self.place(r * self.n + c)
+                if not self.over:
+                    self.wopr_move()
+
+    # ----- game -----
+    @property
+    def solved(self):
+        # plain 3x3 is answered from the precomputed perfect-play tables
+        return self.n == 3 and self.k == 3
+
+    def wopr_move(self):
+        if self.solved:
+            self.place(random.choice(ttt.best_moves(*self.board.masks())))
+        else:
+            # searched on a copy so the board can be drawn while WOPR thinks
+            self.search = Search(self.board.copy(), budget=BOARD_MOVE_BUDGET_S)
+
+    def place(self, cell):
+        self.board.play(cell)
+        if self.board.over():
+            self.over = True
+            if self.term is not None:
+                self.term.println(
+                    {X: "YOU WIN.", O: "WOPR WINS."}.get(self.board.winner, "DRAW.")
+                    + "  Enter=new game"
+                )
+
+    def new_game(self):
+        self.board.reset()
+        self.search = None
+        self.over = False
+
+    def toggle_learning(self):
+        if not self.solved:
+            if self.term is not None:
+                self.term.println("LEARNING RUNS ON THE 3x3 BOARD ONLY.")
+            return
+        if self.selfplay is None:
+            self.selfplay = ttt.SelfPlay()
+            self._report_t = 0.0
+            if self.term is not None:
+                self.term.println("LEARNING: WOPR PLAYS ITSELF...")
+        else:
+            self.report()
+            sp, self.selfplay = self.selfplay, None
+            self.new_game()
+            if self.term is not None and sp.games:
+                self.term.println(verdict(sp.results))
+
+    def report(self):
+        sp = self.selfplay
+        if self.term is not None and sp.games:
+            r = sp.results
+            self.term.println(
+                f"GAMES {sp.games}  X {r['X']}  O {r['O']}  DRAW {r['DRAW']}"
+                f"  ({sp.rate:,.0f}/S)"
+            )
+
+    def is_animating(self):
+        return self.selfplay is not None or self.search is not None
+
+    def update(self, dt):
+        if self.term is not None:
+            self.term.blink += dt
+        if self.search is not None:
+            move = self.search.step(BOARD_SLICE_MS / 1000.0)
+            if move is not None:
+                self.search = None
+                self.place(move)
+        if self.selfplay is None:
+            return
+        self.selfplay.run(SELFPLAY_BUDGET_MS / 1000.0)
+        self.board.load_masks(*self.selfplay.last)
+        self._report_t += dt
+        if self._report_t >= SELFPLAY_REPORT_S:
+            self._report_t = 0.0
+            self.report()
 
     def draw(self, surface):
         # 1) backgrounds
         self.render(surface)
 
         # 2) board grid + selection + marks
+        n = self.n
         bx, by, bw, bh = self.board_rect
-        cs = bw // 3
+        cs = bw // n
+        bw = bh = cs * n
         grid_col = (230, 230, 230)
         sel_col = (90, 180, 250)
 
-        for i in (1, 2):
+        for i in range(1, n):
             x = bx + i * cs
             y = by + i * cs
             pygame.draw.line(surface, grid_col, (x, by), (x, by + bh), 2)
@@ -107,26 +239,29 @@ class TicTacToeState(State):
 
         r, c = self.sel
         sel_rect = pygame.Rect(bx + c * cs, by + r * cs, cs, cs).inflate(-6, -6)
-        pygame.draw.rect(surface, sel_col, sel_rect, 3)
-
-        pad = max(8, cs // 8)
-        for rr in range(3):
-            for cc in range(3):
-                mark = self.board[rr][cc]
+        pygame.draw.rect(surface, sel_col, sel_rect, 3 if n <= 5 else 2)
+
+        pad = max(4 if n > 5 else 8, cs // 8)
+        width = max(2, min(6, cs // 12))
+        for rr in range(n):
+            for cc in range(n):
+                mark = self.board.at(rr, cc)
+                if not mark:
+                    continue
                 cell = pygame.Rect(bx + cc * cs, by + rr * cs, cs, cs).inflate(
                     -pad, -pad
                 )
-                if mark == "X":
+                if mark == X:
                     pygame.draw.line(
-                        surface, (220, 80, 80), cell.topleft, cell.bottomright, 6
+                        surface, (220, 80, 80), cell.topleft, cell.bottomright, width
                     )
                     pygame.draw.line(
-                        surface, (220, 80, 80), cell.topright, cell.bottomleft, 6
+                        surface, (220, 80, 80), cell.topright, cell.bottomleft, width
                     )
-                elif mark == "O":
+                elif mark == O:
                     center = cell.center
                     radius = min(cell.w, cell.h) // 2
-                    pygame.draw.circle(surface, (80, 200, 220), center, radius, 6)
+                    pygame.draw.circle(surface, (80, 200, 220), center, radius, width)
 
         # 3) terminal in bottom quarter
         if hasattr(self, "term") and hasattr(self.term, "render"):
@@ -157,27 +292,43 @@ class TicTacToeState(State):
 
     # ----- layout helpers -----
     def _recompute_layout(self, size):
-        W, H = size
-        top_h = int(H * 0.75)
+        # built once per window size and board size, then reused
+        key = (tuple(size), getattr(self, "n", 3))
+        self.top_rect, self.term_rect, self.board_rect, self.cell_rects = _layouts.get(
+            key, lambda: _layout(*key)
+        )
+
+
+def _layout(size, n):
+    W, H = size
+    top_h = int(H * 0.75)
 
-        print(f"top_h: {top_h}, H: {H}, H - top_h: {H - top_h}")
+    # Two main areas
+    top_rect = pygame.Rect(0, 0, W, top_h)  # top 3/4
+    term_rect = pygame.Rect(0, top_h, W, H - top_h)  # bottom 1/4
 
-        # Two main areas
-        self.top_rect = pygame.Rect(0, 0, W, top_h)  # top 3/4
-        self.term_rect = pygame.Rect(0, top_h, W, H - top_h)  # bottom 1/4
+    # Centered square board inside the top area
+    side = min(top_rect.w, top_rect.h)
+    bx = top_rect.x + (top_rect.w - side) // 2
+    by = top_rect.y + (top_rect.h - side) // 2
+    board_rect = pygame.Rect(bx, by, side, side)
 
-        # Centered square board inside the top area (just for visual guide)
-        side = min(self.top_rect.w, self.top_rect.h)
-        bx = self.top_rect.x + (self.top_rect.w - side) // 2
-        by = self.top_rect.y + (self.top_rect.h - side) // 2
-        self.board_rect = pygame.Rect(bx, by, side, side)
+    # n x n cells
+    cs = side // n
+    cell_rects = [
+        [pygame.Rect(bx + c * cs, by + r * cs, cs, cs) for c in range(n)]
+        for r in range(n)
+    ]
+    return top_rect, term_rect, board_rect, cell_rects
 
-        # (Optional) precompute 3x3 cells for later
-        cs = side // 3
-        self.cell_rects = [
-            [pygame.Rect(bx + c * cs, by + r * cs, cs, cs) for c in range(3)]
-            for r in range(3)
-        ]
+
+def verdict(results):
+    """The closing line of a self-play run: the tallies, then what they show."""
+    tally = f"X WINS {results['X']}, O WINS {results['O']}, DRAWS {results['DRAW']}."
+    if not results["X"] + results["O"]:
+        return f"{tally} PERFECT PLAY ALWAYS DRAWS."
+    # every perfect reply is a draw, so each win followed an exploring move
+    return f"{tally} EVERY WIN FOLLOWED A RANDOM MOVE; PERFECT PLAY DRAWS."
 
 
 # --- Optional: allow running this file directly during development ---
@@ -209,6 +360,12 @@ if __name__ == "__main__":
             def quit(self):
                 self.running = False
 
+            def resize(self, size):
+                self.state.on_resize(size)
+
+            def toggle_fullscreen(self):
+                pygame.display.toggle_fullscreen()
+
             def loop(self):
                 while self.running:
                     events = pygame.event.get()
@@ -0,0 +1,156 @@
+# teletype.py
+"""
+Terminal output, revealed a character at a time like the real WOPR.
+
+States call Terminal.println(), which lands here. Lines wait in a queue
+and pump() (run by every Terminal draw) reveals them at TELETYPE_BAUD,
+spending at most TELETYPE_BUDGET_MS per frame however much is queued.
+The line being typed is shown in the prompt row, one wrapped row at a
+time; it only enters the scrollback, whole, once it is complete.
+
+Back-pressure: worker threads use put(), which blocks while more than
+TELETYPE_BACKLOG characters are waiting. The UI thread cannot wait for
+itself, so when its own output outruns the display the queue switches
+to flush mode (whole lines per frame, within the budget) until it has
+drained. flush() asks for that explicitly, e.g. for bulk dumps.
+"""
+
+import threading
+import time
+from collections import deque
+
+from .config import TELETYPE_BAUD, TELETYPE_BUDGET_MS, TELETYPE_BACKLOG
+
+
+class Teletype:
+    def __init__(
+        self,
+        term,
+        baud=TELETYPE_BAUD,
+        budget_ms=TELETYPE_BUDGET_MS,
+        backlog=TELETYPE_BACKLOG,
+    ):
+        self.term = term
+        self.budget = budget_ms / 1000.0
+        self.backlog = backlog
+        self.set_baud(baud)
+        self._queue = deque()  # whole lines, oldest first
+        self._pending = 0  # characters not yet on screen, newlines included
+        self._line = None  # the line being typed
+        self._shown = 0  # characters of it revealed so far
+        self._row = 0  # where the wrapped row being typed starts in it
+        self._breaks = deque()  # where its later rows start
+        self._credit = 0.0  # characters the elapsed time has paid for
+        self._last = None  # clock() at the previous pump while busy
+        self._flush = False  # flush() asked for everything queued
+        self._hurry = False  # the UI thread outran the display
+        self._ready = threading.Condition()
+        self._main = threading.get_ident()
+        self.clock = time.perf_counter  # paces the typing; replays swap in their own
+
+    def set_baud(self, baud):
+        # 8N1 framing: ten bits on the wire per character; 0 means instant
+        self.cps = baud / 10.0
+
+    @property
+    def busy(self):
+        return self._line is not None or bool(self._queue)
+
+    @property
+    def typing(self):
+        """The visible part of the line being typed; None once output is idle."""
+        if self._line is None:
+            return "" if self._queue else None  # between two lines
+        return self._line[self._row : self._shown]
+
+    def write(self, text):
+        on_main = threading.get_ident() == self._main
+        if not self.cps and not self.busy and on_main:
+            self.term.emit(text)  # nothing queued ahead of it: skip the queue
+            return
+        with self._ready:
+            self._queue.append(text)
+            self._pending += len(text) + 1
+            if self._pending > self.backlog and on_main:
+                self._hurry = True
+
+    def put(self, text, timeout=None):
+        """write() for worker threads: waits while the backlog is full.
+
+        Returns False if `timeout` passed first (the text is dropped).
+        """
+        if threading.get_ident() == self._main:
+            self.write(text)
+            return True
+        with self._ready:
+            if not self._ready.wait_for(lambda: self._pending <= self.backlog, timeout):
+                return False
+            self._queue.append(text)
+            self._pending += len(text) + 1
+        return True
+
+    def flush(self):
+        """Show everything queued so far as fast as the frame budget allows."""
+        if self.busy:
+            self._flush = True
+
+    def clear(self):
+        with self._ready:
+            self._queue.clear()
+            self._line = None
+            self._pending = 0
+            self._flush = self._hurry = False
+            self._last = None
+            self._ready.notify_all()
+
+    def pump(self):
+        """Reveal what the time since the last frame has paid for."""
+        if not self.busy:
+            return
+        now = self.clock()
+        if self._flush or self._hurry or not self.cps:
+            self._credit = float("inf")
+        elif self._last is not None:
+            self._credit += self.cps * (now - self._last)
+        self._last = now
+        deadline = time.perf_counter() + self.budget
+        with self._ready:
+            while self._credit >= 1.0 and time.perf_counter() < deadline:
+                if self._line is None:
+                    if not self._queue:
+                        break
+                    self._next_line()
+                left = len(self._line) + 1 - self._shown
+                step = int(min(self._credit, left))
+                self._shown += step
+                self._credit -= step
+                self._pending -= step
+                while self._breaks and self._shown >= self._breaks[0]:
+                    self._row = self._breaks.popleft()
+                if self._shown > len(self._line):
+                    self.term.emit(self._line)
+                    self._line = None
+                if self._hurry and self._pending <= self.backlog // 2:
+                    self._hurry = False  # caught up: back to typing speed
+                    if not self._flush:
+                        break
+            if not self.busy:
+                self._flush = self._hurry = False
+                self._last = None
+            if not self.busy or self._credit == float("inf"):
+                self._credit = 0.0  # no banking time while idle or after a flush
+            self._ready.notify_all()
+
+    def _next_line(self):
+        line = self._queue.popleft()
+        self._line = line
+        self._shown = self._row = 0
+        self._breaks.clear()
+        rows = self.term.layout.rows(line)
+        # typed row by row, so a long line never hides behind the prompt;
+        # the scrollback still gets it as one line, to re-wrap on resize
+        end = len(rows[0])
+        for row in rows[1:]:
+            end = line.find(row, end)  # the wrap drops the space it broke at
+            self._breaks.append(end)
+            end += len(row)
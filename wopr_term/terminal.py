@@ -8,32 +8,83 @@ from .config import (
     TOP_MARGIN,
     BOTTOM_MARGIN,
     LEFT_MARGIN,
-    USE_GLOW,
-    USE_SCANLINES,
-    USE_VIGNETTE,
+    RIGHT_MARGIN,
+    LINE_CACHE_SIZE,
+    USE_GLYPH_ATLAS,
 )
-from .effects import draw_scanlines
+from .textcache import LineCache
+from .sizecache import SizeCache
+from .scrollback import Scrollback
+from .wrap import WrapLayout
+from .profiler import PROFILER
+from .teletype import Teletype
 
+_NO_CONTROL = {ord(c): None for c in "\r\n\t"}
 
-class Terminal:
-    def __init__(self, font):
-        self.font = font
-        self.lines = []
+
+class TextTerminal:
+    """The terminal as states see it, with no display attached.
+
+    Scrollback, the teletype output queue, the prompt and the input line.
+    Terminal draws it into a pygame window; the remote server
+    (wopr_term.server) streams it to telnet clients as ANSI text.
+    """
+
+    def __init__(self, layout):
+        self.lines = Scrollback()
+        self.layout = layout  # wraps logical lines into rows (WrapLayout API)
+        self.scroll = 0  # visual rows scrolled back from the bottom (PageUp/PageDown)
         self.buffer = ""
         self.prompt = "LOGON> "
         self.blink = 0.0
+        self.output = Teletype(self)
 
     # output
     def println(self, text=""):
+        """Queue a line; it is typed out over the next frames."""
+        self.output.write(text)
+
+    def flush(self):
+        """Finish typing whatever is queued (bulk dumps, reports)."""
+        self.output.flush()
+
+    def emit(self, text):
+        # a finished line enters the scrollback (called by the teletype)
         self.lines.append(text)
+        if self.scroll:
+            # keep a scrolled-back view anchored on the same rows
+            self.scroll += len(self.layout.rows(text))
+            self.invalidate()
 
     def clear(self):
+        self.output.clear()
         self.lines.clear()
+        self.scroll = 0
+        self.invalidate()
+
+    def invalidate(self):
+        """Force a full repaint on the next draw (e.g. after a state drew over us)."""
+        pass
+
+    def next_blink_in(self):
+        # seconds until the cursor toggles (it flips every half unit of blink)
+        return 0.5 - (self.blink % 0.5)
+
+    def page(self, direction):
+        pass  # only a view with a window can scroll back
+
+    def _snap_to_bottom(self):
+        if self.scroll:
+            self.scroll = 0
+            self.invalidate()
 
     # input helpers
     def handle_textinput(self, txt):
-        if txt not in "\r\n\t":
+        # may be several keystrokes at once (coalesced by the input dispatcher)
+        txt = txt.translate(_NO_CONTROL)
+        if txt:
             self.buffer += txt
+            self._snap_to_bottom()
 
     def handle_keydown(self, key):
         if key == pygame.K_BACKSPACE:
@@ -42,45 +93,246 @@ class Terminal:
         if key in (pygame.K_RETURN, pygame.K_KP_ENTER):
             cmdline = self.buffer
             self.buffer = ""
+            self._snap_to_bottom()
             return cmdline
+        if key == pygame.K_PAGEUP:
+            self.page(1)
+        elif key == pygame.K_PAGEDOWN:
+            self.page(-1)
         return None
 
+
+class _Viewport:
+    # everything about the terminal that depends on the window size
+    def __init__(self, font, size, scale):
+        self.size = self.w, self.h = size
+        # margins are in window pixels; a scaled-down frame shrinks them too
+        self.top = TOP_MARGIN // scale
+        self.left = LEFT_MARGIN // scale
+        wrap = self.w - self.left - RIGHT_MARGIN // scale
+        self.layout = WrapLayout(font, max(1, wrap))
+        self.lh = font.get_linesize()
+        usable = self.h - self.top - BOTTOM_MARGIN // scale
+        self.max_lines = max(1, usable // self.lh)
+        # cursor block: gap after the text, offsets and size
+        self.cursor = tuple(max(1, v // scale) for v in (6, 4, 12, 18))
+        self.back = None  # retained frame, allocated on first draw
+
+
+class Terminal(TextTerminal):
+    def __init__(self, font, size=(W, H), scale=1):
+        # scale: the frame is drawn at 1/scale of the window (see framebuffer)
+        self.font = font
+        self.scale = scale
+        self._viewports = SizeCache()
+        self.view = self._viewport(size)
+        super().__init__(self.view.layout)
+        self._full = True
+        self._drawn = 0  # lines.total at the last repaint
+        self._rows_drawn = 0
+        self._prompt_drawn = None
+        self._cursor_drawn = None
+        self._cursor_rect = pygame.Rect(0, 0, 0, 0)
+        self.text_cache = LineCache(LINE_CACHE_SIZE, use_atlas=USE_GLYPH_ATLAS)
+
+    def _viewport(self, size):
+        size = tuple(size)
+        return self._viewports.get(size, lambda: _Viewport(self.font, size, self.scale))
+
+    def resize(self, size):
+        """Lay out for a new window size, reusing what was built for it before."""
+        view = self._viewport(size)
+        if view is not self.view:
+            self.view = view
+            self.layout = view.layout
+            self._full = True
+
+    @property
+    def back(self):
+        # retained frame; only changed regions are redrawn
+        return self.view.back
+
+    def invalidate(self):
+        self._full = True
+
+    def page(self, direction):
+        # direction: +1 = back (PageUp), -1 = forward (PageDown)
+        # (paging past the top is clamped when the window is next laid out)
+        step = max(1, self._max_lines() - 1)
+        scroll = max(0, self.scroll + direction * step)
+        if scroll != self.scroll:
+            self.scroll = scroll
+            self._full = True
+
+    def _max_lines(self):
+        return self.view.max_lines
+
+    def _window(self, max_lines):
+        # visual rows on screen, top to bottom; only lines that can reach
+        # the window are laid out, walking back from the newest
+        want = max_lines + self.scroll
+        rows = []  # newest first
+        for i in range(len(self.lines) - 1, -1, -1):
+            rows.extend(reversed(self.layout.rows(self.lines[i])))
+            if len(rows) >= want:
+                break
+        self.scroll = max(0, min(self.scroll, len(rows) - max_lines))
+        window = rows[self.scroll : self.scroll + max_lines]
+        window.reverse()
+        return window
+
+    def _count_rows(self, new):
+        # visual rows produced by the newest `new` logical lines
+        n = len(self.lines)
+        if new > n:
+            return None  # some were already evicted from the ring
+        rows = self.layout.rows
+        return sum(len(rows(line)) for line in self.lines.view(n - new, n))
+
     # drawing
-    def draw(self, screen, vignette=None):
-        term = pygame.Surface((W, H))
-        term.fill(BLACK)
+    def draw(self, screen, postfx):
+        """Bring the back buffer up to date and composite only what changed.
 
-        y = TOP_MARGIN
-        lh = self.font.get_linesize()
-        usable = H - TOP_MARGIN - BOTTOM_MARGIN
-        max_lines = max(1, usable // lh)
+        Returns the list of screen rects touched this frame; the caller
+        presents them (an empty list means nothing needs presenting).
+        """
+        view = self.view
+        if view.back is None:
+            view.back = pygame.Surface(view.size)
+            self._full = True
+        if postfx.stale:
+            self._full = True
+        self.output.pump()
 
-        for line in self.lines[-max_lines:]:
-            term.blit(self.font.render(line, True, GREEN), (LEFT_MARGIN, y))
-            y += lh
+        with PROFILER.phase("text"):
+            dirty = self._repaint()
+        rects = [r.clip(screen.get_rect()) for r in _merge(dirty)]
+        postfx.apply(screen, self.back, rects)
+        return rects
 
-        prompt_text = self.font.render(self.prompt + self.buffer, True, GREEN)
-        term.blit(prompt_text, (LEFT_MARGIN, y))
+    def _repaint(self):
+        # bring the back buffer up to date; returns the regions that changed
+        view = self.view
+        w, lh, max_lines = view.w, view.lh, view.max_lines
+        top = view.top
+        new = self.lines.total - self._drawn
+        window = self._window(max_lines) if self._full or new else None
+        rows = self._rows_drawn if window is None else len(window)
+        prompt_y = top + rows * lh
+        typing = self.output.typing
+        # the prompt row shows the line being typed until output finishes
+        prompt_str = self.prompt + self.buffer if typing is None else typing
         cursor_on = int((self.blink * 2) % 2) == 0  # ~1Hz
-        if cursor_on:
-            cx = prompt_text.get_width()
-            pygame.draw.rect(term, GREEN, (LEFT_MARGIN + cx + 6, y + 4, 12, 18))
 
-        frame = term
-        if USE_GLOW:
-            glow = pygame.transform.smoothscale(term, (int(W * 1.02), int(H * 1.02)))
-            frame = pygame.transform.smoothscale(glow, (W, H))
+        dirty = []
+        prompt_key = (prompt_str, prompt_y)
+        if self._cursor_drawn and (
+            new or prompt_key != self._prompt_drawn or not cursor_on
+        ):
+            # the cursor can hang below its row, so erase it before anything moves
+            self.back.fill(BLACK, self._cursor_rect)
+            self._cursor_drawn = False
+            dirty.append(self._cursor_rect)
+        new_rows = self._count_rows(new) if new and not self._full else 0
+        if (
+            self._full
+            or new_rows is None
+            or new_rows >= max_lines
+            or rows < self._rows_drawn
+        ):
+            self.back.fill(BLACK)
+            self._draw_lines(window, 0, rows, lh)
+            dirty.append(pygame.Rect((0, 0), view.size))
+            self._prompt_drawn = None
+            self._cursor_drawn = False
+        elif new:
+            old_rows = self._rows_drawn
+            shift = new_rows - (rows - old_rows)
+            text_area = pygame.Rect(0, top, w, max_lines * lh + lh)
+            if shift:
+                # scrolled: move the retained rows up instead of re-rendering them
+                self.back.set_clip(text_area)
+                self.back.scroll(0, -shift * lh)
+                self.back.set_clip(None)
+                first = rows - new_rows
+                dirty.append(text_area)
+            else:
+                first = old_rows
+                dirty.append(pygame.Rect(0, top + first * lh, w, (new_rows + 1) * lh))
+            self.back.fill(BLACK, (0, top + first * lh, w, (rows - first) * lh))
+            self._draw_lines(window, first, rows, lh)
+            self._prompt_drawn = None
+        self._full = False
+        self._drawn = self.lines.total
+        self._rows_drawn = rows
+
+        prompt_row = pygame.Rect(0, prompt_y, w, lh)
+        if prompt_key != self._prompt_drawn:
+            self.back.fill(BLACK, prompt_row)
+            if typing is None:
+                prompt_text = self.text_cache.render(self.font, prompt_str, GREEN)
+            else:  # a new prefix every frame: not worth a cache slot
+                prompt_text = self.font.render(prompt_str, True, GREEN)
+            self.back.blit(prompt_text, (view.left, prompt_y))
+            self._prompt_drawn = prompt_key
+            gap, dy, cw, ch = view.cursor
+            self._cursor_rect = pygame.Rect(
+                view.left + prompt_text.get_width() + gap, prompt_y + dy, cw, ch
+            )
+            dirty.append(prompt_row)
+        if cursor_on and not self._cursor_drawn:
+            self.back.fill(GREEN, self._cursor_rect)
+            self._cursor_drawn = True
+            dirty.append(self._cursor_rect)
 
-        screen.blit(frame, (0, 0))
-        if USE_SCANLINES:
-            draw_scanlines(screen)
-        if USE_VIGNETTE and vignette:
-            screen.blit(vignette, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        return dirty
 
-        pygame.display.flip()
+    def _draw_lines(self, window, first, rows, lh):
+        y = self.view.top + first * lh
+        for line in window[first:rows]:
+            self.back.blit(
+                self.text_cache.render(self.font, line, GREEN), (self.view.left, y)
+            )
+            y += lh
 
     # terminal.py
     def render(self, surface):
         # surface is already clipped to just the terminal area
         surface.fill((0, 0, 0))  # or transparent bg if you want
-        # draw all lines, prompt, cursor starting at (0,0) in this surface
+        self.output.pump()
+        pad = 8 // self.scale
+        lh = self.font.get_linesize()
+        h = surface.get_height()
+        max_rows = max(1, (h - pad * 2) // lh - 1)
+        y = pad
+        for line in self.lines.tail(max_rows):
+            surface.blit(self.text_cache.render(self.font, line, GREEN), (pad, y))
+            y += lh
+        prompt_y = h - pad - lh
+        typing = self.output.typing
+        if typing is None:
+            prompt_text = self.text_cache.render(
+                self.font, self.prompt + self.buffer, GREEN
+            )
+        else:
+            prompt_text = self.font.render(typing, True, GREEN)
+        surface.blit(prompt_text, (pad, prompt_y))
+        if int((self.blink * 2) % 2) == 0:
+            s = self.scale
+            cx = pad + prompt_text.get_width() + 6 // s
+            pygame.draw.rect(
+                surface, GREEN, (cx, prompt_y + 2 // s, 10 // s, lh - 4 // s)
+            )
+
+
+def _merge(rects):
+    # overlapping dirty rects would be composited (and presented) twice
+    out = []
+    for r in rects:
+        for i, o in enumerate(out):
+            if o.colliderect(r) or o.contains(r):
+                out[i] = o.union(r)
+                break
+        else:
+            out.append(pygame.Rect(r))
+    return out
@@ -0,0 +1,90 @@
+# textcache.py
+from collections import OrderedDict
+import pygame
+
+
+class LineCache:
+    """Bounded LRU of rendered line surfaces, keyed by (text, color, font)."""
+
+    def __init__(self, capacity=256, use_atlas=False):
+        self.capacity = capacity
+        self.use_atlas = use_atlas
+        self._surfs = OrderedDict()
+        self._atlases = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, color):
+        key = (text, color, font)
+        surf = self._surfs.get(key)
+        if surf is not None:
+            self._surfs.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        atlas = self._atlas(font, color) if self.use_atlas else None
+        if atlas is not None:
+            surf = atlas.render(text)
+        else:
+            surf = font.render(text, True, color)
+        self._surfs[key] = surf
+        if len(self._surfs) > self.capacity:
+            self._surfs.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def _atlas(self, font, color):
+        key = (font, color)
+        if key not in self._atlases:
+            # None marks a proportional font; those always go through font.render
+            self._atlases[key] = (
+                GlyphAtlas(font, color) if GlyphAtlas.is_monospace(font) else None
+            )
+        return self._atlases[key]
+
+    def clear(self):
+        self._surfs.clear()
+        self._atlases.clear()
+
+    def stats(self):
+        return {
+            "size": len(self._surfs),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class GlyphAtlas:
+    """Per-character surfaces for a monospace font; lines are built by blitting."""
+
+    def __init__(self, font, color):
+        self.font = font
+        self.color = color
+        self.advance = font.size("M")[0]
+        self.height = font.get_linesize()
+        self._glyphs = {}
+
+    @staticmethod
+    def is_monospace(font):
+        return font.size("i")[0] == font.size("M")[0] == font.size(".")[0]
+
+    def glyph(self, ch):
+        surf = self._glyphs.get(ch)
+        if surf is None:
+            surf = self._glyphs[ch] = self.font.render(ch, True, self.color)
+        return surf
+
+    def render(self, text):
+        surf = pygame.Surface(
+            (max(1, self.advance * len(text)), self.height), pygame.SRCALPHA
+        )
+        x = 0
+        for ch in text:
+            if ch != " ":
+                surf.blit(self.glyph(ch), (x, 0))
+            x += self.advance
+        return surf
@@ -0,0 +1,88 @@
+# wrap.py
+from collections import OrderedDict
+
+
+class WrapLayout:
+    """Breaks logical lines into visual rows that fit `width` pixels.
+
+    Glyph advances are measured once per character and reused. Row
+    breakdowns are cached per logical line for the current width; a width
+    change just drops that cache, so lines are re-measured lazily as they
+    come into view rather than all at once.
+    """
+
+    def __init__(self, font, width, capacity=4096):
+        self.font = font
+        self.width = width
+        self.capacity = capacity
+        self._advances = {}
+        self._rows = OrderedDict()
+
+    def set_width(self, width):
+        if width != self.width:
+            self.width = width
+            self._rows.clear()
+
+    def rows(self, text):
+        rows = self._rows.get(text)
+        if rows is not None:
+            self._rows.move_to_end(text)
+            return rows
+        rows = self._rows[text] = self._wrap(text)
+        if len(self._rows) > self.capacity:
+            self._rows.popitem(last=False)
+        return rows
+
+    def advance(self, ch):
+        w = self._advances.get(ch)
+        if w is None:
+            w = self._advances[ch] = self.font.size(ch)[0]
+        return w
+
+    def measure(self, text):
+        adv = self.advance
+        return sum(adv(ch) for ch in text)
+
+    def _wrap(self, text):
+        width = self.width
+        if self.measure(text) <= width:
+            return (text,)
+        adv = self.advance
+        rows = []
+        start = 0
+        x = 0
+        space = -1  # last break opportunity in the current row
+        i = 0
+        n = len(text)
+        while i < n:
+            ch = text[i]
+            w = adv(ch)
+            if x + w > width and i > start:
+                if space > start:
+                    rows.append(text[start:space])
+                    start = space + 1
+                else:  # no space to break at: split the word
+                    rows.append(text[start:i])
+                    start = i
+                x = self.measure(text[start:i])
+                space = -1
+                continue
+            if ch == " ":
+                space = i
+            x += w
+            i += 1
+        rows.append(text[start:])
+        return tuple(rows)
+
+
+class CharLayout(WrapLayout):
+    """WrapLayout for a character-cell display: every glyph is one column."""
+
+    def __init__(self, columns, capacity=4096):
+        super().__init__(None, columns, capacity)
+
+    def advance(self, ch):
+        return 1
+
+    def measure(self, text):
+        return len(text)